@@ -11,7 +11,8 @@ from urllib.parse import urlparse, parse_qs
 from a2a.client.client_factory import ClientFactory
 from a2a.client.client import ClientConfig, ClientCallInterceptor, Consumer, ClientCallContext
 from a2a.client.auth import AuthInterceptor
-from a2a.types import Message, Part, TextPart, Role, AgentCard, HTTPAuthSecurityScheme, OAuth2SecurityScheme, OpenIdConnectSecurityScheme
+from a2a.types import Message, Part, TextPart, Role, AgentCard, TaskArtifactUpdateEvent, HTTPAuthSecurityScheme, OAuth2SecurityScheme, OpenIdConnectSecurityScheme
+from a2a.utils.artifact import get_artifact_text
 from a2a.utils.message import get_message_text
 from a2a.client.auth.credentials import CredentialService
 from typing import Optional, Any
@@ -30,6 +31,8 @@ AGENT_URL = os.environ.get("AGENT_URL", "http://localhost:8000/a2a/app")
 REDIRECT_PORT = int(os.environ.get("REDIRECT_PORT", "7777"))
 REDIRECT_PATH = os.environ.get("REDIRECT_PATH", "/oauth/callback")
 REDIRECT_URI = f"http://localhost:{REDIRECT_PORT}{REDIRECT_PATH}"
+# Marks status messages that carry a streamed chunk of the agent's answer
+PARTIAL_METADATA_KEY = "adk_partial"
 
 def get_credentials():
     creds = None
@@ -241,6 +244,7 @@ async def main():
             )
             
             print("Agent: ", end="", flush=True)
+            streamed = ""
             async for event in client.send_message(request=msg):
                 # print(f"DEBUG: {type(event)} {event}")
                 if isinstance(event, Message):
@@ -249,10 +253,25 @@ async def main():
                 elif isinstance(event, tuple):
                      task, update = event
                      if update and hasattr(update, 'status'):
+                         message = update.status.message
+                         # Streamed chunks are printed as they arrive, on one line
+                         if message and (message.metadata or {}).get(PARTIAL_METADATA_KEY):
+                             text = get_message_text(message)
+                             print(text if streamed else f"\n{text}", end="", flush=True)
+                             streamed += text
+                             continue
                          print(f"\n[Status: {update.status.state.value}]", end="", flush=True)
-                         if update.status.message:
-                             text = get_message_text(update.status.message)
+                         if message:
+                             text = get_message_text(message)
+                             # The complete message repeats the chunks streamed before it
+                             if streamed and text == streamed:
+                                 streamed = ""
+                                 continue
+                             streamed = ""
                              print(f"\n{text}", end="", flush=True)
+                     elif isinstance(update, TaskArtifactUpdateEvent) and update.append and not update.last_chunk:
+                         # Partial artifact chunks (from servers that stream artifacts)
+                         print(get_artifact_text(update.artifact, delimiter=""), end="", flush=True)
             print() 
             
         except KeyboardInterrupt:
@@ -12,6 +12,8 @@
 # See the License for the specific language governing permissions and
 # limitations under the License.
 
+# Imported first, so that its startup report times all of the app's imports.
+from .app_utils import startup  # noqa: F401, I001
 from .agent import app
 
 __all__ = ["app"]
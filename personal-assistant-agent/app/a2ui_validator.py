@@ -0,0 +1,340 @@
+"""
+Validation and repair of the A2UI JSON emitted by the Personal Assistant Agent.
+
+The validator is compiled once from `A2UI_SCHEMA`, tightened with the rules
+the schema only states in prose (exactly one action per message, exactly one
+component type per component). Streamed model output is validated message by
+message as chunks arrive, and invalid messages are repaired in place instead
+of regenerating the whole response.
+
+Repair only deletes: it splits messages with several actions and removes
+offending values, components and messages, but never fixes or fills them in.
+A repaired card can therefore lack some of its fields or components. Text is
+treated as A2UI only if it is a JSON list of messages with an A2UI action key.
+"""
+
+import copy
+import json
+import logging
+from dataclasses import dataclass
+from typing import Any
+
+import jsonschema
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmResponse
+from google.genai import types
+
+from app.a2ui import A2UI_SCHEMA
+from app.app_utils.cache import TTLCache
+from app.app_utils.metrics import meter
+
+logger = logging.getLogger(__name__)
+
+ACTIONS = ("beginRendering", "surfaceUpdate", "dataModelUpdate", "deleteSurface")
+MAX_REPAIR_PASSES = 10
+
+a2ui_violations = meter.create_counter(
+    "a2ui.violations", description="A2UI schema violations found in model output."
+)
+a2ui_repairs = meter.create_counter(
+    "a2ui.repairs", description="A2UI responses rewritten by the repair stage, by outcome."
+)
+
+
+@dataclass
+class Violation:
+    """A schema violation in the `message_index`-th A2UI message."""
+
+    message_index: int
+    path: str
+    error: str
+
+
+def _strict_schema() -> dict[str, Any]:
+    schema = json.loads(A2UI_SCHEMA)
+    schema.update(minProperties=1, maxProperties=1, additionalProperties=False)
+    component = schema["properties"]["surfaceUpdate"]["properties"]["components"]["items"]
+    component["properties"]["component"].update(minProperties=1, maxProperties=1)
+    return schema
+
+
+def _path(path: list[Any]) -> str:
+    return "".join(f"[{p}]" if isinstance(p, int) else f".{p}" for p in path) or "."
+
+
+def _remove(message: dict[str, Any], path: list[Any]) -> None:
+    """Remove the value at `path`, and references to a removed component."""
+    parent = message
+    for key in path[:-1]:
+        parent = parent[key]
+    removed = parent.pop(path[-1])
+    if path[:2] == ["surfaceUpdate", "components"] and len(path) == 3 and isinstance(removed, dict):
+        for component in message["surfaceUpdate"]["components"]:
+            for props in (component.get("component") or {}).values():
+                children = props.get("children", {}) if isinstance(props, dict) else {}
+                if removed.get("id") in children.get("explicitList", []):
+                    children["explicitList"].remove(removed["id"])
+
+
+class A2UIValidator:
+    """Validates and repairs lists of A2UI messages."""
+
+    def __init__(self) -> None:
+        schema = _strict_schema()
+        validator_class = jsonschema.validators.validator_for(schema)
+        validator_class.check_schema(schema)
+        self._validator = validator_class(schema)
+
+    def message_violations(self, message: Any, index: int = 0) -> list[Violation]:
+        """Return the violations in a single A2UI message."""
+        return [
+            Violation(index, _path(list(error.absolute_path)), error.message)
+            for error in self._validator.iter_errors(message)
+        ]
+
+    def validate(self, messages: Any) -> list[Violation]:
+        """Return the violations in a list of A2UI messages."""
+        if not isinstance(messages, list):
+            return [Violation(-1, ".", "A2UI response must be a list of messages")]
+        return [v for index, message in enumerate(messages) for v in self.message_violations(message, index)]
+
+    def repair(self, messages: list[Any]) -> tuple[list[Any], list[Violation]]:
+        """
+        Repair invalid messages by deleting what is invalid.
+
+        Messages with several actions are split into one message per action.
+        Within a message, the innermost offending value (property, component
+        or list item) is deleted as long as that reduces the number of
+        violations. Messages that still don't validate are dropped. Nothing
+        is rewritten, so a repaired component may be missing properties.
+
+        Args:
+            messages: The A2UI messages to repair.
+
+        Returns:
+            The repaired messages and the violations that were dropped with them.
+        """
+        split: list[Any] = []
+        for message in messages:
+            if isinstance(message, dict) and sum(key in ACTIONS for key in message) > 1:
+                split.extend({key: value} for key, value in message.items() if key in ACTIONS)
+            else:
+                split.append(message)
+
+        repaired = []
+        dropped: list[Violation] = []
+        for index, message in enumerate(split):
+            message = self._repair_message(message)
+            violations = self.message_violations(message, index)
+            if violations:
+                dropped.extend(violations)
+            else:
+                repaired.append(message)
+        return repaired, dropped
+
+    def _repair_message(self, message: Any) -> Any:
+        if not isinstance(message, dict):
+            return message
+        message = copy.deepcopy(message)
+        for _ in range(MAX_REPAIR_PASSES):
+            errors = sorted(self._validator.iter_errors(message), key=lambda e: -len(e.absolute_path))
+            if not errors:
+                break
+            if not self._remove_one(message, errors):
+                break
+        return message
+
+    def _remove_one(self, message: dict[str, Any], errors: list[jsonschema.ValidationError]) -> bool:
+        for error in errors:
+            path = list(error.absolute_path)
+            for depth in range(len(path), 1, -1):
+                candidate = copy.deepcopy(message)
+                _remove(candidate, path[:depth])
+                if sum(1 for _ in self._validator.iter_errors(candidate)) < len(errors):
+                    _remove(message, path[:depth])
+                    return True
+        return False
+
+
+class A2UIStreamValidator:
+    """
+    Validates a streamed A2UI response incrementally.
+
+    Chunks of model output are fed as they arrive; each top-level message is
+    parsed and validated as soon as its closing brace is seen, so violations
+    are reported before the rest of the response has been generated. The
+    response counts as A2UI once its first message turns out to be an A2UI
+    message; anything else in the top-level list (e.g. a Markdown "[x]" item)
+    or a first item without an action key means it isn't.
+    """
+
+    def __init__(self, validator: A2UIValidator) -> None:
+        self.validator = validator
+        self.messages: list[Any] = []
+        self.violations: list[Violation] = []
+        self.is_a2ui: bool | None = None
+        self._buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._start = -1
+
+    def feed(self, chunk: str) -> list[Violation]:
+        """Consume `chunk` and return the violations in messages it completed."""
+        self._buffer += chunk
+        found: list[Violation] = []
+        buffer = self._buffer
+        while self._pos < len(buffer) and self.is_a2ui is not False:
+            char = buffer[self._pos]
+            if self._depth == 0 and self.is_a2ui is None:
+                if char == "`":
+                    # Skip a Markdown code fence line such as "```json".
+                    newline = buffer.find("\n", self._pos)
+                    if newline < 0:
+                        break
+                    self._pos = newline
+                elif char == "[":
+                    self._depth = 1
+                elif not char.isspace():
+                    self.is_a2ui = False
+            elif self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif char == "\\":
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+            elif self._depth == 1 and char not in "{[]," and not char.isspace():
+                # Only messages belong in the top-level list (not e.g. Markdown's "[x] Buy milk").
+                self.is_a2ui = False
+            elif char == '"':
+                self._in_string = True
+            elif char in "[{":
+                if self._depth == 1:
+                    self._start = self._pos
+                self._depth += 1
+            elif char in "]}":
+                self._depth -= 1
+                if self._depth == 1 and self._start >= 0:
+                    found.extend(self._complete(buffer[self._start : self._pos + 1]))
+                    self._start = -1
+                elif self._depth == 0 and self.is_a2ui is None:
+                    # An empty list.
+                    self.is_a2ui = False
+            self._pos += 1
+        self.violations.extend(found)
+        return found
+
+    def _complete(self, text: str) -> list[Violation]:
+        index = len(self.messages)
+        try:
+            message = json.loads(text)
+        except json.JSONDecodeError as e:
+            if self.is_a2ui is None:
+                self.is_a2ui = False
+                return []
+            self.messages.append(None)
+            return [Violation(index, ".", f"Invalid JSON: {e}")]
+        if self.is_a2ui is None:
+            self.is_a2ui = is_a2ui_message(message)
+            if not self.is_a2ui:
+                return []
+        self.messages.append(message)
+        return self.validator.message_violations(message, index)
+
+    def close(self) -> list[Violation]:
+        """Finish the stream and return a violation if it was cut short."""
+        if self.is_a2ui is not False and self._depth != 0:
+            violation = Violation(len(self.messages), ".", "A2UI response is incomplete")
+            self.violations.append(violation)
+            return [violation]
+        return []
+
+
+a2ui_validator = A2UIValidator()
+
+
+def is_a2ui_message(message: Any) -> bool:
+    """Whether `message` is shaped like an A2UI message: an object with an action key."""
+    return isinstance(message, dict) and any(key in ACTIONS for key in message)
+
+
+def _a2ui_text(text: str) -> str | None:
+    """
+    Return the A2UI JSON in `text`, unwrapping a Markdown code fence, or None.
+
+    Text is A2UI if it is a JSON list whose first item is an A2UI message, or
+    JSON that doesn't parse but names an A2UI action (a broken A2UI response).
+    """
+    stripped = text.strip()
+    if stripped.startswith("```"):
+        stripped = stripped.split("\n", 1)[-1].rsplit("```", 1)[0].strip()
+    if not stripped.startswith("["):
+        return None
+    try:
+        messages = json.loads(stripped)
+    except json.JSONDecodeError:
+        return stripped if any(f'"{action}"' in stripped for action in ACTIONS) else None
+    return stripped if isinstance(messages, list) and messages and is_a2ui_message(messages[0]) else None
+
+
+class A2UIResponseValidator:
+    """
+    After-model callback that validates A2UI responses and repairs them.
+
+    Partial (streamed) responses are fed to an `A2UIStreamValidator` per
+    invocation so violations are logged as soon as they are generated. The
+    final response is validated as a whole and, if needed, replaced with the
+    repaired messages.
+    """
+
+    def __init__(self, validator: A2UIValidator = a2ui_validator) -> None:
+        self.validator = validator
+        # Bounded, so invocations that never produce a final response don't leak.
+        self._streams = TTLCache("a2ui.streams", max_size=1024, ttl_seconds=600)
+
+    def __call__(
+        self, callback_context: CallbackContext, llm_response: LlmResponse
+    ) -> LlmResponse | None:
+        parts = llm_response.content.parts if llm_response.content and llm_response.content.parts else []
+        text = "".join(part.text for part in parts if part.text and not part.thought)
+        invocation_id = callback_context.invocation_id
+
+        if llm_response.partial:
+            stream = self._streams.get(invocation_id)
+            if stream is None:
+                stream = A2UIStreamValidator(self.validator)
+                self._streams.set(invocation_id, stream)
+            for violation in stream.feed(text):
+                a2ui_violations.add(1, {"stage": "stream"})
+                logger.warning(f"A2UI violation in streamed message {violation.message_index} at {violation.path}: {violation.error}")
+            return None
+        self._streams.invalidate(invocation_id)
+
+        a2ui_text = _a2ui_text(text)
+        if a2ui_text is None or any(part.function_call for part in parts):
+            return None
+        try:
+            messages = json.loads(a2ui_text)
+        except json.JSONDecodeError as e:
+            a2ui_violations.add(1, {"stage": "final"})
+            logger.warning(f"A2UI response is not valid JSON: {e}")
+            return None
+
+        violations = self.validator.validate(messages)
+        if not violations and a2ui_text == text:
+            return None
+        if violations:
+            a2ui_violations.add(len(violations), {"stage": "final"})
+            if not isinstance(messages, list):
+                return None
+            messages, dropped = self.validator.repair(messages)
+            a2ui_repairs.add(1, {"outcome": "partial" if dropped else "repaired"})
+            logger.warning(f"Repaired A2UI response: {len(violations)} violations, {len(dropped)} left after repair")
+
+        return LlmResponse(
+            content=types.Content(role="model", parts=[types.Part(text=json.dumps(messages))]),
+            usage_metadata=llm_response.usage_metadata,
+            finish_reason=llm_response.finish_reason,
+        )
@@ -1,797 +1,29 @@
 import os
-import google.auth
+import tempfile
+from collections.abc import Callable
+from typing import Any
+
 import httpx
-from typing import Any, Callable
+from a2a.client import ClientConfig, ClientFactory
 from google.adk.agents import Agent
+from google.adk.agents.context_cache_config import ContextCacheConfig
+from google.adk.agents.remote_a2a_agent import AGENT_CARD_WELL_KNOWN_PATH
 from google.adk.apps.app import App
-from google.adk.models import Gemini
-from google.adk.tools import McpToolset
+from google.adk.models import BaseLlm, Gemini
 from google.adk.tools.mcp_tool import StreamableHTTPConnectionParams
 from google.genai import types
 
-from google.adk.agents.remote_a2a_agent import AGENT_CARD_WELL_KNOWN_PATH
-from google.adk.agents.remote_a2a_agent import RemoteA2aAgent
-from a2a.client import ClientConfig, ClientFactory
+from app.a2ui import attach_a2ui_guide, emit_rendered_card
+from app.a2ui_validator import A2UIResponseValidator
+from app.app_utils.agent_card_cache import AgentCardCache, CachedRemoteA2aAgent
+from app.app_utils.http_client import create_http_client
+from app.app_utils.mcp_pool import PooledMcpToolset
+from app.app_utils.model_tiering import TieredModel
+from app.app_utils.tool_result_cache import ToolResultCache, tool_ttls_from_env
+from app.context import auth_token_ctx, auth_user_ctx
+from app.router import create_intent_router
+from app.tools import get_current_time, render_link_card, render_task_card
 
-from app.context import auth_token_ctx
-from app.tools import get_current_time
-
-# The A2UI schema remains constant for all A2UI responses.
-A2UI_SCHEMA = r'''
-{
-  "title": "A2UI Message Schema",
-  "description": "Describes a JSON payload for an A2UI (Agent to UI) message, which is used to dynamically construct and update user interfaces. A message MUST contain exactly ONE of the action properties: 'beginRendering', 'surfaceUpdate', 'dataModelUpdate', or 'deleteSurface'.",
-  "type": "object",
-  "properties": {
-    "beginRendering": {
-      "type": "object",
-      "description": "Signals the client to begin rendering a surface with a root component and specific styles.",
-      "properties": {
-        "surfaceId": {
-          "type": "string",
-          "description": "The unique identifier for the UI surface to be rendered."
-        },
-        "root": {
-          "type": "string",
-          "description": "The ID of the root component to render."
-        },
-        "styles": {
-          "type": "object",
-          "description": "Styling information for the UI.",
-          "properties": {
-            "font": {
-              "type": "string",
-              "description": "The primary font for the UI."
-            },
-            "primaryColor": {
-              "type": "string",
-              "description": "The primary UI color as a hexadecimal code (e.g., '#00BFFF').",
-              "pattern": "^#[0-9a-fA-F]{6}$"
-            }
-          }
-        }
-      },
-      "required": ["root", "surfaceId"]
-    },
-    "surfaceUpdate": {
-      "type": "object",
-      "description": "Updates a surface with a new set of components.",
-      "properties": {
-        "surfaceId": {
-          "type": "string",
-          "description": "The unique identifier for the UI surface to be updated. If you are adding a new surface this *must* be a new, unique identified that has never been used for any existing surfaces shown."
-        },
-        "components": {
-          "type": "array",
-          "description": "A list containing all UI components for the surface.",
-          "minItems": 1,
-          "items": {
-            "type": "object",
-            "description": "Represents a *single* component in a UI widget tree. This component could be one of many supported types.",
-            "properties": {
-              "id": {
-                "type": "string",
-                "description": "The unique identifier for this component."
-              },
-              "weight": {
-                "type": "number",
-                "description": "The relative weight of this component within a Row or Column. This corresponds to the CSS 'flex-grow' property. Note: this may ONLY be set when the component is a direct descendant of a Row or Column."
-              },
-              "component": {
-                "type": "object",
-                "description": "A wrapper object that MUST contain exactly one key, which is the name of the component type (e.g., 'Heading'). The value is an object containing the properties for that specific component.",
-                "properties": {
-                  "Text": {
-                    "type": "object",
-                    "properties": {
-                      "text": {
-                        "type": "object",
-                        "description": "The text content to display. This can be a literal string or a reference to a value in the data model ('path', e.g., '/doc/title'). While simple Markdown formatting is supported (i.e. without HTML, images, or links), utilizing dedicated UI components is generally preferred for a richer and more structured presentation.",
-                        "properties": {
-                          "literalString": {
-                            "type": "string"
-                          },
-                          "path": {
-                            "type": "string"
-                          }
-                        }
-                      },
-                      "usageHint": {
-                        "type": "string",
-                        "description": "A hint for the base text style. One of:\n- `h1`: Largest heading.\n- `h2`: Second largest heading.\n- `h3`: Third largest heading.\n- `h4`: Fourth largest heading.\n- `h5`: Fifth largest heading.\n- `caption`: Small text for captions.\n- `body`: Standard body text.",
-                        "enum": [
-                          "h1",
-                          "h2",
-                          "h3",
-                          "h4",
-                          "h5",
-                          "caption",
-                          "body"
-                        ]
-                      }
-                    },
-                    "required": ["text"]
-                  },
-                  "Image": {
-                    "type": "object",
-                    "properties": {
-                      "url": {
-                        "type": "object",
-                        "description": "The URL of the image to display. This can be a literal string ('literal') or a reference to a value in the data model ('path', e.g. '/thumbnail/url').",
-                        "properties": {
-                          "literalString": {
-                            "type": "string"
-                          },
-                          "path": {
-                            "type": "string"
-                          }
-                        }
-                      },
-                      "fit": {
-                        "type": "string",
-                        "description": "Specifies how the image should be resized to fit its container. This corresponds to the CSS 'object-fit' property.",
-                        "enum": [
-                          "contain",
-                          "cover",
-                          "fill",
-                          "none",
-                          "scale-down"
-                        ]
-                      },
-                      "usageHint": {
-                        "type": "string",
-                        "description": "A hint for the image size and style. One of:\n- `icon`: Small square icon.\n- `avatar`: Circular avatar image.\n- `smallFeature`: Small feature image.\n- `mediumFeature`: Medium feature image.\n- `largeFeature`: Large feature image.\n- `header`: Full-width, full bleed, header image.",
-                        "enum": [
-                          "icon",
-                          "avatar",
-                          "smallFeature",
-                          "mediumFeature",
-                          "largeFeature",
-                          "header"
-                        ]
-                      }
-                    },
-                    "required": ["url"]
-                  },
-                  "Icon": {
-                    "type": "object",
-                    "properties": {
-                      "name": {
-                        "type": "object",
-                        "description": "The name of the icon to display. This can be a literal string or a reference to a value in the data model ('path', e.g. '/form/submit').",
-                        "properties": {
-                          "literalString": {
-                            "type": "string",
-                            "enum": [
-                              "accountCircle",
-                              "add",
-                              "arrowBack",
-                              "arrowForward",
-                              "attachFile",
-                              "calendarToday",
-                              "call",
-                              "camera",
-                              "check",
-                              "close",
-                              "delete",
-                              "download",
-                              "edit",
-                              "event",
-                              "error",
-                              "favorite",
-                              "favoriteOff",
-                              "folder",
-                              "help",
-                              "home",
-                              "info",
-                              "locationOn",
-                              "lock",
-                              "lockOpen",
-                              "mail",
-                              "menu",
-                              "moreVert",
-                              "moreHoriz",
-                              "notificationsOff",
-                              "notifications",
-                              "payment",
-                              "person",
-                              "phone",
-                              "photo",
-                              "print",
-                              "refresh",
-                              "search",
-                              "send",
-                              "settings",
-                              "share",
-                              "shoppingCart",
-                              "star",
-                              "starHalf",
-                              "starOff",
-                              "upload",
-                              "visibility",
-                              "visibilityOff",
-                              "warning"
-                            ]
-                          },
-                          "path": {
-                            "type": "string"
-                          }
-                        }
-                      }
-                    },
-                    "required": ["name"]
-                  },
-                  "Video": {
-                    "type": "object",
-                    "properties": {
-                      "url": {
-                        "type": "object",
-                        "description": "The URL of the video to display. This can be a literal string or a reference to a value in the data model ('path', e.g. '/video/url').",
-                        "properties": {
-                          "literalString": {
-                            "type": "string"
-                          },
-                          "path": {
-                            "type": "string"
-                          }
-                        }
-                      }
-                    },
-                    "required": ["url"]
-                  },
-                  "AudioPlayer": {
-                    "type": "object",
-                    "properties": {
-                      "url": {
-                        "type": "object",
-                        "description": "The URL of the audio to be played. This can be a literal string ('literal') or a reference to a value in the data model ('path', e.g. '/song/url').",
-                        "properties": {
-                          "literalString": {
-                            "type": "string"
-                          },
-                          "path": {
-                            "type": "string"
-                          }
-                        }
-                      },
-                      "description": {
-                        "type": "object",
-                        "description": "A description of the audio, such as a title or summary. This can be a literal string or a reference to a value in the data model ('path', e.g. '/song/title').",
-                        "properties": {
-                          "literalString": {
-                            "type": "string"
-                          },
-                          "path": {
-                            "type": "string"
-                          }
-                        }
-                      }
-                    },
-                    "required": ["url"]
-                  },
-                  "Row": {
-                    "type": "object",
-                    "properties": {
-                      "children": {
-                        "type": "object",
-                        "description": "Defines the children. Use 'explicitList' for a fixed set of children, or 'template' to generate children from a data list.",
-                        "properties": {
-                          "explicitList": {
-                            "type": "array",
-                            "items": {
-                              "type": "string"
-                            }
-                          },
-                          "template": {
-                            "type": "object",
-                            "description": "A template for generating a dynamic list of children from a data model list. `componentId` is the component to use as a template, and `dataBinding` is the path to the map of components in the data model. Values in the map will define the list of children.",
-                            "properties": {
-                              "componentId": {
-                                "type": "string"
-                              },
-                              "dataBinding": {
-                                "type": "string"
-                              }
-                            },
-                            "required": ["componentId", "dataBinding"]
-                          }
-                        }
-                      },
-                      "distribution": {
-                        "type": "string",
-                        "description": "Defines the arrangement of children along the main axis (horizontally). This corresponds to the CSS 'justify-content' property.",
-                        "enum": [
-                          "center",
-                          "end",
-                          "spaceAround",
-                          "spaceBetween",
-                          "spaceEvenly",
-                          "start"
-                        ]
-                      },
-                      "alignment": {
-                        "type": "string",
-                        "description": "Defines the alignment of children along the cross axis (vertically). This corresponds to the CSS 'align-items' property.",
-                        "enum": ["start", "center", "end", "stretch"]
-                      }
-                    },
-                    "required": ["children"]
-                  },
-                  "Column": {
-                    "type": "object",
-                    "properties": {
-                      "children": {
-                        "type": "object",
-                        "description": "Defines the children. Use 'explicitList' for a fixed set of children, or 'template' to generate children from a data list.",
-                        "properties": {
-                          "explicitList": {
-                            "type": "array",
-                            "items": {
-                              "type": "string"
-                            }
-                          },
-                          "template": {
-                            "type": "object",
-                            "description": "A template for generating a dynamic list of children from a data model list. `componentId` is the component to use as a template, and `dataBinding` is the path to the map of components in the data model. Values in the map will define the list of children.",
-                            "properties": {
-                              "componentId": {
-                                "type": "string"
-                              },
-                              "dataBinding": {
-                                "type": "string"
-                              }
-                            },
-                            "required": ["componentId", "dataBinding"]
-                          }
-                        }
-                      },
-                      "distribution": {
-                        "type": "string",
-                        "description": "Defines the arrangement of children along the main axis (vertically). This corresponds to the CSS 'justify-content' property.",
-                        "enum": [
-                          "start",
-                          "center",
-                          "end",
-                          "spaceBetween",
-                          "spaceAround",
-                          "spaceEvenly"
-                        ]
-                      },
-                      "alignment": {
-                        "type": "string",
-                        "description": "Defines the alignment of children along the cross axis (horizontally). This corresponds to the CSS 'align-items' property.",
-                        "enum": ["center", "end", "start", "stretch"]
-                      }
-                    },
-                    "required": ["children"]
-                  },
-                  "List": {
-                    "type": "object",
-                    "properties": {
-                      "children": {
-                        "type": "object",
-                        "description": "Defines the children. Use 'explicitList' for a fixed set of children, or 'template' to generate children from a data list.",
-                        "properties": {
-                          "explicitList": {
-                            "type": "array",
-                            "items": {
-                              "type": "string"
-                            }
-                          },
-                          "template": {
-                            "type": "object",
-                            "description": "A template for generating a dynamic list of children from a data model list. `componentId` is the component to use as a template, and `dataBinding` is the path to the map of components in the data model. Values in the map will define the list of children.",
-                            "properties": {
-                              "componentId": {
-                                "type": "string"
-                              },
-                              "dataBinding": {
-                                "type": "string"
-                              }
-                            },
-                            "required": ["componentId", "dataBinding"]
-                          }
-                        }
-                      },
-                      "direction": {
-                        "type": "string",
-                        "description": "The direction in which the list items are laid out.",
-                        "enum": ["vertical", "horizontal"]
-                      },
-                      "alignment": {
-                        "type": "string",
-                        "description": "Defines the alignment of children along the cross axis.",
-                        "enum": ["start", "center", "end", "stretch"]
-                      }
-                    },
-                    "required": ["children"]
-                  },
-                  "Card": {
-                    "type": "object",
-                    "properties": {
-                      "child": {
-                        "type": "string",
-                        "description": "The ID of the component to be rendered inside the card."
-                      }
-                    },
-                    "required": ["child"]
-                  },
-                  "Tabs": {
-                    "type": "object",
-                    "properties": {
-                      "tabItems": {
-                        "type": "array",
-                        "description": "An array of objects, where each object defines a tab with a title and a child component.",
-                        "items": {
-                          "type": "object",
-                          "properties": {
-                            "title": {
-                              "type": "object",
-                              "description": "The tab title. Defines the value as either a literal value or a path to data model value (e.g. '/options/title').",
-                              "properties": {
-                                "literalString": {
-                                  "type": "string"
-                                },
-                                "path": {
-                                  "type": "string"
-                                }
-                              }
-                            },
-                            "child": {
-                              "type": "string"
-                            }
-                          },
-                          "required": ["title", "child"]
-                        }
-                      }
-                    },
-                    "required": ["tabItems"]
-                  },
-                  "Divider": {
-                    "type": "object",
-                    "properties": {
-                      "axis": {
-                        "type": "string",
-                        "description": "The orientation of the divider.",
-                        "enum": ["horizontal", "vertical"]
-                      }
-                    }
-                  },
-                  "Modal": {
-                    "type": "object",
-                    "properties": {
-                      "entryPointChild": {
-                        "type": "string",
-                        "description": "The ID of the component that opens the modal when interacted with (e.g., a button)."
-                      },
-                      "contentChild": {
-                        "type": "string",
-                        "description": "The ID of the component to be displayed inside the modal."
-                      }
-                    },
-                    "required": ["entryPointChild", "contentChild"]
-                  },
-                  "Button": {
-                    "type": "object",
-                    "properties": {
-                      "child": {
-                        "type": "string",
-                        "description": "The ID of the component to display in the button, typically a Text component."
-                      },
-                      "primary": {
-                        "type": "boolean",
-                        "description": "Indicates if this button should be styled as the primary action."
-                      },
-                      "action": {
-                        "type": "object",
-                        "description": "The client-side action to be dispatched when the button is clicked. It includes the action's name and an optional context payload.",
-                        "properties": {
-                          "name": {
-                            "type": "string"
-                          },
-                          "context": {
-                            "type": "array",
-                            "items": {
-                              "type": "object",
-                              "properties": {
-                                "key": {
-                                  "type": "string"
-                                },
-                                "value": {
-                                  "type": "object",
-                                  "description": "Defines the value to be included in the context as either a literal value or a path to a data model value (e.g. '/user/name').",
-                                  "properties": {
-                                    "path": {
-                                      "type": "string"
-                                    },
-                                    "literalString": {
-                                      "type": "string"
-                                    },
-                                    "literalNumber": {
-                                      "type": "number"
-                                    },
-                                    "literalBoolean": {
-                                      "type": "boolean"
-                                    }
-                                  }
-                                }
-                              },
-                              "required": ["key", "value"]
-                            }
-                          }
-                        },
-                        "required": ["name"]
-                      }
-                    },
-                    "required": ["child", "action"]
-                  },
-                  "CheckBox": {
-                    "type": "object",
-                    "properties": {
-                      "label": {
-                        "type": "object",
-                        "description": "The text to display next to the checkbox. Defines the value as either a literal value or a path to data model ('path', e.g. '/option/label').",
-                        "properties": {
-                          "literalString": {
-                            "type": "string"
-                          },
-                          "path": {
-                            "type": "string"
-                          }
-                        }
-                      },
-                      "value": {
-                        "type": "object",
-                        "description": "The current state of the checkbox (true for checked, false for unchecked). This can be a literal boolean ('literalBoolean') or a reference to a value in the data model ('path', e.g. '/filter/open').",
-                        "properties": {
-                          "literalBoolean": {
-                            "type": "boolean"
-                          },
-                          "path": {
-                            "type": "string"
-                          }
-                        }
-                      }
-                    },
-                    "required": ["label", "value"]
-                  },
-                  "TextField": {
-                    "type": "object",
-                    "properties": {
-                      "label": {
-                        "type": "object",
-                        "description": "The text label for the input field. This can be a literal string or a reference to a value in the data model ('path, e.g. '/user/name').",
-                        "properties": {
-                          "literalString": {
-                            "type": "string"
-                          },
-                          "path": {
-                            "type": "string"
-                          }
-                        }
-                      },
-                      "text": {
-                        "type": "object",
-                        "description": "The value of the text field. This can be a literal string or a reference to a value in the data model ('path', e.g. '/user/name').",
-                        "properties": {
-                          "literalString": {
-                            "type": "string"
-                          },
-                          "path": {
-                            "type": "string"
-                          }
-                        }
-                      },
-                      "textFieldType": {
-                        "type": "string",
-                        "description": "The type of input field to display.",
-                        "enum": [
-                          "date",
-                          "longText",
-                          "number",
-                          "shortText",
-                          "obscured"
-                        ]
-                      },
-                      "validationRegexp": {
-                        "type": "string",
-                        "description": "A regular expression used for client-side validation of the input."
-                      }
-                    },
-                    "required": ["label"]
-                  },
-                  "DateTimeInput": {
-                    "type": "object",
-                    "properties": {
-                      "value": {
-                        "type": "object",
-                        "description": "The selected date and/or time value. This can be a literal string ('literalString') or a reference to a value in the data model ('path', e.g. '/user/dob').",
-                        "properties": {
-                          "literalString": {
-                            "type": "string"
-                          },
-                          "path": {
-                            "type": "string"
-                          }
-                        }
-                      },
-                      "enableDate": {
-                        "type": "boolean",
-                        "description": "If true, allows the user to select a date."
-                      },
-                      "enableTime": {
-                        "type": "boolean",
-                        "description": "If true, allows the user to select a time."
-                      },
-                      "outputFormat": {
-                        "type": "string",
-                        "description": "The desired format for the output string after a date or time is selected."
-                      }
-                    },
-                    "required": ["value"]
-                  },
-                  "MultipleChoice": {
-                    "type": "object",
-                    "properties": {
-                      "selections": {
-                        "type": "object",
-                        "description": "The currently selected values for the component. This can be a literal array of strings or a path to an array in the data model('path', e.g. '/hotel/options').",
-                        "properties": {
-                          "literalArray": {
-                            "type": "array",
-                            "items": {
-                              "type": "string"
-                            }
-                          },
-                          "path": {
-                            "type": "string"
-                          }
-                        }
-                      },
-                      "options": {
-                        "type": "array",
-                        "description": "An array of available options for the user to choose from.",
-                        "items": {
-                          "type": "object",
-                          "properties": {
-                            "label": {
-                              "type": "object",
-                              "description": "The text to display for this option. This can be a literal string or a reference to a value in the data model (e.g. '/option/label').",
-                              "properties": {
-                                "literalString": {
-                                  "type": "string"
-                                },
-                                "path": {
-                                  "type": "string"
-                                }
-                              }
-                            },
-                            "value": {
-                              "type": "string",
-                              "description": "The value to be associated with this option when selected."
-                            }
-                          },
-                          "required": ["label", "value"]
-                        }
-                      },
-                      "maxAllowedSelections": {
-                        "type": "integer",
-                        "description": "The maximum number of options that the user is allowed to select."
-                      }
-                    },
-                    "required": ["selections", "options"]
-                  },
-                  "Slider": {
-                    "type": "object",
-                    "properties": {
-                      "value": {
-                        "type": "object",
-                        "description": "The current value of the slider. This can be a literal number ('literalNumber') or a reference to a value in the data model ('path', e.g. '/restaurant/cost').",
-                        "properties": {
-                          "literalNumber": {
-                            "type": "number"
-                          },
-                          "path": {
-                            "type": "string"
-                          }
-                        }
-                      },
-                      "minValue": {
-                        "type": "number",
-                        "description": "The minimum value of the slider."
-                      },
-                      "maxValue": {
-                        "type": "number",
-                        "description": "The maximum value of the slider."
-                      }
-                    },
-                    "required": ["value"]
-                  }
-                }
-              }
-            },
-            "required": ["id", "component"]
-          }
-        }
-      },
-      "required": ["surfaceId", "components"]
-    },
-    "dataModelUpdate": {
-      "type": "object",
-      "description": "Updates the data model for a surface.",
-      "properties": {
-        "surfaceId": {
-          "type": "string",
-          "description": "The unique identifier for the UI surface this data model update applies to."
-        },
-        "path": {
-          "type": "string",
-          "description": "An optional path to a location within the data model (e.g., '/user/name'). If omitted, or set to '/', the entire data model will be replaced."
-        },
-        "contents": {
-          "type": "array",
-          "description": "An array of data entries. Each entry must contain a 'key' and exactly one corresponding typed 'value*' property.",
-          "items": {
-            "type": "object",
-            "description": "A single data entry. Exactly one 'value*' property should be provided alongside the key.",
-            "properties": {
-              "key": {
-                "type": "string",
-                "description": "The key for this data entry."
-              },
-              "valueString": {
-                "type": "string"
-              },
-              "valueNumber": {
-                "type": "number"
-              },
-              "valueBoolean": {
-                "type": "boolean"
-              },
-              "valueMap": {
-                "description": "Represents a map as an adjacency list.",
-                "type": "array",
-                "items": {
-                  "type": "object",
-                  "description": "One entry in the map. Exactly one 'value*' property should be provided alongside the key.",
-                  "properties": {
-                    "key": {
-                      "type": "string"
-                    },
-                    "valueString": {
-                      "type": "string"
-                    },
-                    "valueNumber": {
-                      "type": "number"
-                    },
-                    "valueBoolean": {
-                      "type": "boolean"
-                    }
-                  },
-                  "required": ["key"]
-                }
-              }
-            },
-            "required": ["key"]
-          }
-        }
-      },
-      "required": ["contents", "surfaceId"]
-    },
-    "deleteSurface": {
-      "type": "object",
-      "description": "Signals the client to delete the surface identified by 'surfaceId'.",
-      "properties": {
-        "surfaceId": {
-          "type": "string",
-          "description": "The unique identifier for the UI surface to be deleted."
-        }
-      },
-      "required": ["surfaceId"]
-    }
-  }
-}
-'''
 
 def get_auth_headers(context: Any) -> dict[str, str]:
     """Retrieve auth headers from the current context variable."""
@@ -800,8 +32,6 @@ def get_auth_headers(context: Any) -> dict[str, str]:
         return {"Authorization": f"Bearer {token}"}
     return {}
 
-_, project_id = google.auth.default()
-os.environ["GOOGLE_CLOUD_PROJECT"] = project_id
 os.environ["GOOGLE_CLOUD_LOCATION"] = "global"
 os.environ["GOOGLE_GENAI_USE_VERTEXAI"] = "True"
 
@@ -812,20 +42,41 @@ todo_agent_url = os.environ.get("TODO_AGENT_URL")
 stash_connection_params = StreamableHTTPConnectionParams(
     url=stash_mcp_url,
 )
-stash_tools = McpToolset(
+# Results of read-only tools can be cached per user (opt-in); any other tool call drops them.
+stash_result_cache = ToolResultCache(
+    "stash.tool_results",
+    tool_ttls_from_env(["get_stashed_links", "get_stash_stats"]),
+    max_users=int(os.environ.get("MCP_RESULT_CACHE_MAX_USERS", "1000")),
+)
+# MCP sessions are pooled per user, so follow-up turns skip the handshake,
+# and the tool list is cached, so model requests don't wait on list_tools.
+stash_tools = PooledMcpToolset(
     connection_params=stash_connection_params,
-    header_provider=get_auth_headers
+    header_provider=get_auth_headers,
+    session_key_provider=auth_user_ctx.get,
+    max_sessions=int(os.environ.get("MCP_SESSION_POOL_SIZE", "100")),
+    idle_ttl_seconds=float(os.environ.get("MCP_SESSION_IDLE_SECONDS", "300")),
+    health_check_seconds=float(os.environ.get("MCP_SESSION_HEALTH_CHECK_SECONDS", "60")),
+    tools_ttl_seconds=float(os.environ.get("MCP_TOOLS_CACHE_TTL_SECONDS", "3600")),
+    tools_snapshot_path=os.environ.get("STASH_TOOLS_SNAPSHOT_PATH"),
+    result_cache=stash_result_cache,
 )
 
 def create_authenticated_httpx_client(
     header_provider: Callable[[Any], dict[str, str]]
 ) -> httpx.AsyncClient:
     """
-    Create an httpx client that automatically injects auth headers from context.
-    
+    Create a pooled httpx client that automatically injects auth headers from context.
+
+    Pool size, keep-alive expiry, HTTP/2 and timeouts are read from the
+    `A2A_HTTP_*` environment variables (see `create_http_client`). The read
+    timeout defaults to 600s so long streamed sub-agent turns aren't cut off.
+    The app lifespan creates one per run and closes it on shutdown (see
+    fast_api_app.py), so its connections live on the serving event loop.
+
     Args:
         header_provider: Callable that returns a dict of headers to inject
-        
+
     Returns:
         Configured httpx.AsyncClient with auth event hooks
     """
@@ -833,37 +84,37 @@ def create_authenticated_httpx_client(
         auth_headers = header_provider(None)
         for key, value in auth_headers.items():
             request.headers[key] = value
-    
-    return httpx.AsyncClient(
-        event_hooks={"request": [add_auth_headers]}
+
+    return create_http_client(
+        "A2A_HTTP",
+        defaults={"READ_TIMEOUT_SECONDS": "600"},
+        event_hooks={"request": [add_auth_headers]},
     )
 
 
-# Create httpx client with auth headers from context
-# This handles ALL authentication for both HTTP and A2A protocol requests
-authenticated_httpx_client = create_authenticated_httpx_client(get_auth_headers)
+def create_a2a_client_factory(httpx_client: httpx.AsyncClient) -> ClientFactory:
+    """Create the A2A client factory for the todo-agent, sending through `httpx_client`."""
+    return ClientFactory(config=ClientConfig(httpx_client=httpx_client))
 
-# Configure A2A client
-a2a_client_config = ClientConfig(httpx_client=authenticated_httpx_client)
 
-# Create client factory with authenticated config
-a2a_client_factory = ClientFactory(config=a2a_client_config)
+# The todo-agent card is revalidated in the background and snapshotted to
+# disk, so neither startup nor the first delegation waits on the todo-agent.
+# The refresh is started by the app lifespan (see fast_api_app.py).
+todo_agent_card_cache = AgentCardCache(
+    f"{todo_agent_url}{AGENT_CARD_WELL_KNOWN_PATH}",
+    snapshot_path=os.environ.get(
+        "TODO_AGENT_CARD_SNAPSHOT_PATH", os.path.join(tempfile.gettempdir(), "todo-agent-card.json")
+    ),
+    refresh_interval_seconds=float(os.environ.get("TODO_AGENT_CARD_REFRESH_SECONDS", "300")),
+)
 
-todo_agent_remote = RemoteA2aAgent(
+todo_agent_remote = CachedRemoteA2aAgent(
+    card_cache=todo_agent_card_cache,
     name="todo_agent",
     description="Dedicated agent for managing tasks, reminders, and to-do lists.",
-    agent_card=f"{todo_agent_url}{AGENT_CARD_WELL_KNOWN_PATH}",
-    a2a_client_factory=a2a_client_factory
 )
 
-paa_agent = Agent(
-    name="personal_assistant_agent",
-    model=Gemini(
-        model=os.environ.get("MODEL", "gemini-3-flash-preview"),
-        retry_options=types.HttpRetryOptions(attempts=3),
-    ),
-    description="The primary personal assistant. It can save links, manage tasks, and coordinate complex requests involving multiple services.",
-    instruction="""
+PAA_STATIC_INSTRUCTION = """
     You are the Personal Assistant Agent (PAA), the root orchestrator for the user's personal microsystem.
 
     ### Capabilities
@@ -875,68 +126,108 @@ paa_agent = Agent(
         - Provide clear instructions for the sub-agent (e.g., "Add 'Buy milk' to the Groceries list due tomorrow").
 
     ### A2UI Support (Visual Cards)
-    When the user asks to "show details" or "view" a specific Task or Link, you MUST output a a2ui UI JSON response.
-    
-    **CRITICAL: To generate the response, you MUST follow these rules:**
-    1.  Output a raw JSON object which is a list of A2UI messages.
-    2.  The JSON part MUST validate against the A2UI JSON SCHEMA provided below.
-
-    ---BEGIN TASK DETAIL CARD EXAMPLE---
-    [
-      {{"beginRendering": {{"surfaceId": "main", "root": "card"}}}},
-      {{
-        "surfaceUpdate": {{
-          "surfaceId": "main",
-          "components": [
-            {{ "id": "card", "component": {{ "Card": {{ "child": "col" }} }} }},
-            {{ "id": "col", "component": {{ "Column": {{ "children": {{ "explicitList": ["title", "status", "due", "desc"] }} }} }} }},
-            {{ "id": "title", "component": {{ "Text": {{ "text": {{"literalString": "<Task Title>"}, "usageHint": "h1" }} }} }},
-            {{ "id": "status", "component": {{ "Text": {{ "text": {{"literalString": "Status: <Status> | Priority: <Priority>"}} }} }} }},
-            {{ "id": "due", "component": {{ "Text": {{ "text": {{"literalString": "Due: <DueDate>"}} }} }} }},
-            {{ "id": "desc", "component": {{ "Text": {{ "text": {{"literalString": "<Description or 'No description'>"}} }} }} }}
-          ]
-        }}
-      }}
-    ]
-    
-    ---BEGIN LINK DETAIL CARD EXAMPLE---
-    [
-      {{"beginRendering": {{"surfaceId": "main", "root": "card"}}}},
-      {{
-        "surfaceUpdate": {{
-          "surfaceId": "main",
-          "components": [
-            {{ "id": "card", "component": {{ "Card": {{ "child": "col" }} }} }},
-            {{ "id": "col", "component": {{ "Column": {{ "children": {{ "explicitList": ["img", "title", "url", "summary"] }} }} }} }},
-            {{ "id": "img", "component": {{ "Image": {{ "url": {{"literalString": "<Image URL or placeholder>"}} } } } }},
-            {{ "id": "title", "component": {{ "Text": {{ "text": {{"literalString": "<Page Title>"}}, "usageHint": "h1" }} }} }},
-            {{ "id": "url", "component": {{ "Text": {{ "text": {{"literalString": "<URL>"}} } } } }},
-            {{ "id": "summary", "component": {{ "Text": {{ "text": {{"literalString": "<Summary or 'No summary'>"}} } } } }}
-          ]
-        }}
-      }}
-    ]
-
-    ---BEGIN A2UI JSON SCHEMA---
-    {A2UI_SCHEMA}
-    ---END A2UI JSON SCHEMA---
+    When the user asks to "show details" or "view" a specific Task or Link, call `render_task_card` or
+    `render_link_card` with the ID of that record; its fields are taken from the conversation and the card
+    is sent to the user as-is.
+    The A2UI rules, card examples and JSON schema are attached to those requests.
 
     ### Orchestration Strategies
     - **Single Intent**: Route directly to the relevant tool.
         - "Save this link" -> Stash.
         - "Remind me to call Customer A" -> Delegate to 'todo_agent'.
-    - **Hybrid Intent**: Break down the request and execute in logical order.
-        - "Save this article and remind me to read it weekend" -> 
-            1. Save to Stash (get title/metadata).
-            2. Delegate to 'todo_agent' with the specific task details (using the title from Stash if available).
+    - **Hybrid Intent**: Break down the request into its sub-operations.
+        - Independent sub-operations go out together: if the task doesn't need anything from Stash, call the
+          Stash tool and transfer to 'todo_agent' in the same turn, with the acknowledgment as text.
+            - "Save https://example.com/post and remind me to read it this weekend" -> "I'll save the link and
+              ask the Todo agent to add the reminder.", `stash_link`, then `transfer_to_agent` ('todo_agent').
+        - Dependent sub-operations run in order.
+            - "Save this article and add a task named after it" ->
+                1. Save to Stash (get title/metadata).
+                2. Delegate to 'todo_agent' with the specific task details, using the title from Stash.
 
     ### Critical Rules
     - **Acknowledge Delegation**: Before delegating a task to the 'todo_agent', always provide a brief acknowledgment to the user (e.g., "I'll ask the Todo agent to handle that for you.").
     - **Credential Forwarding**: You automatically forward the user's auth context. Do not ask for credentials.
     - **Resilience**: If a tool fails, inform the user gracefully.
-    """.replace("{A2UI_SCHEMA}", A2UI_SCHEMA.replace("{", "{{").replace("}", "}}")),
-    tools=[get_current_time, stash_tools],
-    sub_agents=[todo_agent_remote]
+    """
+
+
+def create_context_cache_config() -> ContextCacheConfig | None:
+    """
+    Build the context cache configuration from the environment.
+
+    Context caching is opt-in (CONTEXT_CACHE_ENABLED=true). When enabled, the
+    static instruction and tool declarations are registered as cached content
+    with the model backend on the second model call of a session and referenced
+    by name afterwards; ADK re-creates the cache when it expires or after
+    CONTEXT_CACHE_INTERVALS invocations.
+
+    Returns:
+        The ContextCacheConfig for the App, or None when caching is disabled.
+    """
+    if os.environ.get("CONTEXT_CACHE_ENABLED", "false").lower() != "true":
+        return None
+    return ContextCacheConfig(
+        ttl_seconds=int(os.environ.get("CONTEXT_CACHE_TTL_SECONDS", "1800")),
+        cache_intervals=int(os.environ.get("CONTEXT_CACHE_INTERVALS", "10")),
+        min_tokens=int(os.environ.get("CONTEXT_CACHE_MIN_TOKENS", "4096")),
+    )
+
+
+def create_model() -> BaseLlm:
+    """
+    Build the agent's model from the environment.
+
+    Model tiering is opt-in (FAST_MODEL). When set, calls that `is_simple_turn`
+    judges simple go to FAST_MODEL, and are escalated to MODEL when the fast
+    answer fails, has a malformed or unknown function call, or its average
+    log-probability is below FAST_MODEL_MIN_AVG_LOGPROBS (if set).
+
+    Returns:
+        MODEL, or a TieredModel of FAST_MODEL and MODEL.
+    """
+    strong = Gemini(
+        model=os.environ.get("MODEL", "gemini-3-flash-preview"),
+        retry_options=types.HttpRetryOptions(attempts=3),
+    )
+    fast_model = os.environ.get("FAST_MODEL")
+    if not fast_model:
+        return strong
+    min_avg_logprobs = os.environ.get("FAST_MODEL_MIN_AVG_LOGPROBS")
+    return TieredModel(
+        # Not retried: a failed fast call is escalated instead.
+        fast=Gemini(model=fast_model, retry_options=types.HttpRetryOptions(attempts=1)),
+        strong=strong,
+        min_avg_logprobs=float(min_avg_logprobs) if min_avg_logprobs else None,
+    )
+
+
+context_cache_config = create_context_cache_config()
+
+# With INTENT_ROUTER_ENABLED=true, plain Stash requests ("save https://...",
+# "list my links") are answered from the Stash tools and plain task listings
+# are transferred to the todo-agent, without a model call.
+intent_router = (
+    create_intent_router(stash_tools, todo_agent_remote.name)
+    if os.environ.get("INTENT_ROUTER_ENABLED", "false").lower() == "true"
+    else None
+)
+
+# With caching enabled the instruction is sent as a static system instruction
+# so it forms a stable, cacheable prefix. The A2UI guide is attached per
+# request by `attach_a2ui_guide` on "show details" / "view" turns only, and
+# cards from the render tools are returned by `emit_rendered_card` directly.
+# Any other A2UI the model writes is validated and repaired before it is sent.
+paa_agent = Agent(
+    name="personal_assistant_agent",
+    model=create_model(),
+    description="The primary personal assistant. It can save links, manage tasks, and coordinate complex requests involving multiple services.",
+    static_instruction=PAA_STATIC_INSTRUCTION if context_cache_config else None,
+    instruction="" if context_cache_config else PAA_STATIC_INSTRUCTION,
+    tools=[get_current_time, render_task_card, render_link_card, stash_tools],
+    sub_agents=[todo_agent_remote],
+    before_model_callback=([intent_router] if intent_router else []) + [emit_rendered_card, attach_a2ui_guide],
+    after_model_callback=([intent_router.after_model] if intent_router else []) + [A2UIResponseValidator()],
 )
 
-app = App(root_agent=paa_agent, name="app")
+app = App(root_agent=paa_agent, name="app", context_cache_config=context_cache_config)
@@ -0,0 +1,172 @@
+import asyncio
+import json
+import logging
+import os
+import time
+from collections.abc import Callable
+
+import httpx
+from a2a.client import ClientFactory
+from a2a.types import AgentCard
+
+from app.app_utils.a2a_streaming import StreamingRemoteA2aAgent
+
+logger = logging.getLogger(__name__)
+
+
+class AgentCardCache:
+    """
+    Keeps a remote agent's card in memory, revalidated in the background.
+
+    The card is fetched with `If-None-Match` so an unchanged card costs a
+    `304 Not Modified`, and every new version is written to a snapshot file.
+    On a cold start the snapshot is loaded instead of waiting on the remote
+    agent; only a start without a snapshot has to wait for the first fetch.
+    """
+
+    def __init__(
+        self,
+        url: str,
+        snapshot_path: str | None = None,
+        refresh_interval_seconds: float = 300,
+    ) -> None:
+        self.url = url
+        self.snapshot_path = snapshot_path
+        self.refresh_interval_seconds = refresh_interval_seconds
+        # Optional shared client; a short-lived one is used when unset.
+        self.http_client: httpx.AsyncClient | None = None
+        self.card: AgentCard | None = None
+        self.etag: str | None = None
+        self.fetch_count = 0
+        self.not_modified_count = 0
+        self._listeners: list[Callable[[AgentCard], None]] = []
+        self._refresh_task: asyncio.Task | None = None
+        self._run_task: asyncio.Task | None = None
+
+    def on_change(self, listener: Callable[[AgentCard], None]) -> None:
+        """Call `listener` with the new card whenever a changed card is loaded."""
+        self._listeners.append(listener)
+
+    async def get(self) -> AgentCard:
+        """Return the card, fetching it only if there is none yet."""
+        if self.card is None:
+            await self.refresh()
+        if self.card is None:
+            raise ValueError(f"Agent card {self.url} is not available")
+        return self.card
+
+    async def refresh(self) -> None:
+        """Revalidate the card, sharing a single in-flight fetch among callers."""
+        loop = asyncio.get_running_loop()
+        task = self._refresh_task
+        if task is None or task.done() or task.get_loop() is not loop:
+            task = loop.create_task(self._fetch())
+            self._refresh_task = task
+        await asyncio.shield(task)
+
+    async def start(self) -> None:
+        """Load the snapshot and start revalidating in the background, without waiting on the network."""
+        self.load_snapshot()
+        self._run_task = asyncio.get_running_loop().create_task(self.run())
+
+    async def aclose(self) -> None:
+        """Stop the background refresh."""
+        tasks = [task for task in (self._run_task, self._refresh_task) if task is not None]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._run_task = None
+
+    async def run(self) -> None:
+        """Revalidate the card every `refresh_interval_seconds`, until cancelled."""
+        while True:
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.warning(f"Failed to refresh agent card from {self.url}: {e}")
+            await asyncio.sleep(self.refresh_interval_seconds)
+
+    def load_snapshot(self) -> bool:
+        """Load the card from the snapshot file, if there is one."""
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return False
+        try:
+            with open(self.snapshot_path, encoding="utf-8") as f:
+                snapshot = json.load(f)
+            if snapshot.get("url") != self.url:
+                return False
+            self._set_card(AgentCard.model_validate(snapshot["card"]), snapshot.get("etag"))
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable agent card snapshot {self.snapshot_path}: {e}")
+            return False
+        logger.info(f"Loaded agent card for {self.url} from {self.snapshot_path}")
+        return True
+
+    def _write_snapshot(self, card_json: dict) -> None:
+        if not self.snapshot_path:
+            return
+        snapshot = {"url": self.url, "etag": self.etag, "fetched_at": time.time(), "card": card_json}
+        tmp_path = f"{self.snapshot_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.snapshot_path) or ".", exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f)
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError as e:
+            logger.warning(f"Failed to write agent card snapshot {self.snapshot_path}: {e}")
+
+    async def _fetch(self) -> None:
+        headers = {"If-None-Match": self.etag} if self.etag and self.card else {}
+        if self.http_client is not None:
+            resp = await self.http_client.get(self.url, headers=headers)
+        else:
+            async with httpx.AsyncClient(timeout=10.0) as client:
+                resp = await client.get(self.url, headers=headers)
+        self.fetch_count += 1
+        if resp.status_code == 304:
+            self.not_modified_count += 1
+            return
+        resp.raise_for_status()
+
+        card_json = resp.json()
+        self._set_card(AgentCard.model_validate(card_json), resp.headers.get("ETag"))
+        self._write_snapshot(card_json)
+
+    def _set_card(self, card: AgentCard, etag: str | None) -> None:
+        changed = card != self.card
+        self.card = card
+        self.etag = etag
+        if changed:
+            logger.info(f"Agent card for {self.url} is now version {card.version}")
+            for listener in self._listeners:
+                listener(card)
+
+
+class CachedRemoteA2aAgent(StreamingRemoteA2aAgent):
+    """A `StreamingRemoteA2aAgent` that resolves its agent card from an `AgentCardCache`."""
+
+    def __init__(self, card_cache: AgentCardCache, **kwargs) -> None:
+        super().__init__(agent_card=card_cache.url, **kwargs)
+        self._card_cache = card_cache
+        card_cache.on_change(self._reset_resolution)
+
+    async def _resolve_agent_card(self) -> AgentCard:
+        return await self._card_cache.get()
+
+    def use_a2a_client_factory(self, factory: ClientFactory | None) -> None:
+        """
+        Send A2A calls with clients from `factory`, or with ADK's own client if None.
+
+        The factory's httpx client is owned by the caller (the app lifespan),
+        so it isn't closed with the agent.
+        """
+        self._a2a_client_factory = factory
+        self._httpx_client = factory._config.httpx_client if factory else None
+        self._httpx_client_needs_cleanup = False
+        self._a2a_client = None
+
+    def _reset_resolution(self, card: AgentCard) -> None:
+        # Re-create the A2A client for the new card on the next call.
+        self._agent_card = None
+        self._a2a_client = None
+        self._is_resolved = False
@@ -0,0 +1,180 @@
+import importlib.util
+import logging
+import os
+import time
+import weakref
+from collections.abc import Iterable, Mapping
+
+import httpx
+from opentelemetry import metrics
+
+from app.app_utils.metrics import meter
+
+logger = logging.getLogger(__name__)
+
+_transports: "weakref.WeakSet[PoolMetricsTransport]" = weakref.WeakSet()
+
+
+def _observe_connections(_options: metrics.CallbackOptions) -> Iterable[metrics.Observation]:
+    for transport in list(_transports):
+        active, idle = transport.connection_counts()
+        yield metrics.Observation(active, {"client": transport.name, "state": "active"})
+        yield metrics.Observation(idle, {"client": transport.name, "state": "idle"})
+
+
+def _observe_queued(_options: metrics.CallbackOptions) -> Iterable[metrics.Observation]:
+    for transport in list(_transports):
+        yield metrics.Observation(transport.queued_requests, {"client": transport.name})
+
+
+pool_wait_time = meter.create_histogram(
+    "http_client.pool.wait_time",
+    unit="ms",
+    description="Time a request waited for a pooled connection, by client.",
+)
+meter.create_observable_gauge(
+    "http_client.pool.connections",
+    callbacks=[_observe_connections],
+    description="Open pooled connections, by client and state (active/idle).",
+)
+meter.create_observable_gauge(
+    "http_client.pool.queued_requests",
+    callbacks=[_observe_queued],
+    description="Requests waiting for a pooled connection, by client.",
+)
+
+
+class PoolMetricsTransport(httpx.AsyncHTTPTransport):
+    """
+    An `httpx.AsyncHTTPTransport` that reports connection pool saturation.
+
+    The wait for a connection is measured up to the first httpcore trace
+    event, which the connection emits once the pool has assigned it.
+    """
+
+    def __init__(self, name: str, **kwargs) -> None:
+        super().__init__(**kwargs)
+        self.name = name
+        self.queued_requests = 0
+        _transports.add(self)
+
+    def connection_counts(self) -> tuple[int, int]:
+        """Return the number of active and idle connections in the pool."""
+        connections = self._pool.connections
+        idle = sum(1 for connection in connections if connection.is_idle())
+        return len(connections) - idle, idle
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        started = time.perf_counter()
+        waiting = True
+        self.queued_requests += 1
+        previous_trace = request.extensions.get("trace")
+
+        def assigned() -> None:
+            nonlocal waiting
+            if waiting:
+                waiting = False
+                self.queued_requests -= 1
+                pool_wait_time.record((time.perf_counter() - started) * 1000, {"client": self.name})
+
+        async def trace(event_name: str, info: dict) -> None:
+            assigned()
+            if previous_trace is not None:
+                await previous_trace(event_name, info)
+
+        request.extensions = {**request.extensions, "trace": trace}
+        try:
+            return await super().handle_async_request(request)
+        finally:
+            assigned()
+
+
+def _env(prefix: str, name: str, defaults: Mapping[str, str]) -> str:
+    return os.environ.get(f"{prefix}_{name}", defaults[name])
+
+
+DEFAULTS = {
+    "MAX_CONNECTIONS": "100",
+    "MAX_KEEPALIVE_CONNECTIONS": "20",
+    "KEEPALIVE_EXPIRY_SECONDS": "30",
+    "CONNECT_TIMEOUT_SECONDS": "5",
+    "READ_TIMEOUT_SECONDS": "10",
+    "WRITE_TIMEOUT_SECONDS": "10",
+    "POOL_TIMEOUT_SECONDS": "5",
+    "HTTP2": "true",
+}
+
+
+def _limits(env_prefix: str, defaults: Mapping[str, str]) -> tuple[httpx.Limits, bool]:
+    limits = httpx.Limits(
+        max_connections=int(_env(env_prefix, "MAX_CONNECTIONS", defaults)),
+        max_keepalive_connections=int(_env(env_prefix, "MAX_KEEPALIVE_CONNECTIONS", defaults)),
+        keepalive_expiry=float(_env(env_prefix, "KEEPALIVE_EXPIRY_SECONDS", defaults)),
+    )
+    http2 = _env(env_prefix, "HTTP2", defaults).lower() == "true"
+    if http2 and importlib.util.find_spec("h2") is None:
+        logger.warning(f"{env_prefix}_HTTP2 is enabled but the 'h2' package is not installed; using HTTP/1.1")
+        http2 = False
+    return limits, http2
+
+
+def create_http_transport(
+    env_prefix: str, defaults: Mapping[str, str] | None = None
+) -> PoolMetricsTransport:
+    """
+    Create a pooled, keep-alive transport configured from the environment.
+
+    Use this instead of `create_http_client` when several short-lived clients
+    (e.g. one per MCP session) should share one connection pool. Only the
+    pool settings of `create_http_client` apply; timeouts are set per client.
+
+    Args:
+        env_prefix: Prefix of the environment variables, e.g. "MCP_HTTP".
+        defaults: Overrides of `DEFAULTS` for this transport, keyed by setting name.
+
+    Returns:
+        Configured PoolMetricsTransport
+    """
+    limits, http2 = _limits(env_prefix, {**DEFAULTS, **(defaults or {})})
+    return PoolMetricsTransport(env_prefix.lower(), limits=limits, http2=http2)
+
+
+def create_http_client(
+    env_prefix: str, defaults: Mapping[str, str] | None = None, **kwargs
+) -> httpx.AsyncClient:
+    """
+    Create a pooled, keep-alive httpx client configured from the environment.
+
+    The client is meant to be created once in the FastAPI lifespan, shared by
+    every request, and closed on shutdown. Its connection pool reports the
+    `http_client.pool.*` metrics, labelled with the lowercased `env_prefix`.
+
+    Environment variables (all optional, prefixed with `env_prefix`):
+        {prefix}_MAX_CONNECTIONS: Maximum number of concurrent connections.
+        {prefix}_MAX_KEEPALIVE_CONNECTIONS: Idle connections kept in the pool.
+        {prefix}_KEEPALIVE_EXPIRY_SECONDS: How long an idle connection is kept.
+        {prefix}_CONNECT_TIMEOUT_SECONDS: Timeout for establishing a connection.
+        {prefix}_READ_TIMEOUT_SECONDS: Timeout for reading a response.
+        {prefix}_WRITE_TIMEOUT_SECONDS: Timeout for sending a request.
+        {prefix}_POOL_TIMEOUT_SECONDS: Timeout for acquiring a pooled connection.
+        {prefix}_HTTP2: Whether to negotiate HTTP/2 ("true"/"false").
+
+    Args:
+        env_prefix: Prefix of the environment variables, e.g. "AUTH_HTTP".
+        defaults: Overrides of `DEFAULTS` for this client, keyed by setting name.
+        **kwargs: Extra arguments passed through to `httpx.AsyncClient`.
+
+    Returns:
+        Configured httpx.AsyncClient
+    """
+    defaults = {**DEFAULTS, **(defaults or {})}
+    timeout = httpx.Timeout(
+        connect=float(_env(env_prefix, "CONNECT_TIMEOUT_SECONDS", defaults)),
+        read=float(_env(env_prefix, "READ_TIMEOUT_SECONDS", defaults)),
+        write=float(_env(env_prefix, "WRITE_TIMEOUT_SECONDS", defaults)),
+        pool=float(_env(env_prefix, "POOL_TIMEOUT_SECONDS", defaults)),
+    )
+    limits, http2 = _limits(env_prefix, defaults)
+    if "transport" not in kwargs:
+        kwargs["transport"] = PoolMetricsTransport(env_prefix.lower(), limits=limits, http2=http2)
+    return httpx.AsyncClient(limits=limits, timeout=timeout, http2=http2, **kwargs)
@@ -0,0 +1,177 @@
+import json
+import logging
+import re
+import time
+from collections.abc import Awaitable, Callable, Iterable
+from dataclasses import dataclass
+from typing import Any
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.adk.tools.base_toolset import BaseToolset
+from google.genai import types
+
+from app.app_utils.cache import TTLCache
+from app.app_utils.metrics import meter
+
+logger = logging.getLogger(__name__)
+
+router_decisions = meter.create_counter(
+    "router.decisions",
+    description="Pre-model router decisions, by agent, route and outcome (routed, fallthrough, error).",
+)
+router_latency_saved = meter.create_histogram(
+    "router.latency_saved",
+    unit="ms",
+    description="Estimated model latency saved by answering a request without the model, by agent and route.",
+)
+
+# ADK forwards other agents' messages to a sub-agent after this part.
+CONTEXT_MARKER = "For context:"
+
+# Optional trailing punctuation of a whole-message pattern.
+MESSAGE_END = r"\s*[.?!]*"
+_LIST_NAME = r"(?P<name>[\w'&-]+(?:\s+[\w'&-]+){0,3}?)"
+
+# Plain task listings, shared by both agents' routers: the todo-agent answers
+# them from Checkmate, and the PAA transfers them to the todo-agent. Only the
+# todo-agent routes list contents, since it checks the name with `get_lists`.
+LIST_TASKS_PATTERN = re.compile(
+    rf"(?:please\s+)?(?:show|list|get|what\s+are)\s+(?:me\s+)?(?:all\s+)?my\s+(?:tasks|to-?dos?){MESSAGE_END}",
+    re.IGNORECASE,
+)
+LIST_CONTENTS_PATTERNS = [
+    re.compile(rf"what(?:'s|\s+is)\s+(?:in|on)\s+(?:my\s+|the\s+)?{_LIST_NAME}(?:\s+list)?{MESSAGE_END}", re.IGNORECASE),
+    re.compile(rf"(?:show|list)\s+(?:me\s+)?(?:my\s+|the\s+)?{_LIST_NAME}\s+list{MESSAGE_END}", re.IGNORECASE),
+]
+
+Handler = Callable[[re.Match, CallbackContext], Awaitable[LlmResponse | None]]
+
+
+@dataclass(frozen=True)
+class Route:
+    """
+    A high-confidence intent, answered without the model.
+
+    Attributes:
+        name: Route name, reported in metrics.
+        pattern: Must match the whole user message.
+        handle: Answers the matched message, or returns None to fall through
+            to the model.
+        model_calls_saved: Model round trips the model would have needed.
+    """
+
+    name: str
+    pattern: re.Pattern
+    handle: Handler
+    model_calls_saved: int = 2
+
+
+def user_message(callback_context: CallbackContext, llm_request: LlmRequest) -> str | None:
+    """Return the user's message on the first model call of a turn, or None on later calls."""
+    if not llm_request.contents:
+        return None
+    last = llm_request.contents[-1]
+    if last.role != "user" or any(part.function_response for part in last.parts or []):
+        return None
+    user_content = callback_context.user_content
+    texts = []
+    for part in (user_content.parts if user_content else None) or []:
+        if part.text == CONTEXT_MARKER:
+            break
+        if part.text:
+            texts.append(part.text)
+    return " ".join(texts).strip() or None
+
+
+def text_response(text: str) -> LlmResponse:
+    """A final model response with `text`."""
+    return LlmResponse(content=types.Content(role="model", parts=[types.Part(text=text)]))
+
+
+async def call_tool(toolset: BaseToolset, name: str, args: dict[str, Any], callback_context: CallbackContext) -> Any:
+    """
+    Call tool `name` of `toolset` as the model would, and return its JSON result.
+
+    The callback context stands in for the tool context, so a tool that asks
+    for confirmation or credentials fails and the route falls through to the
+    model. Returns None if there is no such tool, or it returns an error or
+    no JSON.
+    """
+    tools = {tool.name: tool for tool in await toolset.get_tools(callback_context)}
+    tool = tools.get(name)
+    if tool is None:
+        return None
+    result = await tool.run_async(args=args, tool_context=callback_context)
+    if not isinstance(result, dict) or result.get("isError"):
+        return None
+    text = "".join(part.get("text", "") for part in result.get("content") or [] if part.get("type") == "text")
+    try:
+        return json.loads(text)
+    except ValueError:
+        return None
+
+
+class IntentRouter:
+    """
+    A before-model callback that answers trivially structured requests without the model.
+
+    On the first model call of a turn, the user's message is matched against
+    each route's pattern in order, and the first route that matches answers
+    it. Anything else, and any route that is unsure or fails, falls through
+    to the model. `after_model` times the model calls, so the latency saved
+    by a routed request can be estimated from the recent model round trips.
+    """
+
+    def __init__(self, agent_name: str, routes: Iterable[Route], model_round_trip_ms: float = 1500) -> None:
+        self.agent_name = agent_name
+        self.routes = list(routes)
+        # Moving average of the model round trip; the default is a guess until one has been timed.
+        self.model_round_trip_ms = model_round_trip_ms
+        self._model_calls = TTLCache("router.model_calls", max_size=1000, ttl_seconds=600)
+
+    async def __call__(self, callback_context: CallbackContext, llm_request: LlmRequest) -> LlmResponse | None:
+        text = user_message(callback_context, llm_request)
+        response = await self._route(text, callback_context) if text else None
+        if response is None:
+            self._model_calls.set(callback_context.invocation_id, time.perf_counter())
+        return response
+
+    async def _route(self, text: str, callback_context: CallbackContext) -> LlmResponse | None:
+        for route in self.routes:
+            match = route.pattern.fullmatch(text)
+            if match is None:
+                continue
+            started = time.perf_counter()
+            try:
+                response = await route.handle(match, callback_context)
+            except Exception as e:
+                logger.warning(f"Route {route.name} of {self.agent_name} failed; falling through to the model: {e}")
+                self._record(route.name, "error")
+                return None
+            if response is None:
+                self._record(route.name, "fallthrough")
+                return None
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self._record(route.name, "routed")
+            router_latency_saved.record(
+                route.model_calls_saved * self.model_round_trip_ms - elapsed_ms,
+                {"agent": self.agent_name, "route": route.name},
+            )
+            return response
+        self._record("none", "fallthrough")
+        return None
+
+    def after_model(self, callback_context: CallbackContext, llm_response: LlmResponse) -> LlmResponse | None:
+        """After-model callback that times the model round trips of requests that fell through."""
+        if llm_response.partial:
+            return None
+        started = self._model_calls.get(callback_context.invocation_id)
+        if started is not None:
+            self._model_calls.invalidate(callback_context.invocation_id)
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            self.model_round_trip_ms = 0.8 * self.model_round_trip_ms + 0.2 * elapsed_ms
+        return None
+
+    def _record(self, route: str, outcome: str) -> None:
+        router_decisions.add(1, {"agent": self.agent_name, "route": route, "outcome": outcome})
@@ -0,0 +1,144 @@
+import logging
+import re
+import time
+from collections.abc import AsyncGenerator, Callable
+
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.genai import types
+
+from app.app_utils.metrics import meter
+
+logger = logging.getLogger(__name__)
+
+model_latency = meter.create_histogram(
+    "model.latency",
+    unit="ms",
+    description="Model call latency, by tier and model.",
+)
+model_tokens = meter.create_counter(
+    "model.tokens",
+    description="Model tokens, by tier, model and kind (prompt, output).",
+)
+model_turns = meter.create_counter(
+    "model.turns",
+    description="Model calls, by tier, model and outcome (ok, escalated).",
+)
+
+SIMPLE_MAX_CHARS = 300
+SIMPLE_MAX_RESULT_CHARS = 4000
+# Words that usually mean several steps, conditions or a plan.
+COMPLEX_PATTERN = re.compile(
+    r"\b(?:and|then|also|after|before|unless|if|every|each|plan|compare|all of)\b|https?://",
+    re.IGNORECASE,
+)
+
+
+def is_simple_turn(llm_request: LlmRequest) -> bool:
+    """
+    A cheap judgement of whether a model call is simple.
+
+    Simple calls confirm or present modest tool results, or answer a short
+    single-intent message. Only the contents after the model's last turn (the
+    new message or tool results, and any request-only content) are looked at.
+    """
+    trailing = []
+    for content in reversed(llm_request.contents):
+        if content.role == "model":
+            break
+        trailing.extend(content.parts or [])
+    results = [part.function_response for part in trailing if part.function_response]
+    if results:
+        return sum(len(str(result.response)) for result in results) <= SIMPLE_MAX_RESULT_CHARS
+    text = " ".join(part.text for part in trailing if part.text)
+    return 0 < len(text) <= SIMPLE_MAX_CHARS and not COMPLEX_PATTERN.search(text)
+
+
+class TieredModel(BaseLlm):
+    """
+    Sends simple model calls to a fast model and the rest to a strong one.
+
+    `is_simple` judges each call (see `is_simple_turn`). A fast response is
+    escalated, i.e. the call is repeated with the strong model, when it fails,
+    is empty, has a malformed or unknown function call, or its average token
+    log-probability is below `min_avg_logprobs`. So that it can still be
+    replaced, the fast response is streamed only once it is complete. The fast
+    model doesn't use the context cache, which belongs to the strong model.
+
+    Attributes:
+        fast: The low-latency model.
+        strong: The model used for everything else.
+        is_simple: Whether a call may go to the fast model.
+        min_avg_logprobs: Escalate fast responses less confident than this
+            (None: never escalate for confidence).
+    """
+
+    model: str = "tiered"
+    fast: BaseLlm
+    strong: BaseLlm
+    is_simple: Callable[[LlmRequest], bool] = is_simple_turn
+    min_avg_logprobs: float | None = None
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        if self.is_simple(llm_request):
+            # The strong model gets the original request if the call is escalated.
+            request = llm_request.model_copy(
+                update={
+                    "model": self.fast.model,
+                    "contents": list(llm_request.contents),
+                    "config": llm_request.config.model_copy(deep=True) if llm_request.config else None,
+                    "cache_config": None,
+                    "cache_metadata": None,
+                }
+            )
+            started = time.perf_counter()
+            try:
+                responses = [response async for response in self.fast.generate_content_async(request, stream)]
+                reason = self._escalation_reason(llm_request, responses)
+            except Exception as e:
+                responses, reason = [], f"error: {e}"
+            self._record("fast", self.fast.model, started, responses, "escalated" if reason else "ok")
+            if reason is None:
+                for response in responses:
+                    yield response
+                return
+            logger.info(f"Escalating a model call from {self.fast.model} to {self.strong.model}: {reason}")
+
+        llm_request.model = self.strong.model
+        started = time.perf_counter()
+        responses = []
+        async for response in self.strong.generate_content_async(llm_request, stream):
+            responses.append(response)
+            yield response
+        self._record("strong", self.strong.model, started, responses, "ok")
+
+    def _escalation_reason(self, llm_request: LlmRequest, responses: list[LlmResponse]) -> str | None:
+        final = [response for response in responses if not response.partial]
+        if not final:
+            return "no response"
+        response = final[-1]
+        if response.finish_reason == types.FinishReason.MALFORMED_FUNCTION_CALL:
+            return "malformed function call"
+        if response.error_code:
+            return f"error {response.error_code}"
+        parts = response.content.parts if response.content else None
+        if not parts:
+            return "empty response"
+        calls = [part.function_call.name for part in parts if part.function_call]
+        unknown = [name for name in calls if name not in llm_request.tools_dict]
+        if unknown:
+            return f"unknown function {unknown[0]}"
+        confidence = response.avg_logprobs
+        if self.min_avg_logprobs is not None and confidence is not None and confidence < self.min_avg_logprobs:
+            return f"low confidence ({confidence:.2f})"
+        return None
+
+    def _record(self, tier: str, model: str, started: float, responses: list[LlmResponse], outcome: str) -> None:
+        attributes = {"tier": tier, "model": model}
+        model_latency.record((time.perf_counter() - started) * 1000, attributes)
+        model_turns.add(1, {**attributes, "outcome": outcome})
+        usage = next((response.usage_metadata for response in reversed(responses) if response.usage_metadata), None)
+        if usage:
+            model_tokens.add(usage.prompt_token_count or 0, {**attributes, "kind": "prompt"})
+            model_tokens.add(usage.candidates_token_count or 0, {**attributes, "kind": "output"})
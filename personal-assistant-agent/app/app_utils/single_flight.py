@@ -0,0 +1,48 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+from typing import Any, TypeVar
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Coalesces concurrent calls with the same key into one in-flight task.
+
+    Every caller awaits the same result (or exception). The shared task is
+    shielded, so a caller that goes away (e.g. a client disconnecting) doesn't
+    cancel the work the other callers are waiting on.
+    """
+
+    def __init__(self) -> None:
+        self.coalesced = 0
+        self._inflight: dict[str, asyncio.Task] = {}
+
+    def __len__(self) -> int:
+        return len(self._inflight)
+
+    async def run(self, key: str, func: Callable[[], Awaitable[T]]) -> T:
+        """Run `func()` unless a call for `key` is already in flight, and return its result."""
+        task = self._inflight.get(key)
+        if task is not None and task.get_loop() is asyncio.get_running_loop():
+            self.coalesced += 1
+        else:
+            task = asyncio.ensure_future(func())
+            self._inflight[key] = task
+            task.add_done_callback(lambda done: self._forget(key, done))
+        return await asyncio.shield(task)
+
+    async def cancel(self) -> None:
+        """Cancel the calls in flight on this event loop and wait for them to end."""
+        loop = asyncio.get_running_loop()
+        tasks = [task for task in self._inflight.values() if task.get_loop() is loop]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    def _forget(self, key: str, task: asyncio.Task[Any]) -> None:
+        if self._inflight.get(key) is task:
+            del self._inflight[key]
+        # Mark the exception as retrieved when every caller has gone away.
+        if not task.cancelled():
+            task.exception()
@@ -0,0 +1,273 @@
+import asyncio
+import functools
+import logging
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from enum import Enum
+from typing import Any
+
+import httpx
+from google.auth import jwt
+
+logger = logging.getLogger(__name__)
+
+GOOGLE_OAUTH2_CERTS_URL = "https://www.googleapis.com/oauth2/v1/certs"
+FIREBASE_CERTS_URL = "https://www.googleapis.com/robot/v1/metadata/x509/securetoken@system.gserviceaccount.com"
+GOOGLE_TOKENINFO_URL = "https://oauth2.googleapis.com/tokeninfo"
+
+GOOGLE_ISSUERS = ("accounts.google.com", "https://accounts.google.com")
+FIREBASE_ISSUER_PREFIX = "https://securetoken.google.com/"
+
+# Used when the certificate endpoint doesn't send a Cache-Control max-age.
+DEFAULT_CERTS_MAX_AGE_SECONDS = 3600
+# Certificates are refreshed once this fraction of their max-age has elapsed.
+REFRESH_AFTER_FRACTION = 0.9
+
+_MAX_AGE_PATTERN = re.compile(r"max-age=(\d+)")
+
+
+class VerificationUnavailableError(Exception):
+    """
+    Raised when a token can't be checked right now, e.g. tokeninfo answered
+    with a 5xx or 429, or the verifier is missing configuration. Unlike a
+    `ValueError`, it says nothing about the token itself.
+    """
+
+
+class TokenKind(str, Enum):
+    """The verifier a bearer token should be routed to."""
+
+    FIREBASE_ID_TOKEN = "firebase_id_token"
+    GOOGLE_ID_TOKEN = "google_id_token"
+    ACCESS_TOKEN = "access_token"
+    UNSUPPORTED = "unsupported"
+
+
+def classify_token(token: str) -> TokenKind:
+    """
+    Decide which verifier a token belongs to from its unverified JWT header and
+    `iss` claim, so it is only ever checked by the one verifier that can accept
+    it. Tokens that aren't JWTs are treated as opaque access tokens.
+    """
+    if token.count(".") != 2:
+        return TokenKind.ACCESS_TOKEN
+
+    try:
+        header = jwt.decode_header(token)
+        payload = jwt.decode(token, verify=False)
+    except ValueError:
+        return TokenKind.UNSUPPORTED
+    if not isinstance(payload, dict) or header.get("alg") != "RS256":
+        return TokenKind.UNSUPPORTED
+
+    issuer = payload.get("iss")
+    if isinstance(issuer, str) and issuer.startswith(FIREBASE_ISSUER_PREFIX):
+        return TokenKind.FIREBASE_ID_TOKEN
+    if issuer in GOOGLE_ISSUERS:
+        return TokenKind.GOOGLE_ID_TOKEN
+    return TokenKind.UNSUPPORTED
+
+
+def _parse_max_age(cache_control: str | None) -> int:
+    match = _MAX_AGE_PATTERN.search(cache_control or "")
+    return int(match.group(1)) if match else DEFAULT_CERTS_MAX_AGE_SECONDS
+
+
+class PublicCertCache:
+    """
+    Keeps a set of Google x509 signing certificates in memory.
+
+    The certificates are refreshed in the background according to the
+    Cache-Control max-age of the certificate endpoint, so verification only
+    waits on a fetch on a cold start or when a token is signed with a key ID
+    that hasn't been seen yet (key rotation).
+    """
+
+    def __init__(self, url: str, min_refresh_interval_seconds: float = 30) -> None:
+        self.url = url
+        self.min_refresh_interval_seconds = min_refresh_interval_seconds
+        # Optional shared client; a short-lived one is used when unset.
+        self.http_client: httpx.AsyncClient | None = None
+        self.refresh_count = 0
+        self._certs: dict[str, str] = {}
+        self._fetched_at = float("-inf")
+        self._refresh_at = 0.0
+        self._expires_at = 0.0
+        self._refresh_task: asyncio.Task | None = None
+
+    async def get(self, key_id: str | None = None) -> dict[str, str]:
+        """Return the current certificates, keyed by key ID."""
+        now = time.monotonic()
+        if not self._certs:
+            await self.refresh()
+        elif now >= self._expires_at or (
+            key_id not in self._certs
+            and now - self._fetched_at >= self.min_refresh_interval_seconds
+        ):
+            try:
+                await self.refresh()
+            except Exception as e:
+                # Keep verifying with the certificates we have rather than
+                # failing every request while the endpoint is unreachable.
+                logger.warning(f"Failed to refresh signing certificates from {self.url}: {e}")
+        elif now >= self._refresh_at:
+            self._refresh_in_background()
+        return self._certs
+
+    async def refresh(self) -> None:
+        """Fetch the certificates, sharing a single in-flight fetch among callers."""
+        await asyncio.shield(self._ensure_refresh_task())
+
+    async def run(self) -> None:
+        """Refresh the certificates shortly before they expire, until cancelled."""
+        while True:
+            try:
+                await self.refresh()
+                delay = self._refresh_at - time.monotonic()
+            except Exception as e:
+                logger.warning(f"Failed to refresh signing certificates from {self.url}: {e}")
+                delay = 0
+            await asyncio.sleep(max(delay, self.min_refresh_interval_seconds))
+
+    def _ensure_refresh_task(self) -> asyncio.Task:
+        loop = asyncio.get_running_loop()
+        task = self._refresh_task
+        if task is None or task.done() or task.get_loop() is not loop:
+            task = loop.create_task(self._fetch())
+            self._refresh_task = task
+        return task
+
+    def _refresh_in_background(self) -> None:
+        task = self._refresh_task
+        if task is not None and not task.done() and task.get_loop() is asyncio.get_running_loop():
+            return
+        self._ensure_refresh_task().add_done_callback(self._log_background_failure)
+
+    def _log_background_failure(self, task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Background refresh of {self.url} failed: {task.exception()}")
+
+    async def _fetch(self) -> None:
+        if self.http_client is not None:
+            resp = await self.http_client.get(self.url)
+        else:
+            async with httpx.AsyncClient(timeout=10.0) as client:
+                resp = await client.get(self.url)
+        resp.raise_for_status()
+
+        certs = resp.json()
+        max_age = _parse_max_age(resp.headers.get("Cache-Control"))
+        now = time.monotonic()
+        self._certs = certs
+        self._fetched_at = now
+        self._refresh_at = now + max_age * REFRESH_AFTER_FRACTION
+        self._expires_at = now + max_age
+        self.refresh_count += 1
+        logger.info(f"Loaded {len(certs)} signing certificates from {self.url} (max-age={max_age}s)")
+
+
+class TokenVerifier:
+    """
+    Verifies Firebase ID tokens, Google ID tokens and Google access tokens
+    without blocking the event loop.
+
+    JWT signatures are checked locally against in-memory certificates; the
+    CPU-bound decode runs on a small thread pool.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        clock_skew_seconds: int = 10,
+        tokeninfo_url: str = GOOGLE_TOKENINFO_URL,
+    ) -> None:
+        self.clock_skew_seconds = clock_skew_seconds
+        self.tokeninfo_url = tokeninfo_url
+        self.google_certs = PublicCertCache(GOOGLE_OAUTH2_CERTS_URL)
+        self.firebase_certs = PublicCertCache(FIREBASE_CERTS_URL)
+        self._http_client: httpx.AsyncClient | None = None
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="token-verifier")
+        self._background_tasks: list[asyncio.Task] = []
+
+    def use_http_client(self, client: httpx.AsyncClient | None) -> None:
+        """Share a pooled client for tokeninfo and certificate requests."""
+        self._http_client = client
+        self.google_certs.http_client = client
+        self.firebase_certs.http_client = client
+
+    async def start(self) -> None:
+        """Start refreshing the signing certificates in the background."""
+        loop = asyncio.get_running_loop()
+        self._background_tasks = [
+            loop.create_task(certs.run())
+            for certs in (self.google_certs, self.firebase_certs)
+        ]
+
+    async def aclose(self) -> None:
+        """Stop the background certificate refresh."""
+        for task in self._background_tasks:
+            task.cancel()
+        await asyncio.gather(*self._background_tasks, return_exceptions=True)
+        self._background_tasks = []
+
+    async def verify_firebase_id_token(self, token: str, project_id: str | None) -> dict[str, Any]:
+        """Verify a Firebase ID token issued for `project_id`."""
+        if not project_id:
+            raise VerificationUnavailableError("Firebase project ID is not configured")
+
+        header = jwt.decode_header(token)
+        if header.get("alg") != "RS256":
+            raise ValueError(f"Firebase ID token has incorrect algorithm: {header.get('alg')}")
+
+        claims = await self._decode(token, header, self.firebase_certs, audience=project_id)
+        if claims.get("iss") != f"{FIREBASE_ISSUER_PREFIX}{project_id}":
+            raise ValueError(f"Firebase ID token has incorrect issuer: {claims.get('iss')}")
+        subject = claims.get("sub")
+        if not isinstance(subject, str) or not subject or len(subject) > 128:
+            raise ValueError("Firebase ID token has an invalid subject")
+
+        claims["uid"] = subject
+        return claims
+
+    async def verify_google_id_token(self, token: str, audience: str | None) -> dict[str, Any]:
+        """Verify a Google-issued OAuth2 ID token, optionally for `audience`."""
+        header = jwt.decode_header(token)
+        claims = await self._decode(token, header, self.google_certs, audience=audience)
+        if claims.get("iss") not in GOOGLE_ISSUERS:
+            raise ValueError(f"Google ID token has incorrect issuer: {claims.get('iss')}")
+        return claims
+
+    async def verify_access_token(self, token: str) -> dict[str, Any]:
+        """Verify an opaque Google access token via the tokeninfo endpoint."""
+        params = {"access_token": token}
+        if self._http_client is not None:
+            resp = await self._http_client.get(self.tokeninfo_url, params=params)
+        else:
+            async with httpx.AsyncClient(timeout=10.0) as client:
+                resp = await client.get(self.tokeninfo_url, params=params)
+        if resp.status_code == 429 or resp.status_code >= 500:
+            raise VerificationUnavailableError(f"tokeninfo returned {resp.status_code}")
+        if resp.status_code != 200:
+            raise ValueError(f"Access token verification failed: {resp.text}")
+        return resp.json()
+
+    async def _decode(
+        self,
+        token: str,
+        header: dict[str, Any],
+        certs: PublicCertCache,
+        audience: str | None,
+    ) -> dict[str, Any]:
+        cert_map = await certs.get(header.get("kid"))
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self._executor,
+            functools.partial(
+                jwt.decode,
+                token,
+                certs=cert_map,
+                audience=audience,
+                clock_skew_in_seconds=self.clock_skew_seconds,
+            ),
+        )
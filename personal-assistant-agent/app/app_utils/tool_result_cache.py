@@ -0,0 +1,91 @@
+import copy
+import json
+import os
+from collections.abc import Iterable, Mapping
+from typing import Any
+
+from app.app_utils.cache import TTLCache
+from app.app_utils.metrics import meter
+
+tool_results = meter.create_counter(
+    "mcp.tool_results",
+    description="Read-only tool result cache lookups and invalidations, by cache, tool and outcome.",
+)
+
+
+def tool_ttls_from_env(tools: Iterable[str]) -> dict[str, float]:
+    """
+    Return the result cache TTL of each read-only tool in `tools`.
+
+    Caching is opt-in: changes made outside the agent (e.g. in the Portal UI)
+    don't invalidate cached results, so they show up only once those expire.
+
+    Environment variables (optional):
+        MCP_RESULT_CACHE_TTL_SECONDS: TTL of every tool (default 0, not cached).
+        MCP_RESULT_CACHE_TTLS: Per-tool overrides, e.g. "get_task_stats=120,get_tasks=15".
+    """
+    default = float(os.environ.get("MCP_RESULT_CACHE_TTL_SECONDS", "0"))
+    ttls = dict.fromkeys(tools, default)
+    for override in os.environ.get("MCP_RESULT_CACHE_TTLS", "").split(","):
+        tool, _, ttl = override.partition("=")
+        if tool.strip() in ttls and ttl.strip():
+            ttls[tool.strip()] = float(ttl)
+    return ttls
+
+
+class ToolResultCache:
+    """
+    A per-user read-through cache of read-only tool results.
+
+    Results of the tools in `ttls` are cached per user and arguments, each for
+    its tool's TTL; a tool with a TTL of 0 is read-only but not cached. A
+    call to any other tool may change what they return, so it drops all of
+    that user's cached results.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        ttls: Mapping[str, float],
+        max_users: int = 1000,
+        max_entries_per_user: int = 100,
+    ) -> None:
+        self.name = name
+        self.ttls = dict(ttls)
+        self.max_entries_per_user = max_entries_per_user
+        # Bumped on every invalidation, so a read that raced a write isn't cached.
+        self.generation = 0
+        self._users = TTLCache(name, max_size=max_users, ttl_seconds=max(self.ttls.values(), default=0))
+
+    def is_read_only(self, tool: str) -> bool:
+        """Whether results of `tool` are cached (and calling it changes nothing)."""
+        return tool in self.ttls
+
+    @staticmethod
+    def _key(tool: str, args: Mapping[str, Any]) -> str:
+        return f"{tool}:{json.dumps(args, sort_keys=True, default=str)}"
+
+    def get(self, user: str, tool: str, args: Mapping[str, Any]) -> Any | None:
+        """Return a copy of the cached result of `tool(**args)` for `user`, or None."""
+        if not self.ttls[tool]:
+            return None
+        results = self._users.get(user)
+        value = results.get(self._key(tool, args)) if results is not None else None
+        tool_results.add(1, {"cache": self.name, "tool": tool, "outcome": "miss" if value is None else "hit"})
+        return copy.deepcopy(value)
+
+    def set(self, user: str, tool: str, args: Mapping[str, Any], value: Any, generation: int) -> None:
+        """Cache the result of `tool(**args)` for `user`, unless anything was invalidated since `generation`."""
+        if generation != self.generation or not self.ttls[tool]:
+            return
+        results = self._users.get(user)
+        if results is None:
+            results = TTLCache(self.name, max_size=self.max_entries_per_user, ttl_seconds=self._users.ttl_seconds)
+        results.set(self._key(tool, args), copy.deepcopy(value), ttl_seconds=self.ttls[tool])
+        self._users.set(user, results)
+
+    def invalidate(self, user: str, tool: str) -> None:
+        """Drop the cached results of `user` after a call to `tool`."""
+        self.generation += 1
+        self._users.invalidate(user)
+        tool_results.add(1, {"cache": self.name, "tool": tool, "outcome": "invalidated"})
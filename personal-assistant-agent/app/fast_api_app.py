@@ -16,32 +16,52 @@ from collections.abc import AsyncIterator
 from contextlib import asynccontextmanager
 import asyncio
 import os
-import google.auth
-from a2a.server.apps import A2AFastAPIApplication
+import tempfile
 from a2a.server.request_handlers import DefaultRequestHandler
 from a2a.server.tasks import InMemoryTaskStore
-from a2a.types import AgentCapabilities, AgentCard, AuthorizationCodeOAuthFlow, OAuth2SecurityScheme, OAuthFlows
+from a2a.types import (
+    AgentCapabilities,
+    AgentCard,
+    AgentSkill,
+    AuthorizationCodeOAuthFlow,
+    OAuth2SecurityScheme,
+    OAuthFlows,
+)
 from a2a.utils.constants import (
     AGENT_CARD_WELL_KNOWN_PATH,
     EXTENDED_AGENT_CARD_PATH,
 )
 from fastapi import FastAPI
+from fastapi.responses import JSONResponse
 from google.adk.a2a.executor.a2a_agent_executor import A2aAgentExecutor
 from google.adk.a2a.utils.agent_card_builder import AgentCardBuilder
 from google.adk.artifacts import GcsArtifactService, InMemoryArtifactService
 from google.adk.runners import Runner
 from google.adk.sessions import InMemorySessionService
-from google.cloud import logging as google_cloud_logging
 
 from app.agent import app as adk_app
+from app.agent import (
+    create_a2a_client_factory,
+    create_authenticated_httpx_client,
+    get_auth_headers,
+    stash_tools,
+    todo_agent_card_cache,
+    todo_agent_remote,
+)
+from app.app_utils.a2a_streaming import create_executor_config
+from app.app_utils.http_client import create_http_client, create_http_transport
+from app.app_utils.served_agent_card import ServedAgentCard, ServedCardA2AFastAPIApplication
+from app.app_utils.startup import (
+    default_credentials,
+    lazy_startup,
+    log_startup_report,
+    record_import_time,
+    run_startup_phases,
+    startup_phase,
+)
 from app.app_utils.telemetry import setup_telemetry
 from app.app_utils.typing import Feedback
-from app.security import AuthMiddleware
-
-setup_telemetry()
-_, project_id = google.auth.default()
-logging_client = google_cloud_logging.Client()
-logger = logging_client.logger(__name__)
+from app.security import AuthMiddleware, firebase_project_id, token_verifier
 
 # Artifact bucket for ADK (created by Terraform, passed via env var)
 logs_bucket_name = os.environ.get("LOGS_BUCKET_NAME")
@@ -58,7 +78,8 @@ runner = Runner(
 )
 
 request_handler = DefaultRequestHandler(
-    agent_executor=A2aAgentExecutor(runner=runner), task_store=InMemoryTaskStore()
+    agent_executor=A2aAgentExecutor(runner=runner, config=create_executor_config()),
+    task_store=InMemoryTaskStore(),
 )
 
 A2A_RPC_PATH = f"/a2a/{adk_app.name}"
@@ -98,64 +119,99 @@ async def build_dynamic_agent_card() -> AgentCard:
     return agent_card
 
 
-@asynccontextmanager
-async def lifespan(app_instance: FastAPI) -> AsyncIterator[None]:
-    # Register agents on startup
-    from app.agent import paa_agent
+def build_limited_agent_card() -> AgentCard:
+    """
+    Build the minimal agent card served until the full card is available.
 
-    agent_card = None
-    try:
-        agent_card = await build_dynamic_agent_card()
-    except (Exception, asyncio.CancelledError) as e:
-        print(f"Warning: Failed to build dynamic agent card on startup: {e}")
-        # Build a minimal agent card so the server can still start
-        from a2a.types import AgentSkill
-        agent_card = AgentCard(
-            name=paa_agent.name,
-            display_name="Personal Assistant Agent (Limited)",
-            description="The personal-assistant-agent is currently in a limited state because it couldn't connect to its tools.",
-            url=f"{os.getenv('APP_URL', 'http://localhost:8001')}{A2A_RPC_PATH}",
-            version=os.getenv("AGENT_VERSION", "0.1.0"),
-            skills=[
-                AgentSkill(
-                    id="manage-links",
-                    name="Manage Links",
-                    description="Saving and retrieving links via the Stash service.",
-                    tags=["links", "stash"]
+    It needs no tool discovery, so the server can start and keep its
+    discovery presence while its tools are unreachable.
+    """
+    return AgentCard(
+        name=adk_app.root_agent.name,
+        display_name="Personal Assistant Agent (Limited)",
+        description="The personal-assistant-agent is currently in a limited state because it couldn't connect to its tools.",
+        url=f"{os.getenv('APP_URL', 'http://localhost:8001')}{A2A_RPC_PATH}",
+        version=os.getenv("AGENT_VERSION", "0.1.0"),
+        skills=[
+            AgentSkill(
+                id="manage-links",
+                name="Manage Links",
+                description="Saving and retrieving links via the Stash service.",
+                tags=["links", "stash"]
+            ),
+            AgentSkill(
+                id="manage-tasks",
+                name="Manage Tasks",
+                description="Listing, creating, and updating tasks via the Todo Agent.",
+                tags=["todo", "tasks"]
+            )
+        ],
+        defaultInputModes=["text/plain"],
+        defaultOutputModes=["text/plain"],
+        capabilities=AgentCapabilities(streaming=True),
+        supports_authenticated_extended_card=True,
+        security_schemes={
+            "google_oauth": OAuth2SecurityScheme(
+                description="Google OAuth 2.0",
+                flows=OAuthFlows(
+                    authorizationCode=AuthorizationCodeOAuthFlow(
+                        authorization_url="https://accounts.google.com/o/oauth2/v2/auth",
+                        token_url="https://oauth2.googleapis.com/token",
+                        scopes={
+                             "openid": "OpenID Connect",
+                             "email": "Email",
+                             "profile": "Profile",
+                        },
+                    )
                 ),
-                AgentSkill(
-                    id="manage-tasks",
-                    name="Manage Tasks",
-                    description="Listing, creating, and updating tasks via the Todo Agent.",
-                    tags=["todo", "tasks"]
-                )
-            ],
-            defaultInputModes=["text/plain"],
-            defaultOutputModes=["text/plain"],
-            capabilities=AgentCapabilities(streaming=True),
-            supports_authenticated_extended_card=True,
-            security_schemes={
-                "google_oauth": OAuth2SecurityScheme(
-                    description="Google OAuth 2.0",
-                    flows=OAuthFlows(
-                        authorizationCode=AuthorizationCodeOAuthFlow(
-                            authorization_url="https://accounts.google.com/o/oauth2/v2/auth",
-                            token_url="https://oauth2.googleapis.com/token",
-                            scopes={
-                                 "openid": "OpenID Connect",
-                                 "email": "Email",
-                                 "profile": "Profile",
-                            },
-                        )
-                    ),
-                )
-            },
-            security=[{"google_oauth": []}],
+            )
+        },
+        security=[{"google_oauth": []}],
+    )
+
+
+# The served agent card: a snapshot of the last full card (or the limited
+# card) from the start, replaced once the full card has been built.
+served_agent_card = ServedAgentCard(
+    build=build_dynamic_agent_card,
+    limited=build_limited_agent_card(),
+    snapshot_path=os.environ.get(
+        "AGENT_CARD_SNAPSHOT_PATH", os.path.join(tempfile.gettempdir(), "personal-assistant-agent-served-card.json")
+    ),
+    retry_max_seconds=float(os.environ.get("AGENT_CARD_RETRY_MAX_SECONDS", "60")),
+    max_age_seconds=int(os.environ.get("AGENT_CARD_MAX_AGE_SECONDS", "300")),
+)
+
+
+@asynccontextmanager
+async def lifespan(app_instance: FastAPI) -> AsyncIterator[None]:
+    record_import_time()
+    # The credential lookup, telemetry exporters and Firebase are independent
+    # and blocking, so they're set up concurrently on worker threads while
+    # the rest of startup goes on. Eager startup (the default) waits for them
+    # before serving; with STARTUP_MODE=lazy they finish in the background.
+    background_startup = asyncio.create_task(
+        run_startup_phases(
+            {
+                "credentials": default_credentials,
+                "telemetry": setup_telemetry,
+                "firebase": firebase_project_id,
+            }
         )
+    )
+
+    # MCP sessions (opened from here on, including for the agent card) share
+    # one pooled keep-alive transport instead of a connection pool each.
+    mcp_http_transport = create_http_transport("MCP_HTTP")
+    stash_tools.use_http_transport(mcp_http_transport)
 
-    a2a_app = A2AFastAPIApplication(
-        agent_card=agent_card,
-        extended_agent_card=agent_card,
+    # Serves the snapshot or limited card at once; the full card, which waits
+    # on tool discovery, is built in the background and swapped in when ready.
+    with startup_phase("agent_card"):
+        await served_agent_card.start()
+
+    a2a_app = ServedCardA2AFastAPIApplication(
+        served_card=served_agent_card,
         http_handler=request_handler
     )
     a2a_app.add_routes_to_app(
@@ -164,7 +220,45 @@ async def lifespan(app_instance: FastAPI) -> AsyncIterator[None]:
         extended_agent_card_url=f"{A2A_RPC_PATH}{EXTENDED_AGENT_CARD_PATH}",
         rpc_url=A2A_RPC_PATH
     )
-    yield
+
+    # One pooled client for tokeninfo and certificate lookups, so verifying
+    # access tokens reuses warm connections instead of a new TLS handshake.
+    auth_http_client = create_http_client("AUTH_HTTP")
+    token_verifier.use_http_client(auth_http_client)
+    with startup_phase("token_verifier"):
+        await token_verifier.start()
+
+    # Loads the todo-agent card snapshot and revalidates it in the background;
+    # doesn't wait on the todo-agent being reachable.
+    agent_card_http_client = create_http_client("AGENT_CARD_HTTP")
+    todo_agent_card_cache.http_client = agent_card_http_client
+    with startup_phase("todo_agent_card"):
+        await todo_agent_card_cache.start()
+
+    # A2A calls to the todo-agent go through one authenticated, pooled client
+    # per run of the lifespan, so a later run never uses a closed client.
+    a2a_http_client = create_authenticated_httpx_client(get_auth_headers)
+    todo_agent_remote.use_a2a_client_factory(create_a2a_client_factory(a2a_http_client))
+
+    if not lazy_startup():
+        await background_startup
+    background_startup.add_done_callback(log_startup_report)
+    try:
+        yield
+    finally:
+        background_startup.cancel()
+        await served_agent_card.aclose()
+        await stash_tools.close()
+        stash_tools.use_http_transport(None)
+        await mcp_http_transport.aclose()
+        todo_agent_remote.use_a2a_client_factory(None)
+        await a2a_http_client.aclose()
+        await todo_agent_card_cache.aclose()
+        todo_agent_card_cache.http_client = None
+        await agent_card_http_client.aclose()
+        await token_verifier.aclose()
+        token_verifier.use_http_client(None)
+        await auth_http_client.aclose()
 
 
 app = FastAPI(
@@ -175,6 +269,24 @@ app = FastAPI(
 app.add_middleware(AuthMiddleware)
 
 
+@app.get("/ready")
+def ready() -> JSONResponse:
+    """
+    Readiness probe: 200 once the full agent card has been built, 503 before.
+
+    The server answers (with the snapshot or limited card, named in
+    `agent_card`) from the start, so liveness is just the server accepting
+    connections.
+    """
+    status = {
+        "ready": served_agent_card.ready,
+        "agent_card": served_agent_card.source,
+        "attempts": served_agent_card.attempts,
+        "last_error": served_agent_card.last_error,
+    }
+    return JSONResponse(status_code=200 if served_agent_card.ready else 503, content=status)
+
+
 # Main execution
 if __name__ == "__main__":
     import uvicorn
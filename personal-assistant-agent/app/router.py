@@ -0,0 +1,76 @@
+import re
+from typing import Any
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmResponse
+from google.adk.tools.base_toolset import BaseToolset
+from google.genai import types
+
+from app.app_utils.intent_router import (
+    LIST_TASKS_PATTERN,
+    MESSAGE_END,
+    IntentRouter,
+    Route,
+    call_tool,
+    text_response,
+)
+
+SAVE_LINK_PATTERN = re.compile(
+    rf"(?:please\s+)?(?:save|stash|bookmark)\s+(?:this\s+(?:link|article|page)?:?\s*)?(?P<url>https?://\S+?){MESSAGE_END}",
+    re.IGNORECASE,
+)
+LIST_LINKS_PATTERN = re.compile(
+    rf"(?:(?:show|list|get)\s+(?:me\s+)?(?:all\s+)?my\s+(?:saved\s+|stashed\s+)?(?:links|bookmarks)"
+    rf"|what\s+(?:links\s+)?(?:did|have)\s+i\s+(?:saved?|stashed?|bookmarked?)){MESSAGE_END}",
+    re.IGNORECASE,
+)
+
+
+def format_links(links: list[dict[str, Any]]) -> str:
+    """Render stashed links as a Markdown list."""
+    if not links:
+        return "You haven't stashed any links yet."
+    lines = [f"You have {len(links)} stashed link{'s' if len(links) != 1 else ''}:"]
+    for link in links:
+        tags = f" ({', '.join(link['tags'])})" if link.get("tags") else ""
+        lines.append(f"- [{link.get('title') or link.get('url')}]({link.get('url')}){tags}")
+    return "\n".join(lines)
+
+
+def create_intent_router(stash_tools: BaseToolset, todo_agent_name: str) -> IntentRouter:
+    """
+    Route plain Stash requests straight to the Stash tools, and plain task
+    listings straight to the todo-agent (which answers them itself).
+
+    "What's in my X" isn't routed: the PAA can't tell a task list from a
+    reading list or a calendar, so those go to the model.
+    """
+
+    async def save_link(match: re.Match, callback_context: CallbackContext) -> LlmResponse | None:
+        link = await call_tool(stash_tools, "stash_link", {"url": match["url"]}, callback_context)
+        if not isinstance(link, dict):
+            return None
+        tags = f" Tags: {', '.join(link['tags'])}." if link.get("tags") else ""
+        return text_response(f"Saved \"{link.get('title') or match['url']}\" to your Stash.{tags}")
+
+    async def list_links(match: re.Match, callback_context: CallbackContext) -> LlmResponse | None:
+        links = await call_tool(stash_tools, "get_stashed_links", {}, callback_context)
+        return text_response(format_links(links)) if isinstance(links, list) else None
+
+    async def transfer_to_todo_agent(match: re.Match, callback_context: CallbackContext) -> LlmResponse | None:
+        return LlmResponse(
+            content=types.Content(
+                role="model",
+                parts=[
+                    types.Part(text="I'll ask the Todo agent to handle that for you."),
+                    types.Part.from_function_call(name="transfer_to_agent", args={"agent_name": todo_agent_name}),
+                ],
+            )
+        )
+
+    routes = [
+        Route("save_link", SAVE_LINK_PATTERN, save_link),
+        Route("list_links", LIST_LINKS_PATTERN, list_links),
+        Route("tasks", LIST_TASKS_PATTERN, transfer_to_todo_agent, model_calls_saved=1),
+    ]
+    return IntentRouter("personal_assistant_agent", routes)
@@ -1,6 +1,11 @@
 import datetime
 from zoneinfo import ZoneInfo
 
+from google.adk.tools import ToolContext
+
+from app.a2ui import find_record, render_link_card_messages, render_task_card_messages
+
+
 def get_current_time() -> dict:
     """Returns the current date and time.
     
@@ -24,3 +29,33 @@ def get_current_time() -> dict:
         "weekday": now.strftime("%A"),
         "timezone": timezone_name
     }
+
+
+def render_task_card(task_id: str, tool_context: ToolContext) -> dict:
+    """Shows a Task detail card to the user.
+
+    Args:
+        task_id: ID of the task, as listed by the Todo Agent in this conversation.
+
+    Returns:
+        dict: The rendered A2UI messages under `a2ui`, or an error if the task isn't in the conversation.
+    """
+    task = find_record(tool_context.session.events, task_id)
+    if task is None:
+        return {"error": f"Task {task_id} isn't in this conversation; ask the Todo Agent for it first."}
+    return {"a2ui": render_task_card_messages(task)}
+
+
+def render_link_card(link_id: str, tool_context: ToolContext) -> dict:
+    """Shows a Link detail card to the user.
+
+    Args:
+        link_id: ID of the stashed link, as returned by a Stash tool in this conversation.
+
+    Returns:
+        dict: The rendered A2UI messages under `a2ui`, or an error if the link isn't in the conversation.
+    """
+    link = find_record(tool_context.session.events, link_id)
+    if link is None:
+        return {"error": f"Link {link_id} isn't in this conversation; look it up with the Stash tools first."}
+    return {"a2ui": render_link_card_messages(link)}
@@ -0,0 +1,69 @@
+"""
+Microbenchmark the cost of validating one A2UI card.
+
+Compares validating with `jsonschema.validate` against the schema text
+(parsing the schema and building a validator on every call) with the
+precompiled `a2ui_validator`, incremental validation of the streamed card,
+and the repair of a card with a bad `primaryColor`.
+
+Usage:
+    uv run python -m tests.benchmarks.bench_a2ui_validation --iterations 2000
+"""
+
+import argparse
+import json
+import timeit
+
+import jsonschema
+
+from app.a2ui import A2UI_SCHEMA, render_link_card_messages
+from app.a2ui_validator import A2UIStreamValidator, a2ui_validator
+
+CARD = render_link_card_messages(
+    {"url": "https://example.com/ai-news", "title": "Breaking AI News", "summary": "A roundup.", "image": "https://example.com/og.png"}
+)
+CARD_TEXT = json.dumps(CARD)
+BROKEN_CARD = [
+    {**CARD[0], "beginRendering": {**CARD[0]["beginRendering"], "styles": {"primaryColor": "blue"}}},
+    CARD[1],
+]
+
+
+def _uncompiled() -> None:
+    for message in CARD:
+        jsonschema.validate(message, json.loads(A2UI_SCHEMA))
+
+
+def _precompiled() -> None:
+    a2ui_validator.validate(CARD)
+
+
+def _streamed(chunk_size: int) -> None:
+    stream = A2UIStreamValidator(a2ui_validator)
+    for i in range(0, len(CARD_TEXT), chunk_size):
+        stream.feed(CARD_TEXT[i : i + chunk_size])
+    stream.close()
+
+
+def _repair() -> None:
+    a2ui_validator.repair(BROKEN_CARD)
+
+
+def main(iterations: int, chunk_size: int) -> None:
+    for label, func in (
+        ("uncompiled", _uncompiled),
+        ("precompiled", _precompiled),
+        (f"streamed ({chunk_size}-char chunks)", lambda: _streamed(chunk_size)),
+        ("repair (bad primaryColor)", _repair),
+    ):
+        number = max(iterations // 10, 1) if label == "uncompiled" else iterations
+        seconds = min(timeit.repeat(func, number=number, repeat=3)) / number
+        print(f"{label:<28} {seconds * 1_000_000:9.1f} us/card")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--iterations", type=int, default=2000)
+    parser.add_argument("--chunk-size", type=int, default=32)
+    args = parser.parse_args()
+    main(args.iterations, args.chunk_size)
@@ -0,0 +1,108 @@
+"""
+Benchmark "show details" turns: model-written A2UI JSON vs. the card render tools.
+
+Both modes run against the local Gemini stand-in (tests/fake_gemini.py) with
+simulated time-to-first-token and per-output-token decoding time. In the
+model-written mode the stand-in replies with the card JSON, as the model did
+before; in the renderer mode it replies with a `render_task_card` /
+`render_link_card` call with the record's ID, the record is loaded from the
+Stash / Checkmate result earlier in the session and the card is returned
+by `emit_rendered_card`. Reports output tokens and end-to-end latency per turn.
+
+Usage:
+    uv run python -m tests.benchmarks.bench_card_rendering --turns 20 --ttft-ms 300 --ms-per-token 8
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import time
+
+from google.adk.agents import Agent
+from google.adk.events import Event
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from app.a2ui import (
+    attach_a2ui_guide,
+    emit_rendered_card,
+    render_link_card_messages,
+    render_task_card_messages,
+)
+from app.agent import PAA_STATIC_INSTRUCTION
+from app.tools import render_link_card, render_task_card
+from tests import fake_gemini
+
+TASK = {"id": 3, "title": "Buy milk", "status": "todo", "priority": "high", "due_date": "2026-10-18", "description": "2 litres, semi-skimmed"}
+LINK = {"id": 7, "url": "https://example.com/ai-news", "title": "Breaking AI News", "summary": "A roundup of this week's AI releases.", "image": "https://example.com/og.png"}
+
+
+def _replies(model_written: bool, turn: int) -> list[dict]:
+    if turn % 2:
+        if model_written:
+            return [{"text": json.dumps(render_task_card_messages(TASK), indent=2)}]
+        return [{"functionCall": {"name": "render_task_card", "args": {"task_id": str(TASK["id"])}}}]
+    if model_written:
+        return [{"text": json.dumps(render_link_card_messages(LINK), indent=2)}]
+    return [{"functionCall": {"name": "render_link_card", "args": {"link_id": str(LINK["id"])}}}]
+
+
+def _tool_result(name: str, record: dict) -> Event:
+    response = {"content": [{"type": "text", "text": json.dumps([record])}]}
+    return Event(
+        author="personal_assistant_agent",
+        content=types.Content(role="user", parts=[types.Part.from_function_response(name=name, response=response)]),
+    )
+
+
+async def _run(base_url: str, model_written: bool, turns: int) -> tuple[list[float], int, int]:
+    agent = Agent(
+        name="personal_assistant_agent",
+        model=fake_gemini.StandInGemini(model="gemini-stand-in", base_url=base_url),
+        instruction=PAA_STATIC_INSTRUCTION,
+        tools=[render_task_card, render_link_card],
+        before_model_callback=[emit_rendered_card, attach_a2ui_guide],
+    )
+    runner = Runner(app_name="app", agent=agent, session_service=InMemorySessionService())
+    fake_gemini.reset()
+    latencies = []
+    output_tokens = 0
+    for turn in range(turns):
+        session = await runner.session_service.create_session(app_name="app", user_id="bench")
+        for name, record in (("get_tasks", TASK), ("get_stashed_links", LINK)):
+            await runner.session_service.append_event(session, _tool_result(name, record))
+        fake_gemini.app.state.scripted_replies.append(_replies(model_written, turn))
+        message = types.Content(role="user", parts=[types.Part(text="Show me the details of it")])
+        start = time.perf_counter()
+        async for event in runner.run_async(user_id="bench", session_id=session.id, new_message=message):
+            if event.usage_metadata:
+                output_tokens += event.usage_metadata.candidates_token_count or 0
+        latencies.append(time.perf_counter() - start)
+    return latencies, output_tokens, len(fake_gemini.app.state.generate_requests)
+
+
+async def main(turns: int) -> None:
+    server, base_url = fake_gemini.serve()
+    try:
+        for label, model_written in (("model-written JSON", True), ("render tools", False)):
+            latencies, output_tokens, calls = await _run(base_url, model_written, turns)
+            print(
+                f"{label:<20} model calls/turn={calls / turns:4.1f}  output tokens/turn={output_tokens / turns:6.0f}  "
+                f"latency p50={statistics.median(latencies) * 1000:7.1f}ms  max={max(latencies) * 1000:7.1f}ms"
+            )
+    finally:
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--turns", type=int, default=20)
+    parser.add_argument("--ttft-ms", type=float, default=300, help="Simulated time to first token")
+    parser.add_argument("--ms-per-token", type=float, default=8, help="Simulated decoding time per output token")
+    args = parser.parse_args()
+    os.environ["FAKE_GEMINI_LATENCY_MS"] = str(args.ttft_ms)
+    os.environ["FAKE_GEMINI_MS_PER_OUTPUT_TOKEN"] = str(args.ms_per_token)
+    asyncio.run(main(args.turns))
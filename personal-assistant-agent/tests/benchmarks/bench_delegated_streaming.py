@@ -0,0 +1,146 @@
+"""
+Benchmark time to first visible token of a delegated turn, with and without A2A token streaming.
+
+Serves a todo-agent over A2A on a local port, with the local Gemini stand-in
+(tests/fake_gemini.py) playing the models, and measures:
+
+- todo-agent: the todo-agent's own A2A stream, for a client calling it directly;
+- via PAA: a PAA turn that transfers to the todo-agent (`StreamingRemoteA2aAgent`).
+
+"first token" is the first answer text a caller would show: a streamed
+chunk with streaming, the complete answer without. "done" is the complete
+answer.
+
+Usage:
+    uv run python -m tests.benchmarks.bench_delegated_streaming --model-ms 400 --ms-per-token 15
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+import uuid
+from typing import Any
+
+from a2a.client import ClientConfig, ClientFactory
+from a2a.server.apps import A2AFastAPIApplication
+from a2a.server.request_handlers import DefaultRequestHandler
+from a2a.server.tasks import InMemoryTaskStore
+from a2a.types import (
+    AgentCapabilities,
+    AgentCard,
+    Message,
+    Part,
+    Role,
+    TaskArtifactUpdateEvent,
+    TaskStatusUpdateEvent,
+    TextPart,
+)
+from fastapi import FastAPI
+from google.adk.a2a.executor.a2a_agent_executor import A2aAgentExecutor
+from google.adk.agents import Agent
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from app.app_utils.a2a_streaming import StreamingRemoteA2aAgent, create_executor_config
+from tests import fake_gemini
+
+ANSWER = (
+    "You have three tasks due this week: renew the passport on Tuesday, book the dentist "
+    "by Thursday and pay the rent on Friday. Nothing is overdue."
+)
+TRANSFER = [{"functionCall": {"name": "transfer_to_agent", "args": {"agent_name": "todo_agent"}}}]
+
+
+def serve_todo_agent(base_url: str) -> tuple[Any, AgentCard]:
+    """Serve an A2A todo-agent (model: the Gemini stand-in at `base_url`) on a local port."""
+    agent = Agent(name="todo_agent", model=fake_gemini.StandInGemini(model="gemini-stand-in", base_url=base_url))
+    runner = Runner(app_name="todo", agent=agent, session_service=InMemorySessionService())
+    handler = DefaultRequestHandler(
+        agent_executor=A2aAgentExecutor(runner=runner, config=create_executor_config()),
+        task_store=InMemoryTaskStore(),
+    )
+    asgi_app = FastAPI()
+    server, url = fake_gemini.serve(asgi_app)
+    card = AgentCard(
+        name="todo_agent",
+        description="Manages tasks.",
+        url=f"{url}/a2a/todo",
+        version="0.1.0",
+        capabilities=AgentCapabilities(streaming=True),
+        default_input_modes=["text/plain"],
+        default_output_modes=["text/plain"],
+        skills=[],
+    )
+    A2AFastAPIApplication(agent_card=card, http_handler=handler).add_routes_to_app(asgi_app, rpc_url="/a2a/todo")
+    return server, card
+
+
+async def _direct(card: AgentCard) -> tuple[float, float]:
+    fake_gemini.app.state.scripted_replies.append([{"text": ANSWER}])
+    client = ClientFactory(ClientConfig()).create(card)
+    message = Message(message_id=str(uuid.uuid4()), role=Role.user, parts=[Part(root=TextPart(text="What's due?"))])
+    started = time.perf_counter()
+    first = done = None
+    async for _, update in client.send_message(message):
+        if isinstance(update, TaskStatusUpdateEvent) and update.status.message and update.status.message.role == Role.agent:
+            first = first or time.perf_counter() - started
+        elif isinstance(update, TaskArtifactUpdateEvent):
+            done = time.perf_counter() - started
+    await client.close()
+    return first * 1000, done * 1000
+
+
+async def _via_paa(card: AgentCard, base_url: str, streaming: bool) -> tuple[float, float]:
+    fake_gemini.app.state.scripted_replies += [TRANSFER, [{"text": ANSWER}]]
+    todo_agent = StreamingRemoteA2aAgent(name="todo_agent", agent_card=card, a2a_client_factory=ClientFactory(ClientConfig()))
+    agent = Agent(
+        name="personal_assistant_agent",
+        model=fake_gemini.StandInGemini(model="gemini-stand-in", base_url=base_url),
+        sub_agents=[todo_agent],
+    )
+    runner = Runner(app_name="app", agent=agent, session_service=InMemorySessionService())
+    session = await runner.session_service.create_session(app_name="app", user_id="user")
+    run_config = RunConfig(streaming_mode=StreamingMode.SSE if streaming else StreamingMode.NONE)
+    message = types.Content(role="user", parts=[types.Part(text="What's due?")])
+    started = time.perf_counter()
+    first = done = None
+    async for event in runner.run_async(user_id="user", session_id=session.id, new_message=message, run_config=run_config):
+        texts = [part.text for part in (event.content.parts if event.content else None) or [] if part.text and not part.thought]
+        if event.author == "todo_agent" and texts:
+            first = first or time.perf_counter() - started
+            if not event.partial:
+                done = time.perf_counter() - started
+    await todo_agent.cleanup()
+    return first * 1000, done * 1000
+
+
+def _report(label: str, timings: list[tuple[float, float]]) -> None:
+    first = statistics.median(first for first, _ in timings)
+    done = statistics.median(done for _, done in timings)
+    print(f"{label:<28} first token={first:7.0f} ms  done={done:7.0f} ms")
+
+
+async def main(runs: int) -> None:
+    _, base_url = fake_gemini.serve()
+    for streaming in (False, True):
+        os.environ["A2A_STREAMING_ENABLED"] = str(streaming).lower()
+        server, card = serve_todo_agent(base_url)
+        mode = "streaming" if streaming else "no streaming"
+        _report(f"todo-agent ({mode})", [await _direct(card) for _ in range(runs)])
+        _report(f"via PAA ({mode})", [await _via_paa(card, base_url, streaming) for _ in range(runs)])
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model-ms", type=float, default=400, help="Model time to first token")
+    parser.add_argument("--ms-per-token", type=float, default=15, help="Model decoding time per output token")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    os.environ["FAKE_GEMINI_LATENCY_MS"] = str(args.model_ms)
+    os.environ["FAKE_GEMINI_MS_PER_OUTPUT_TOKEN"] = str(args.ms_per_token)
+    asyncio.run(main(args.runs))
@@ -0,0 +1,116 @@
+"""
+Benchmark the latency of a hybrid turn ("save this and remind me") run in order vs. in one model turn.
+
+Plays the model's side with the local Gemini stand-in (tests/fake_gemini.py)
+and stands in for the Stash MCP tool and the remote todo-agent with sleeps:
+
+- in order: save to Stash, then transfer to the todo-agent (two model turns
+  before the todo-agent starts);
+- one turn: call the Stash tool and transfer to the todo-agent in the same
+  model response, so the todo-agent starts as soon as the Stash call is done.
+
+Both report when the Stash result and the todo-agent's answer reach the
+caller.
+
+Usage:
+    uv run python -m tests.benchmarks.bench_hybrid_fanout --model-ms 400 --stash-ms 300 --todo-ms 1500
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+from google.adk.agents import Agent, BaseAgent
+from google.adk.events import Event
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from tests import fake_gemini
+
+STASH_CALL = {"functionCall": {"name": "stash_link", "args": {"url": "https://example.com/post"}}}
+TRANSFER = {"functionCall": {"name": "transfer_to_agent", "args": {"agent_name": "todo_agent"}}}
+SCRIPTS = {
+    "in order": [
+        [STASH_CALL],
+        [{"text": "I'll ask the Todo agent to handle that for you."}, TRANSFER],
+    ],
+    "one turn": [
+        [{"text": "I'll save the link and ask the Todo agent to add the reminder."}, STASH_CALL, TRANSFER],
+    ],
+}
+
+
+class _TodoAgent(BaseAgent):
+    """Stands in for the remote todo-agent."""
+
+    delay_seconds: float
+
+    async def _run_async_impl(self, ctx):
+        await asyncio.sleep(self.delay_seconds)
+        yield Event(
+            author=self.name,
+            invocation_id=ctx.invocation_id,
+            content=types.Content(role="model", parts=[types.Part(text="Added 'Read the post' for Saturday.")]),
+        )
+
+
+def _runner(base_url: str, stash_seconds: float, todo_seconds: float) -> Runner:
+    async def stash_link(url: str) -> dict:
+        """Save a link to Stash."""
+        await asyncio.sleep(stash_seconds)
+        return {"url": url, "title": "The post"}
+
+    agent = Agent(
+        name="personal_assistant_agent",
+        model=fake_gemini.StandInGemini(model="gemini-stand-in", base_url=base_url),
+        tools=[stash_link],
+        sub_agents=[_TodoAgent(name="todo_agent", delay_seconds=todo_seconds)],
+    )
+    return Runner(app_name="app", agent=agent, session_service=InMemorySessionService())
+
+
+async def _turn(runner: Runner, script: list[list[dict]]) -> tuple[float, float]:
+    """Seconds until the Stash result and until the todo-agent's answer reach the caller."""
+    fake_gemini.reset()
+    fake_gemini.app.state.scripted_replies.extend(script)
+    session = await runner.session_service.create_session(app_name="app", user_id="bench")
+    message = types.Content(role="user", parts=[types.Part(text="Save https://example.com/post and remind me")])
+    started = time.perf_counter()
+    stash_seconds = 0.0
+    async for event in runner.run_async(user_id="bench", session_id=session.id, new_message=message):
+        if any(response.name == "stash_link" for response in event.get_function_responses()):
+            stash_seconds = time.perf_counter() - started
+    return stash_seconds, time.perf_counter() - started
+
+
+async def main(model_ms: float, stash_ms: float, todo_ms: float, runs: int) -> None:
+    os.environ["FAKE_GEMINI_LATENCY_MS"] = str(model_ms)
+    server, base_url = fake_gemini.serve()
+    try:
+        results = {}
+        for label, script in SCRIPTS.items():
+            runner = _runner(base_url, stash_ms / 1000, todo_ms / 1000)
+            timings = [await _turn(runner, script) for _ in range(runs)]
+            stash = statistics.median(stash_seconds for stash_seconds, _ in timings) * 1000
+            results[label] = statistics.median(total for _, total in timings) * 1000
+            print(
+                f"{label:<9} stash result={stash:6.0f} ms  answer={results[label]:6.0f} ms"
+                f"  (model={model_ms:.0f} stash={stash_ms:.0f} todo={todo_ms:.0f})"
+            )
+        before, after = results.values()
+        print(f"hybrid turn latency reduced by {(1 - after / before) * 100:.1f}%")
+    finally:
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model-ms", type=float, default=400, help="Model latency per call")
+    parser.add_argument("--stash-ms", type=float, default=300, help="Stash tool latency")
+    parser.add_argument("--todo-ms", type=float, default=1500, help="Todo-agent latency")
+    parser.add_argument("--runs", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.model_ms, args.stash_ms, args.todo_ms, args.runs))
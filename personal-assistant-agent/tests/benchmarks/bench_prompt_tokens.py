@@ -0,0 +1,119 @@
+"""
+Benchmark prompt size with the A2UI guide always in the instruction vs. on demand.
+
+Replays a set of representative transcripts through the agent against the
+local Gemini stand-in (tests/fake_gemini.py), records every `generateContent`
+request and reports the prompt tokens per model call for each mode. Tokens
+are estimated at 4 characters per token (the heuristic ADK uses for context
+caching); pass --count-tokens to count them with the real `countTokens` API
+instead (needs Google Cloud credentials).
+
+Usage:
+    uv run python -m tests.benchmarks.bench_prompt_tokens
+    uv run python -m tests.benchmarks.bench_prompt_tokens --count-tokens --model gemini-2.5-flash
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+from typing import Any
+
+from google.adk.agents import Agent
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import Client, types
+
+from app.a2ui import A2UI_GUIDE, attach_a2ui_guide
+from app.agent import PAA_STATIC_INSTRUCTION
+from app.tools import get_current_time
+from tests import fake_gemini
+
+TRANSCRIPTS = [
+    ["Save https://example.com/article", "Remind me to read it this weekend"],
+    ["Remind me to call Customer A tomorrow at 10", "Add 'Buy milk' to the Groceries list"],
+    ["What did I save this week?", "Show me the details of the second link"],
+    ["Save this article and remind me to read it weekend: https://example.com/post"],
+    ["What's on my list for today?", "View the 'Buy milk' task", "Mark it as done"],
+    ["Bookmark https://example.com/recipe", "How many links have I saved?"],
+]
+
+
+def _runner(base_url: str, on_demand: bool) -> Runner:
+    agent = Agent(
+        name="personal_assistant_agent",
+        model=fake_gemini.StandInGemini(model="gemini-stand-in", base_url=base_url),
+        # An instruction provider bypasses ADK's {placeholder} templating; the guide contains raw JSON.
+        instruction=_literal(PAA_STATIC_INSTRUCTION if on_demand else PAA_STATIC_INSTRUCTION + A2UI_GUIDE),
+        tools=[get_current_time],
+        before_model_callback=attach_a2ui_guide if on_demand else None,
+    )
+    return Runner(app_name="app", agent=agent, session_service=InMemorySessionService())
+
+
+def _literal(text: str):
+    async def provider(_context) -> str:
+        return text
+
+    return provider
+
+
+async def _replay(runner: Runner) -> list[dict[str, Any]]:
+    fake_gemini.reset()
+    for turns in TRANSCRIPTS:
+        session = await runner.session_service.create_session(app_name="app", user_id="bench")
+        for text in turns:
+            message = types.Content(role="user", parts=[types.Part(text=text)])
+            async for _ in runner.run_async(user_id="bench", session_id=session.id, new_message=message):
+                pass
+    return list(fake_gemini.app.state.generate_requests)
+
+
+def _estimate_tokens(body: dict[str, Any]) -> int:
+    chars = 0
+    for content in [body.get("systemInstruction", {}), *body.get("contents", [])]:
+        chars += sum(len(part.get("text", "")) for part in content.get("parts", []))
+    chars += len(json.dumps(body.get("tools", [])))
+    return chars // 4
+
+
+async def _count_tokens(client: Client, model: str, body: dict[str, Any]) -> int:
+    system_instruction: str | None = None
+    if "systemInstruction" in body:
+        system_instruction = "".join(part.get("text", "") for part in body["systemInstruction"]["parts"])
+    response = await client.aio.models.count_tokens(
+        model=model,
+        contents=[types.Content.model_validate(content) for content in body["contents"]],
+        config=types.CountTokensConfig(system_instruction=system_instruction),
+    )
+    return response.total_tokens or 0
+
+
+async def main(count_tokens: bool, model: str) -> None:
+    server, base_url = fake_gemini.serve()
+    client = Client() if count_tokens else None
+    try:
+        results = {}
+        for label, on_demand in (("always in prompt", False), ("on demand", True)):
+            requests = await _replay(_runner(base_url, on_demand))
+            if client:
+                tokens = [await _count_tokens(client, model, body) for body in requests]
+            else:
+                tokens = [_estimate_tokens(body) for body in requests]
+            results[label] = tokens
+            print(
+                f"{label:<18} calls={len(tokens):3d}  total={sum(tokens):8d}  "
+                f"mean={statistics.mean(tokens):8.0f}  max={max(tokens):8d} tokens"
+            )
+        before, after = (sum(tokens) for tokens in results.values())
+        print(f"prompt tokens reduced by {(1 - after / before) * 100:.1f}%")
+    finally:
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--count-tokens", action="store_true", help="Use the countTokens API")
+    parser.add_argument("--model", default="gemini-2.5-flash")
+    args = parser.parse_args()
+    asyncio.run(main(args.count_tokens, args.model))
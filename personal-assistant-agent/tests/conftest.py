@@ -0,0 +1,18 @@
+from collections.abc import Iterator
+
+import pytest
+
+from tests import fake_gemini
+
+
+@pytest.fixture(scope="session")
+def fake_gemini_url() -> Iterator[str]:
+    """Base URL of a local Gemini API stand-in (see tests/fake_gemini.py)."""
+    server, url = fake_gemini.serve()
+    yield url
+    server.should_exit = True
+
+
+@pytest.fixture(autouse=True)
+def _reset_fake_gemini() -> None:
+    fake_gemini.reset()
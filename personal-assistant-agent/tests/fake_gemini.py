@@ -0,0 +1,150 @@
+"""
+Local stand-in for the Gemini API (`generativelanguage.googleapis.com`).
+
+Implements just enough of `generateContent` and `cachedContents` to run the
+agent offline and to inspect what it sends: every request body is recorded
+on `app.state`. Replies are taken from `app.state.scripted_replies` (lists of
+Gemini `parts`) while any are queued, and are a plain "OK" otherwise. Point a
+google-genai client at it with `HttpOptions(base_url="http://127.0.0.1:<port>")`.
+
+Set FAKE_GEMINI_LATENCY_MS to simulate time-to-first-token and
+FAKE_GEMINI_MS_PER_OUTPUT_TOKEN to simulate decoding time. `streamGenerateContent`
+sends text parts a word at a time as server-sent events, as decoded.
+"""
+
+import asyncio
+import itertools
+import json
+import os
+import re
+import socket
+import threading
+import time
+from collections.abc import AsyncIterator
+from datetime import datetime, timedelta, timezone
+from functools import cached_property
+from typing import Any
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+from google.adk.models import Gemini
+from google.genai import Client, types
+
+app = FastAPI()
+app.state.generate_requests = []
+app.state.created_caches = []
+app.state.deleted_caches = []
+app.state.scripted_replies = []
+
+_cache_ids = itertools.count(1)
+
+
+def reset() -> None:
+    """Forget all recorded requests."""
+    app.state.generate_requests.clear()
+    app.state.created_caches.clear()
+    app.state.deleted_caches.clear()
+    app.state.scripted_replies.clear()
+
+
+def _estimate_tokens(body: Any) -> int:
+    return len(str(body)) // 4
+
+
+def _response(parts: list[dict], prompt_tokens: int, output_tokens: int) -> dict[str, Any]:
+    return {
+        "candidates": [
+            {
+                "content": {"role": "model", "parts": parts},
+                "finishReason": "STOP",
+            }
+        ],
+        "usageMetadata": {
+            "promptTokenCount": prompt_tokens,
+            "candidatesTokenCount": output_tokens,
+            "totalTokenCount": prompt_tokens + output_tokens,
+        },
+    }
+
+
+async def _sleep_ms(milliseconds: float) -> None:
+    if milliseconds:
+        await asyncio.sleep(milliseconds / 1000)
+
+
+async def _stream(parts: list[dict], prompt_tokens: int) -> AsyncIterator[str]:
+    """Send the text a word at a time, then the other parts (e.g. function calls) with the finish reason."""
+    ms_per_token = float(os.environ.get("FAKE_GEMINI_MS_PER_OUTPUT_TOKEN", "0"))
+    words = re.findall(r"\s*\S+", "".join(part["text"] for part in parts if "text" in part))
+    final_parts = [part for part in parts if "text" not in part]
+    if words and not final_parts:
+        final_parts = [{"text": words.pop()}]
+    await _sleep_ms(float(os.environ.get("FAKE_GEMINI_LATENCY_MS", "0")))
+    for word in words:
+        await _sleep_ms(max(_estimate_tokens(word), 1) * ms_per_token)
+        yield f"data: {json.dumps({'candidates': [{'content': {'role': 'model', 'parts': [{'text': word}]}}]})}\n\n"
+    await _sleep_ms(max(_estimate_tokens(final_parts), 1) * ms_per_token)
+    yield f"data: {json.dumps(_response(final_parts, prompt_tokens, max(_estimate_tokens(parts), 1)))}\n\n"
+
+
+@app.post("/{version}/models/{model_action}")
+async def generate_content(version: str, model_action: str, request: Request) -> Any:
+    body = await request.json()
+    app.state.generate_requests.append(body)
+    parts = app.state.scripted_replies.pop(0) if app.state.scripted_replies else [{"text": "OK"}]
+    prompt_tokens = _estimate_tokens(body)
+    if model_action.endswith(":streamGenerateContent"):
+        return StreamingResponse(_stream(parts, prompt_tokens), media_type="text/event-stream")
+    output_tokens = max(_estimate_tokens(parts), 1)
+    latency_ms = float(os.environ.get("FAKE_GEMINI_LATENCY_MS", "0"))
+    latency_ms += output_tokens * float(os.environ.get("FAKE_GEMINI_MS_PER_OUTPUT_TOKEN", "0"))
+    await _sleep_ms(latency_ms)
+    return _response(parts, prompt_tokens, output_tokens)
+
+
+@app.post("/{version}/cachedContents")
+async def create_cached_content(version: str, request: Request) -> dict[str, Any]:
+    body = await request.json()
+    app.state.created_caches.append(body)
+    ttl_seconds = float(body.get("ttl", "3600s").rstrip("s"))
+    now = datetime.now(timezone.utc)
+    return {
+        "name": f"cachedContents/stand-in-{next(_cache_ids)}",
+        "model": body.get("model"),
+        "createTime": now.isoformat(),
+        "expireTime": (now + timedelta(seconds=ttl_seconds)).isoformat(),
+        "usageMetadata": {"totalTokenCount": _estimate_tokens(body)},
+    }
+
+
+@app.delete("/{version}/cachedContents/{cache_id}")
+async def delete_cached_content(version: str, cache_id: str) -> dict[str, Any]:
+    app.state.deleted_caches.append(f"cachedContents/{cache_id}")
+    return {}
+
+
+class StandInGemini(Gemini):
+    """A Gemini model that talks to the stand-in at `base_url`."""
+
+    base_url: str
+
+    @cached_property
+    def api_client(self) -> Client:
+        return Client(
+            vertexai=False,
+            api_key="stand-in",
+            http_options=types.HttpOptions(base_url=self.base_url),
+        )
+
+
+def serve(asgi_app: Any = app) -> tuple[uvicorn.Server, str]:
+    """Start the stand-in (or another ASGI app) on a free local port in a background thread."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(asgi_app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, f"http://127.0.0.1:{port}"
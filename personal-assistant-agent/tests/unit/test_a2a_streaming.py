@@ -0,0 +1,94 @@
+import time
+
+import pytest
+from a2a.client import ClientConfig, ClientFactory
+from a2a.types import (
+    Artifact,
+    Task,
+    TaskArtifactUpdateEvent,
+    TaskState,
+    TaskStatus,
+    TextPart,
+)
+from google.adk.agents import Agent
+from google.adk.agents.run_config import RunConfig, StreamingMode
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from app.app_utils.a2a_streaming import StreamingRemoteA2aAgent, create_executor_config
+from tests import fake_gemini
+from tests.benchmarks.bench_delegated_streaming import ANSWER, serve_todo_agent
+
+
+@pytest.mark.asyncio
+async def test_delegated_answers_are_streamed_through(fake_gemini_url: str, monkeypatch) -> None:
+    monkeypatch.setenv("A2A_STREAMING_ENABLED", "true")
+    monkeypatch.setenv("FAKE_GEMINI_MS_PER_OUTPUT_TOKEN", "10")
+    server, card = serve_todo_agent(fake_gemini_url)
+    todo_agent = StreamingRemoteA2aAgent(
+        name="todo_agent", agent_card=card, a2a_client_factory=ClientFactory(ClientConfig())
+    )
+    agent = Agent(
+        name="personal_assistant_agent",
+        model=fake_gemini.StandInGemini(model="gemini-stand-in", base_url=fake_gemini_url),
+        sub_agents=[todo_agent],
+    )
+    fake_gemini.app.state.scripted_replies += [
+        [{"functionCall": {"name": "transfer_to_agent", "args": {"agent_name": "todo_agent"}}}],
+        [{"text": ANSWER}],
+    ]
+    runner = Runner(app_name="app", agent=agent, session_service=InMemorySessionService())
+    session = await runner.session_service.create_session(app_name="app", user_id="user")
+    message = types.Content(role="user", parts=[types.Part(text="What's due this week?")])
+
+    started = time.perf_counter()
+    timed_events = []
+    try:
+        async for event in runner.run_async(
+            user_id="user",
+            session_id=session.id,
+            new_message=message,
+            run_config=RunConfig(streaming_mode=StreamingMode.SSE),
+        ):
+            if event.author == "todo_agent":
+                timed_events.append((time.perf_counter() - started, event))
+    finally:
+        server.should_exit = True
+        await todo_agent.cleanup()
+
+    chunks = [(at, event) for at, event in timed_events if event.partial]
+    final_at, final = timed_events[-1]
+    assert "".join(event.content.parts[0].text for _, event in chunks) == ANSWER
+    assert final.content.parts[0].text == ANSWER
+    # The first words are relayed while the todo-agent is still generating.
+    assert final_at - chunks[0][0] > 0.1
+    # Chunks are passed on to the caller but not kept in the session.
+    session = await runner.session_service.get_session(app_name="app", user_id="user", session_id=session.id)
+    assert not any(event.partial for event in session.events)
+
+
+@pytest.mark.asyncio
+async def test_partial_artifact_updates_are_relayed() -> None:
+    todo_agent = StreamingRemoteA2aAgent(name="todo_agent", agent_card="http://todo-agent.local/card.json")
+    task = Task(id="t1", context_id="c1", status=TaskStatus(state=TaskState.working))
+    update = TaskArtifactUpdateEvent(
+        task_id="t1",
+        context_id="c1",
+        append=True,
+        last_chunk=False,
+        artifact=Artifact(artifact_id="a1", parts=[TextPart(text="You have")]),
+    )
+
+    event = await todo_agent._handle_a2a_response((task, update), ctx=None)
+
+    assert event.partial
+    assert event.content.parts[0].text == "You have"
+
+
+def test_streaming_is_opt_in(monkeypatch) -> None:
+    monkeypatch.delenv("A2A_STREAMING_ENABLED", raising=False)
+    assert create_executor_config().event_converter.__name__ == "convert_event_to_a2a_events"
+
+    monkeypatch.setenv("A2A_STREAMING_ENABLED", "true")
+    assert create_executor_config().event_converter.__name__ == "convert_event_with_partials"
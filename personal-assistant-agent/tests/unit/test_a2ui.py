@@ -0,0 +1,140 @@
+import json
+from types import SimpleNamespace
+
+import jsonschema
+import pytest
+from google.adk.agents import Agent
+from google.adk.events import Event
+from google.adk.models import LlmRequest
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from app.a2ui import (
+    A2UI_GUIDE,
+    A2UI_SCHEMA,
+    attach_a2ui_guide,
+    emit_rendered_card,
+    find_record,
+    is_ui_intent,
+    render_link_card_messages,
+    render_task_card_messages,
+)
+from app.agent import PAA_STATIC_INSTRUCTION
+from app.tools import render_link_card, render_task_card
+from tests import fake_gemini
+
+
+def _context(text: str) -> SimpleNamespace:
+    return SimpleNamespace(user_content=types.Content(role="user", parts=[types.Part(text=text)]))
+
+
+def test_schema_is_not_in_the_instruction() -> None:
+    """The instruction only points at the A2UI guide; the schema lives in the guide."""
+    assert A2UI_SCHEMA not in PAA_STATIC_INSTRUCTION
+    assert A2UI_SCHEMA in A2UI_GUIDE
+    assert "---BEGIN TASK DETAIL CARD EXAMPLE---" in A2UI_GUIDE
+
+
+def test_is_ui_intent() -> None:
+    assert is_ui_intent("Show me the details of the milk task")
+    assert is_ui_intent("view my last saved link")
+    assert is_ui_intent("Details for 'Buy milk'?")
+    assert not is_ui_intent("Save https://example.com")
+    assert not is_ui_intent("Remind me to call Customer A tomorrow")
+    assert not is_ui_intent("Show my tasks for today")
+
+
+def test_guide_attached_only_on_ui_intent() -> None:
+    """The guide is appended after the conversation on UI-intent turns only."""
+    request = LlmRequest(contents=[types.Content(role="user", parts=[types.Part(text="Save https://example.com")])])
+    attach_a2ui_guide(_context("Save https://example.com"), request)
+    assert len(request.contents) == 1
+
+    request = LlmRequest(contents=[types.Content(role="user", parts=[types.Part(text="View that link")])])
+    attach_a2ui_guide(_context("View that link"), request)
+    assert len(request.contents) == 2
+    assert request.contents[-1].parts[0].text == A2UI_GUIDE
+
+
+def _validate(messages: list[dict]) -> None:
+    schema = json.loads(A2UI_SCHEMA)
+    for message in messages:
+        jsonschema.validate(message, schema)
+
+
+def test_rendered_cards_match_the_schema() -> None:
+    """Rendered Task and Link cards are valid A2UI messages."""
+    task = render_task_card_messages({"title": "Buy milk", "status": "todo", "priority": "high", "dueDate": "2026-10-18"})
+    link = render_link_card_messages({"url": "https://example.com", "title": "Example", "image": "https://example.com/og.png"})
+    _validate(task)
+    _validate(link)
+
+    components = {c["id"]: c["component"] for c in task[1]["surfaceUpdate"]["components"]}
+    assert components["title"]["Text"]["text"]["literalString"] == "Buy milk"
+    assert components["desc"]["Text"]["text"]["literalString"] == "No description"
+    assert components["col"]["Column"]["children"]["explicitList"] == ["title", "status", "due", "desc"]
+
+
+def test_link_card_without_image() -> None:
+    """The image component is left out when the link has no preview image."""
+    messages = render_link_card_messages({"url": "https://example.com"})
+    _validate(messages)
+    column = messages[1]["surfaceUpdate"]["components"][1]["component"]["Column"]
+    assert column["children"]["explicitList"] == ["title", "url", "summary"]
+
+
+def _tool_result(author: str, name: str, response: dict) -> Event:
+    return Event(
+        author=author,
+        content=types.Content(role="user", parts=[types.Part.from_function_response(name=name, response=response)]),
+    )
+
+
+def _mcp_result(result: object) -> dict:
+    """A tool response as the MCP toolsets return it: the result as JSON text."""
+    return {"content": [{"type": "text", "text": json.dumps(result)}], "isError": False}
+
+
+def test_records_are_found_in_tool_results() -> None:
+    """Stash and (the Todo Agent's) Checkmate results are searched, newest first."""
+    events = [
+        _tool_result("personal_assistant_agent", "get_stashed_links", _mcp_result([{"id": 7, "url": "https://old"}])),
+        _tool_result("todo_agent", "get_tasks", _mcp_result({"tasks": [{"id": 3, "title": "Buy milk", "due_date": "2026-10-18"}]})),
+        _tool_result("personal_assistant_agent", "get_stashed_links", _mcp_result([{"id": 7, "url": "https://new"}])),
+    ]
+
+    assert find_record(events, "7")["url"] == "https://new"
+    assert find_record(events, "3")["title"] == "Buy milk"
+    assert find_record(events, "4") is None
+    components = {c["id"]: c["component"] for c in render_task_card_messages(find_record(events, "3"))[1]["surfaceUpdate"]["components"]}
+    assert components["due"]["Text"]["text"]["literalString"] == "Due: 2026-10-18"
+
+
+@pytest.mark.asyncio
+async def test_rendered_card_is_returned_without_another_model_call(fake_gemini_url: str) -> None:
+    """A render tool call ends the turn with the card; the model only names the record."""
+    link = {"id": 7, "url": "https://example.com", "title": "Example", "summary": "An example page."}
+    fake_gemini.app.state.scripted_replies.append(
+        [{"functionCall": {"name": "render_link_card", "args": {"link_id": "7"}}}]
+    )
+    agent = Agent(
+        name="personal_assistant_agent",
+        model=fake_gemini.StandInGemini(model="gemini-stand-in", base_url=fake_gemini_url),
+        instruction="Show cards.",
+        tools=[render_task_card, render_link_card],
+        before_model_callback=[emit_rendered_card, attach_a2ui_guide],
+    )
+    runner = Runner(app_name="app", agent=agent, session_service=InMemorySessionService())
+    session = await runner.session_service.create_session(app_name="app", user_id="user")
+    await runner.session_service.append_event(
+        session, _tool_result(agent.name, "get_stashed_links", _mcp_result([link]))
+    )
+
+    message = types.Content(role="user", parts=[types.Part(text="Show details of the Example link")])
+    events = [event async for event in runner.run_async(user_id="user", session_id=session.id, new_message=message)]
+
+    assert len(fake_gemini.app.state.generate_requests) == 1
+    final = events[-1]
+    assert final.is_final_response()
+    assert json.loads(final.content.parts[0].text) == render_link_card_messages(link)
@@ -0,0 +1,116 @@
+import json
+from types import SimpleNamespace
+
+from google.adk.models import LlmResponse
+from google.genai import types
+
+from app.a2ui import render_link_card_messages, render_task_card_messages
+from app.a2ui_validator import (
+    A2UIResponseValidator,
+    A2UIStreamValidator,
+    a2ui_validator,
+)
+
+TASK_CARD = render_task_card_messages({"title": "Buy milk", "dueDate": "2026-10-18"})
+
+
+def _begin(**styles) -> dict:
+    return {"beginRendering": {"surfaceId": "main", "root": "card", "styles": styles}}
+
+
+def test_valid_cards_have_no_violations() -> None:
+    assert a2ui_validator.validate(TASK_CARD) == []
+    assert a2ui_validator.validate(render_link_card_messages({"url": "https://example.com"})) == []
+
+
+def test_rules_stated_in_prose_are_enforced() -> None:
+    """One action per message and one type per component are checked, not just the schema."""
+    two_actions = {**TASK_CARD[0], **TASK_CARD[1]}
+    assert a2ui_validator.validate([two_actions])
+
+    update = json.loads(json.dumps(TASK_CARD[1]))
+    update["surfaceUpdate"]["components"][2]["component"]["Image"] = {"url": {"literalString": "x"}}
+    violations = a2ui_validator.validate([update])
+    assert [v.path for v in violations] == [".surfaceUpdate.components[2].component"]
+
+
+def test_repair_splits_messages_with_several_actions() -> None:
+    messages, dropped = a2ui_validator.repair([{**TASK_CARD[0], **TASK_CARD[1]}])
+    assert messages == TASK_CARD
+    assert dropped == []
+
+
+def test_repair_removes_only_the_offending_value() -> None:
+    """A bad primaryColor is dropped; the rest of the message is kept."""
+    messages, dropped = a2ui_validator.repair([_begin(primaryColor="blue", font="Roboto"), TASK_CARD[1]])
+    assert messages == [_begin(font="Roboto"), TASK_CARD[1]]
+    assert dropped == []
+
+
+def test_repair_drops_broken_components_and_their_references() -> None:
+    update = json.loads(json.dumps(TASK_CARD[1]))
+    update["surfaceUpdate"]["components"][3]["component"] = {"Text": {}, "Image": {}}
+
+    messages, dropped = a2ui_validator.repair([TASK_CARD[0], update])
+
+    assert dropped == []
+    assert a2ui_validator.validate(messages) == []
+    components = messages[1]["surfaceUpdate"]["components"]
+    assert "status" not in [c["id"] for c in components]
+    assert components[1]["component"]["Column"]["children"]["explicitList"] == ["title", "due", "desc"]
+
+
+def test_stream_flags_violations_as_soon_as_a_message_completes() -> None:
+    """A bad first message is reported before the rest of the response arrives."""
+    text = json.dumps([_begin(primaryColor="blue"), TASK_CARD[1]])
+    first_end = text.index("}}}") + 3
+    stream = A2UIStreamValidator(a2ui_validator)
+
+    early = []
+    for i in range(0, first_end + 1, 7):
+        early += stream.feed(text[i : min(i + 7, first_end + 1)])
+    assert [v.path for v in early] == [".beginRendering.styles.primaryColor"]
+
+    assert stream.feed(text[first_end + 1 :]) == []
+    assert stream.close() == []
+    assert len(stream.messages) == 2
+
+
+def test_stream_ignores_plain_text_and_reports_truncation() -> None:
+    for text in ("I'll ask the Todo agent {to handle} that.", "[x] Buy milk\n[ ] Call mum", '[{"title": "Buy milk"}'):
+        stream = A2UIStreamValidator(a2ui_validator)
+        assert stream.feed(text) == []
+        assert stream.is_a2ui is False
+        assert stream.close() == []
+
+    stream = A2UIStreamValidator(a2ui_validator)
+    stream.feed("```json\n" + json.dumps(TASK_CARD)[:-40])
+    assert stream.is_a2ui is True
+    assert len(stream.close()) == 1
+
+
+def _response(text: str, partial: bool = False) -> LlmResponse:
+    return LlmResponse(content=types.Content(role="model", parts=[types.Part(text=text)]), partial=partial)
+
+
+def test_callback_repairs_final_response() -> None:
+    callback = A2UIResponseValidator()
+    context = SimpleNamespace(invocation_id="inv-1")
+    text = json.dumps([_begin(primaryColor="blue"), TASK_CARD[1]])
+
+    assert callback(context, _response(text[:50], partial=True)) is None
+    repaired = callback(context, _response(f"```json\n{text}\n```"))
+
+    assert json.loads(repaired.content.parts[0].text) == [_begin(), TASK_CARD[1]]
+    assert callback(context, _response(json.dumps(TASK_CARD))) is None
+    assert callback(context, _response("Saved the link to Stash.")) is None
+
+
+def test_callback_leaves_other_lists_and_json_alone() -> None:
+    """Only A2UI messages are repaired; Markdown lists and other JSON answers pass through."""
+    callback = A2UIResponseValidator()
+    context = SimpleNamespace(invocation_id="inv-2")
+
+    assert callback(context, _response("[x] Buy milk\n[ ] Call mum")) is None
+    assert callback(context, _response("[1, 2, 3]")) is None
+    assert callback(context, _response(f"```json\n{json.dumps([{'title': 'Buy milk'}])}\n```")) is None
@@ -0,0 +1,104 @@
+import asyncio
+
+import httpx
+import pytest
+from a2a.types import AgentCapabilities, AgentCard
+
+from app.app_utils.agent_card_cache import AgentCardCache, CachedRemoteA2aAgent
+
+CARD_URL = "http://todo-agent.local/a2a/app/.well-known/agent-card.json"
+
+
+def _card(version: str = "0.1.0") -> dict:
+    return AgentCard(
+        name="todo_agent",
+        description="Manages tasks.",
+        url="http://todo-agent.local/a2a/app",
+        version=version,
+        capabilities=AgentCapabilities(streaming=True),
+        default_input_modes=["text/plain"],
+        default_output_modes=["text/plain"],
+        skills=[],
+    ).model_dump(mode="json", by_alias=True, exclude_none=True)
+
+
+def _card_server(calls: list[httpx.Request], card: dict, etag: str = '"v1"') -> httpx.AsyncClient:
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if request.headers.get("If-None-Match") == etag:
+            return httpx.Response(304, headers={"ETag": etag})
+        return httpx.Response(200, json=card, headers={"ETag": etag})
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+@pytest.mark.asyncio
+async def test_card_is_revalidated_with_etag(tmp_path) -> None:
+    """After the first fetch, an unchanged card costs a 304."""
+    calls: list[httpx.Request] = []
+    cache = AgentCardCache(CARD_URL, snapshot_path=str(tmp_path / "card.json"))
+    cache.http_client = _card_server(calls, _card())
+
+    card = await cache.get()
+    await cache.refresh()
+
+    assert card.version == "0.1.0"
+    assert "If-None-Match" not in calls[0].headers
+    assert calls[1].headers["If-None-Match"] == '"v1"'
+    assert cache.not_modified_count == 1
+    assert cache.card is card
+
+
+@pytest.mark.asyncio
+async def test_cold_start_uses_snapshot_without_waiting(tmp_path) -> None:
+    """A restart serves the snapshotted card while the todo-agent is still unreachable."""
+    snapshot_path = str(tmp_path / "card.json")
+    warm = AgentCardCache(CARD_URL, snapshot_path=snapshot_path)
+    warm.http_client = _card_server([], _card("0.2.0"))
+    await warm.refresh()
+
+    unblock = asyncio.Event()
+
+    async def slow_handler(request: httpx.Request) -> httpx.Response:
+        await unblock.wait()
+        return httpx.Response(503)
+
+    cold = AgentCardCache(CARD_URL, snapshot_path=snapshot_path)
+    cold.http_client = httpx.AsyncClient(transport=httpx.MockTransport(slow_handler))
+    await cold.start()
+    try:
+        card = await asyncio.wait_for(cold.get(), timeout=1)
+        assert card.version == "0.2.0"
+        assert cold.etag == '"v1"'
+    finally:
+        unblock.set()
+        await cold.aclose()
+
+
+@pytest.mark.asyncio
+async def test_failed_refresh_keeps_the_current_card(tmp_path) -> None:
+    cache = AgentCardCache(CARD_URL, snapshot_path=str(tmp_path / "card.json"))
+    cache.http_client = _card_server([], _card())
+    await cache.get()
+
+    cache.http_client = httpx.AsyncClient(transport=httpx.MockTransport(lambda request: httpx.Response(503)))
+    with pytest.raises(httpx.HTTPStatusError):
+        await cache.refresh()
+    assert (await cache.get()).version == "0.1.0"
+
+
+@pytest.mark.asyncio
+async def test_changed_card_resets_remote_agent(tmp_path) -> None:
+    """A new card version makes the remote agent re-create its A2A client."""
+    cache = AgentCardCache(CARD_URL)
+    cache.http_client = _card_server([], _card())
+    agent = CachedRemoteA2aAgent(card_cache=cache, name="todo_agent", description="Tasks")
+
+    assert (await agent._resolve_agent_card()).version == "0.1.0"
+    agent._is_resolved = True
+
+    cache.http_client = _card_server([], _card("0.2.0"), etag='"v2"')
+    await cache.refresh()
+
+    assert agent._is_resolved is False
+    assert (await agent._resolve_agent_card()).version == "0.2.0"
@@ -0,0 +1,98 @@
+import asyncio
+
+import pytest
+from google.adk.agents import Agent
+from google.adk.agents.context_cache_config import ContextCacheConfig
+from google.adk.apps.app import App
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.genai import types
+
+from app.a2ui import attach_a2ui_guide
+from app.agent import PAA_STATIC_INSTRUCTION, create_context_cache_config
+from app.tools import get_current_time
+from tests import fake_gemini
+
+
+def _runner(base_url: str, ttl_seconds: int = 1800) -> Runner:
+    agent = Agent(
+        name="personal_assistant_agent",
+        model=fake_gemini.StandInGemini(model="gemini-stand-in", base_url=base_url),
+        static_instruction=PAA_STATIC_INSTRUCTION,
+        tools=[get_current_time],
+        before_model_callback=attach_a2ui_guide,
+    )
+    app = App(
+        name="app",
+        root_agent=agent,
+        context_cache_config=ContextCacheConfig(ttl_seconds=ttl_seconds, min_tokens=0),
+    )
+    return Runner(app=app, session_service=InMemorySessionService())
+
+
+async def _send(runner: Runner, session_id: str, text: str) -> None:
+    message = types.Content(role="user", parts=[types.Part(text=text)])
+    async for _ in runner.run_async(user_id="user", session_id=session_id, new_message=message):
+        pass
+
+
+def _system_text(body: dict) -> str:
+    return "".join(part.get("text", "") for part in body["systemInstruction"]["parts"])
+
+
+def test_context_cache_is_opt_in(monkeypatch) -> None:
+    """Caching is off unless CONTEXT_CACHE_ENABLED is set."""
+    monkeypatch.delenv("CONTEXT_CACHE_ENABLED", raising=False)
+    assert create_context_cache_config() is None
+
+    monkeypatch.setenv("CONTEXT_CACHE_ENABLED", "true")
+    monkeypatch.setenv("CONTEXT_CACHE_TTL_SECONDS", "600")
+    config = create_context_cache_config()
+    assert config is not None
+    assert config.ttl_seconds == 600
+
+
+@pytest.mark.asyncio
+async def test_static_prefix_is_cached_and_reused(fake_gemini_url: str) -> None:
+    """The static instruction is uploaded once and then referenced by name."""
+    runner = _runner(fake_gemini_url)
+    session = await runner.session_service.create_session(app_name="app", user_id="user")
+
+    for text in ("Hi", "Save https://example.com", "Show details of that link"):
+        await _send(runner, session.id, text)
+
+    first, *rest = fake_gemini.app.state.generate_requests
+    assert "### Orchestration Strategies" in _system_text(first)
+
+    assert len(fake_gemini.app.state.created_caches) == 1
+    cache = fake_gemini.app.state.created_caches[0]
+    cache_name = rest[0]["cachedContent"]
+    assert "### Orchestration Strategies" in _system_text(cache)
+
+    for body in rest:
+        assert body["cachedContent"] == cache_name
+        assert "systemInstruction" not in body
+        # The latest user turn is always sent inline.
+        assert body["contents"][-1]["role"] == "user"
+    # The A2UI guide rides along after the conversation without breaking the cache.
+    assert rest[-1]["contents"][-2]["parts"][0]["text"] == "Show details of that link"
+    assert "---BEGIN A2UI JSON SCHEMA---" in rest[-1]["contents"][-1]["parts"][0]["text"]
+
+
+@pytest.mark.asyncio
+async def test_expired_cache_is_recreated(fake_gemini_url: str) -> None:
+    """Once the cache TTL has passed, a new cache is created for the same prefix."""
+    runner = _runner(fake_gemini_url, ttl_seconds=1)
+    session = await runner.session_service.create_session(app_name="app", user_id="user")
+
+    await _send(runner, session.id, "Hi")
+    await _send(runner, session.id, "What's on my list?")
+    assert len(fake_gemini.app.state.created_caches) == 1
+    expired_cache = fake_gemini.app.state.generate_requests[-1]["cachedContent"]
+
+    await asyncio.sleep(1.1)
+    await _send(runner, session.id, "And tomorrow?")
+
+    assert len(fake_gemini.app.state.created_caches) == 2
+    assert fake_gemini.app.state.deleted_caches == [expired_cache]
+    assert fake_gemini.app.state.generate_requests[-1]["cachedContent"] != expired_cache
@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+from app.agent import create_authenticated_httpx_client, todo_agent_remote
+from app.app_utils import http_client
+from app.app_utils.http_client import PoolMetricsTransport, create_http_client
+from app.fast_api_app import app, lifespan
+
+
+class _Recorder:
+    def __init__(self) -> None:
+        self.values: list[float] = []
+
+    def record(self, value: float, attributes: dict) -> None:
+        self.values.append(value)
+
+
+async def _slow_server(delay: float) -> tuple[asyncio.Server, str]:
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while await reader.readuntil(b"\r\n\r\n"):
+                await asyncio.sleep(delay)
+                writer.write(b"HTTP/1.1 200 OK\r\nContent-Length: 2\r\n\r\nok")
+                await writer.drain()
+        except asyncio.IncompleteReadError:
+            writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    return server, f"http://127.0.0.1:{port}/"
+
+
+def test_client_is_configured_from_environment(monkeypatch) -> None:
+    monkeypatch.setenv("A2A_HTTP_MAX_CONNECTIONS", "7")
+    monkeypatch.setenv("A2A_HTTP_CONNECT_TIMEOUT_SECONDS", "2")
+    client = create_authenticated_httpx_client(lambda _: {"Authorization": "Bearer t"})
+
+    transport = client._transport
+    assert isinstance(transport, PoolMetricsTransport)
+    assert transport.name == "a2a_http"
+    assert transport._pool._max_connections == 7
+    assert client.timeout.connect == 2
+    # Long streamed sub-agent turns aren't cut off by the shared default.
+    assert client.timeout.read == 600
+
+
+@pytest.mark.asyncio
+async def test_pool_saturation_is_reported(monkeypatch) -> None:
+    """With one connection, the second concurrent request waits for the first."""
+    recorder = _Recorder()
+    monkeypatch.setattr(http_client, "pool_wait_time", recorder)
+    monkeypatch.setenv("TEST_HTTP_MAX_CONNECTIONS", "1")
+    monkeypatch.setenv("TEST_HTTP_HTTP2", "false")
+    server, url = await _slow_server(0.2)
+
+    async with server, create_http_client("TEST_HTTP") as client:
+        transport = client._transport
+        requests = [asyncio.create_task(client.get(url)) for _ in range(2)]
+        await asyncio.sleep(0.1)
+        assert transport.queued_requests == 1
+        assert transport.connection_counts() == (1, 0)
+
+        assert [r.status_code for r in await asyncio.gather(*requests)] == [200, 200]
+        assert transport.queued_requests == 0
+        assert transport.connection_counts() == (0, 1)
+
+    assert len(recorder.values) == 2
+    assert min(recorder.values) < 50
+    assert max(recorder.values) >= 150
+
+
+@pytest.mark.asyncio
+async def test_each_lifespan_run_has_its_own_a2a_client(monkeypatch) -> None:
+    """A second run (test clients, reloads) doesn't send A2A calls through the first run's closed client."""
+    monkeypatch.setenv("STARTUP_MODE", "lazy")
+    clients = []
+    for _ in range(2):
+        async with lifespan(app):
+            client = todo_agent_remote._httpx_client
+            assert not client.is_closed
+            assert todo_agent_remote._a2a_client_factory._config.httpx_client is client
+            clients.append(client)
+        assert client.is_closed
+        assert todo_agent_remote._httpx_client is None
+
+    assert clients[0] is not clients[1]
@@ -0,0 +1,78 @@
+import pytest
+from google.adk.events import Event
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.adk.tools import FunctionTool
+from google.genai import types
+
+from app.agent import paa_agent, stash_tools, todo_agent_remote
+from app.app_utils.agent_card_cache import CachedRemoteA2aAgent
+from tests import fake_gemini
+
+URL = "https://example.com/post"
+TODO_CHUNKS = ["Added 'Read the post' ", "for Saturday."]
+
+
+async def stash_link(url: str) -> dict:
+    """Stands in for the Stash MCP tool."""
+    return {"url": url, "title": "The post"}
+
+
+async def _stash_tools(readonly_context=None) -> list[FunctionTool]:
+    return [FunctionTool(stash_link)]
+
+
+def _text_event(author: str, invocation_id: str, text: str, partial: bool) -> Event:
+    return Event(
+        author=author,
+        invocation_id=invocation_id,
+        partial=partial,
+        content=types.Content(role="model", parts=[types.Part(text=text)]),
+    )
+
+
+def test_todo_agent_has_one_delegation_path() -> None:
+    assert paa_agent.sub_agents == [todo_agent_remote]
+    assert not any(getattr(tool, "agent", None) is todo_agent_remote for tool in paa_agent.tools)
+
+
+@pytest.mark.asyncio
+async def test_hybrid_turn_streams_each_result_as_it_finishes(fake_gemini_url: str, monkeypatch) -> None:
+    """The Stash call and the transfer go out in one model turn, and each result is sent as it arrives."""
+    seen_by_todo_agent: list[Event] = []
+
+    async def run_todo_agent(self, ctx):
+        seen_by_todo_agent.extend(ctx.session.events)
+        for chunk in TODO_CHUNKS:
+            yield _text_event(self.name, ctx.invocation_id, chunk, partial=True)
+        yield _text_event(self.name, ctx.invocation_id, "".join(TODO_CHUNKS), partial=False)
+
+    monkeypatch.setattr(paa_agent, "model", fake_gemini.StandInGemini(model="gemini-stand-in", base_url=fake_gemini_url))
+    monkeypatch.setattr(stash_tools, "get_tools", _stash_tools)
+    monkeypatch.setattr(CachedRemoteA2aAgent, "_run_async_impl", run_todo_agent)
+    fake_gemini.app.state.scripted_replies.append(
+        [
+            {"text": "I'll save the link and ask the Todo agent to add the reminder."},
+            {"functionCall": {"name": "stash_link", "args": {"url": URL}}},
+            {"functionCall": {"name": "transfer_to_agent", "args": {"agent_name": "todo_agent"}}},
+        ]
+    )
+    runner = Runner(app_name="app", agent=paa_agent, session_service=InMemorySessionService())
+    session = await runner.session_service.create_session(app_name="app", user_id="user")
+    message = types.Content(role="user", parts=[types.Part(text=f"Save {URL} and remind me to read it this weekend")])
+
+    events = [event async for event in runner.run_async(user_id="user", session_id=session.id, new_message=message)]
+
+    assert len(fake_gemini.app.state.generate_requests) == 1
+    stash_result = next(
+        i for i, event in enumerate(events) if any(r.name == "stash_link" for r in event.get_function_responses())
+    )
+    todo_events = [event for event in events[stash_result + 1 :] if event.author == "todo_agent"]
+    assert [(event.partial, event.content.parts[0].text) for event in todo_events] == [
+        (True, TODO_CHUNKS[0]),
+        (True, TODO_CHUNKS[1]),
+        (False, "".join(TODO_CHUNKS)),
+    ]
+    # Delegated in the conversation's session, so the todo-agent sees the request and the Stash result.
+    assert seen_by_todo_agent[0].content == message
+    assert any(r.name == "stash_link" for event in seen_by_todo_agent for r in event.get_function_responses())
@@ -0,0 +1,108 @@
+import json
+
+import pytest
+from google.adk.agents import Agent, BaseAgent
+from google.adk.events import Event
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.adk.tools import FunctionTool
+from google.adk.tools.base_toolset import BaseToolset
+from google.genai import types
+
+from app.router import SAVE_LINK_PATTERN, create_intent_router
+from tests import fake_gemini
+
+
+def _result(value) -> dict:
+    return {"content": [{"type": "text", "text": json.dumps(value)}], "isError": False}
+
+
+def stash_link(url: str) -> dict:
+    """Stash a link."""
+    return _result({"id": "l1", "url": url, "title": "The post", "tags": ["AI"]})
+
+
+def get_stashed_links() -> dict:
+    """Get the stashed links."""
+    return _result([{"id": "l1", "url": "https://example.com/post", "title": "The post", "tags": []}])
+
+
+class _Stash(BaseToolset):
+    """Stands in for the Stash MCP toolset."""
+
+    async def get_tools(self, readonly_context=None):
+        return [FunctionTool(stash_link), FunctionTool(get_stashed_links)]
+
+    async def close(self) -> None:
+        pass
+
+
+class _TodoAgent(BaseAgent):
+    """Stands in for the remote todo-agent."""
+
+    async def _run_async_impl(self, ctx):
+        yield Event(
+            author=self.name,
+            invocation_id=ctx.invocation_id,
+            content=types.Content(role="model", parts=[types.Part(text="You have 1 task in Groceries.")]),
+        )
+
+
+async def _reply(base_url: str, text: str):
+    router = create_intent_router(_Stash(), "todo_agent")
+    agent = Agent(
+        name="personal_assistant_agent",
+        model=fake_gemini.StandInGemini(model="gemini-stand-in", base_url=base_url),
+        tools=[_Stash()],
+        sub_agents=[_TodoAgent(name="todo_agent")],
+        before_model_callback=router,
+        after_model_callback=router.after_model,
+    )
+    runner = Runner(app_name="app", agent=agent, session_service=InMemorySessionService())
+    session = await runner.session_service.create_session(app_name="app", user_id="user")
+    message = types.Content(role="user", parts=[types.Part(text=text)])
+    events = [event async for event in runner.run_async(user_id="user", session_id=session.id, new_message=message)]
+    return events, router
+
+
+@pytest.mark.asyncio
+async def test_links_are_saved_without_the_model(fake_gemini_url: str) -> None:
+    events, _ = await _reply(fake_gemini_url, "Save https://example.com/post")
+
+    assert fake_gemini.app.state.generate_requests == []
+    assert events[-1].content.parts[0].text == 'Saved "The post" to your Stash. Tags: AI.'
+
+
+@pytest.mark.asyncio
+async def test_task_listings_go_straight_to_the_todo_agent(fake_gemini_url: str) -> None:
+    events, _ = await _reply(fake_gemini_url, "Show me my tasks")
+
+    assert fake_gemini.app.state.generate_requests == []
+    assert events[-1].author == "todo_agent"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "text",
+    ["What's in my stash?", "What's on my reading list?", "Show me my reading list", "What is on my calendar"],
+)
+async def test_other_lists_are_left_to_the_model(fake_gemini_url: str, text: str) -> None:
+    events, _ = await _reply(fake_gemini_url, text)
+
+    assert len(fake_gemini.app.state.generate_requests) == 1
+    assert all(event.author != "todo_agent" for event in events)
+
+
+@pytest.mark.asyncio
+async def test_other_requests_fall_through_and_are_timed(fake_gemini_url: str) -> None:
+    events, router = await _reply(fake_gemini_url, "Save https://example.com/post and remind me to read it")
+
+    assert len(fake_gemini.app.state.generate_requests) == 1
+    assert events[-1].content.parts[0].text == "OK"
+    # The estimate moves towards the stand-in's (fast) round trip.
+    assert router.model_round_trip_ms < 1500
+
+
+def test_save_link_pattern_extracts_the_url() -> None:
+    assert SAVE_LINK_PATTERN.fullmatch("bookmark this link: https://example.com/a?b=1.")["url"] == "https://example.com/a?b=1"
+    assert not SAVE_LINK_PATTERN.fullmatch("save https://example.com/a to my reading list")
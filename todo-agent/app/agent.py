@@ -1,15 +1,18 @@
 import os
-import google.auth
 from typing import Any, Iterator
 from google.adk.agents import Agent
 from google.adk.apps.app import App
-from google.adk.models import Gemini
-from google.adk.tools import McpToolset
+from google.adk.models import BaseLlm, Gemini
 from google.adk.tools.mcp_tool import StreamableHTTPConnectionParams
 from google.genai import types
 
-from app.context import auth_token_ctx
-from app.tools import get_current_time
+from app.app_utils.mcp_pool import PooledMcpToolset
+from app.app_utils.model_tiering import TieredModel
+from app.app_utils.tool_result_cache import ToolResultCache, tool_ttls_from_env
+from app.context import auth_token_ctx, auth_user_ctx
+from app.dates import attach_resolved_dates
+from app.router import create_intent_router
+from app.tools import get_current_time, resolve_date
 
 def get_auth_headers(context: Any) -> dict[str, str]:
     """Retrieve auth headers from the current context variable."""
@@ -18,8 +21,6 @@ def get_auth_headers(context: Any) -> dict[str, str]:
         return {"Authorization": f"Bearer {token}"}
     return {}
 
-_, project_id = google.auth.default()
-os.environ["GOOGLE_CLOUD_PROJECT"] = project_id
 os.environ["GOOGLE_CLOUD_LOCATION"] = "global"
 os.environ["GOOGLE_GENAI_USE_VERTEXAI"] = "True"
 
@@ -30,17 +31,67 @@ checkmate_mcp_url = os.environ.get("CHECKMATE_MCP_URL")
 checkmate_connection_params = StreamableHTTPConnectionParams(
     url=checkmate_mcp_url,
 )
-checkmate_tools = McpToolset(
+# Results of read-only tools can be cached per user (opt-in); any other tool call drops them.
+checkmate_result_cache = ToolResultCache(
+    "checkmate.tool_results",
+    tool_ttls_from_env(["get_lists", "get_list", "get_tasks", "get_task", "get_task_stats"]),
+    max_users=int(os.environ.get("MCP_RESULT_CACHE_MAX_USERS", "1000")),
+)
+# MCP sessions are pooled per user, so follow-up turns skip the handshake,
+# and the tool list is cached, so model requests don't wait on list_tools.
+checkmate_tools = PooledMcpToolset(
     connection_params=checkmate_connection_params,
-    header_provider=get_auth_headers
+    header_provider=get_auth_headers,
+    session_key_provider=auth_user_ctx.get,
+    max_sessions=int(os.environ.get("MCP_SESSION_POOL_SIZE", "100")),
+    idle_ttl_seconds=float(os.environ.get("MCP_SESSION_IDLE_SECONDS", "300")),
+    health_check_seconds=float(os.environ.get("MCP_SESSION_HEALTH_CHECK_SECONDS", "60")),
+    tools_ttl_seconds=float(os.environ.get("MCP_TOOLS_CACHE_TTL_SECONDS", "3600")),
+    tools_snapshot_path=os.environ.get("CHECKMATE_TOOLS_SNAPSHOT_PATH"),
+    result_cache=checkmate_result_cache,
 )
 
-todo_agent = Agent(
-    name="todo_agent",
-    model=Gemini(
+
+def create_model() -> BaseLlm:
+    """
+    Build the agent's model from the environment.
+
+    Model tiering is opt-in (FAST_MODEL). When set, calls that `is_simple_turn`
+    judges simple go to FAST_MODEL, and are escalated to MODEL when the fast
+    answer fails, has a malformed or unknown function call, or its average
+    log-probability is below FAST_MODEL_MIN_AVG_LOGPROBS (if set).
+
+    Returns:
+        MODEL, or a TieredModel of FAST_MODEL and MODEL.
+    """
+    strong = Gemini(
         model=os.environ.get("MODEL", "gemini-3-flash-preview"),
         retry_options=types.HttpRetryOptions(attempts=3),
-    ),
+    )
+    fast_model = os.environ.get("FAST_MODEL")
+    if not fast_model:
+        return strong
+    min_avg_logprobs = os.environ.get("FAST_MODEL_MIN_AVG_LOGPROBS")
+    return TieredModel(
+        # Not retried: a failed fast call is escalated instead.
+        fast=Gemini(model=fast_model, retry_options=types.HttpRetryOptions(attempts=1)),
+        strong=strong,
+        min_avg_logprobs=float(min_avg_logprobs) if min_avg_logprobs else None,
+    )
+
+
+# With INTENT_ROUTER_ENABLED=true, trivially structured requests ("list my
+# tasks", "what's in Groceries") are answered from the Checkmate tools
+# directly, without a model call.
+intent_router = (
+    create_intent_router(checkmate_tools)
+    if os.environ.get("INTENT_ROUTER_ENABLED", "false").lower() == "true"
+    else None
+)
+
+todo_agent = Agent(
+    name="todo_agent",
+    model=create_model(),
     description="A specialist agent for managing to-do lists and tasks. It can create, update, list, and delete tasks and task lists.",
     instruction="""
     You are the Todo Agent, a specialist for managing the user's personal tasks and lists via the Checkmate service.
@@ -51,7 +102,7 @@ todo_agent = Agent(
     - Lists: list, create.
 
     ### Critical Rules
-    1. **Contextual Awareness**: Always check the current time helpers to resolve relative dates (e.g., "tomorrow", "next Friday").
+    1. **Contextual Awareness**: Dates in the user's message (e.g., "tomorrow", "next Friday") are resolved for you and attached to the request; use them as given. Resolve any other relative date with `resolve_date` instead of calculating it yourself.
     2. **List Resolution**:
         - Users may refer to lists by name (e.g., "Groceries").
         - The default list is 'Inbox' (implied if no list is specified or found).
@@ -64,10 +115,13 @@ todo_agent = Agent(
         - If listing tasks, present them clearly.
 
     ### Tools
-    - Use `get_current_time` to understand "now" and calculate relative dates.
+    - Use `resolve_date` to turn a relative date into ISO dates, and `get_current_time` only if you need the time of day.
     - Use MCP tools for all Checkmate interactions.
     """,
-    tools=[get_current_time, checkmate_tools]
+    tools=[get_current_time, resolve_date, checkmate_tools],
+    # Dates are resolved locally, so the model doesn't spend a tool call on the time.
+    before_model_callback=([intent_router] if intent_router else []) + [attach_resolved_dates],
+    after_model_callback=intent_router.after_model if intent_router else None,
 )
 
 app = App(root_agent=todo_agent, name="app")
@@ -0,0 +1,119 @@
+import os
+from typing import Any
+
+from a2a.server.agent_execution import RequestContext
+from a2a.server.events import Event as A2AEvent
+from a2a.types import Message, Role, TaskArtifactUpdateEvent, TaskStatusUpdateEvent
+from google.adk.a2a.converters.event_converter import (
+    convert_a2a_message_to_event,
+    convert_event_to_a2a_events,
+)
+from google.adk.a2a.converters.part_converter import (
+    A2APartToGenAIPartConverter,
+    GenAIPartToA2APartConverter,
+    convert_a2a_part_to_genai_part,
+    convert_genai_part_to_a2a_part,
+)
+from google.adk.a2a.converters.request_converter import (
+    AgentRunRequest,
+    convert_a2a_request_to_agent_run_request,
+)
+from google.adk.a2a.executor.a2a_agent_executor import A2aAgentExecutorConfig
+from google.adk.agents.invocation_context import InvocationContext
+from google.adk.agents.remote_a2a_agent import RemoteA2aAgent
+from google.adk.agents.run_config import StreamingMode
+from google.adk.events import Event
+
+# Set on the message of a status update that carries a streamed chunk (the
+# same "adk_" prefix ADK uses for its own A2A metadata).
+PARTIAL_METADATA_KEY = "adk_partial"
+
+
+def is_partial(message: Message | None) -> bool:
+    """Whether `message` is a streamed chunk rather than a complete message."""
+    return bool(message and message.metadata and message.metadata.get(PARTIAL_METADATA_KEY))
+
+
+def convert_request_for_streaming(
+    request: RequestContext,
+    part_converter: A2APartToGenAIPartConverter = convert_a2a_part_to_genai_part,
+) -> AgentRunRequest:
+    """ADK's request converter, with the model's response streamed (SSE) instead of awaited."""
+    run_request = convert_a2a_request_to_agent_run_request(request, part_converter)
+    run_request.run_config.streaming_mode = StreamingMode.SSE
+    return run_request
+
+
+def convert_event_with_partials(
+    event: Event,
+    invocation_context: InvocationContext,
+    task_id: str | None = None,
+    context_id: str | None = None,
+    part_converter: GenAIPartToA2APartConverter = convert_genai_part_to_a2a_part,
+) -> list[A2AEvent]:
+    """
+    ADK's event converter, with partial events marked as such.
+
+    A partial event becomes a `working` status update whose message has
+    `adk_partial: true` and holds just the new text. The complete event that
+    follows it repeats the whole text and carries the event's metadata, so
+    the chunks leave the metadata out.
+    """
+    if not event.partial:
+        return convert_event_to_a2a_events(event, invocation_context, task_id, context_id, part_converter)
+    chunk = event.model_copy(update={"custom_metadata": None, "usage_metadata": None})
+    a2a_events = convert_event_to_a2a_events(chunk, invocation_context, task_id, context_id, part_converter)
+    for a2a_event in a2a_events:
+        if isinstance(a2a_event, TaskStatusUpdateEvent) and a2a_event.status.message:
+            message = a2a_event.status.message
+            message.metadata = {**(message.metadata or {}), PARTIAL_METADATA_KEY: True}
+    return a2a_events
+
+
+def create_executor_config() -> A2aAgentExecutorConfig:
+    """
+    Build the `A2aAgentExecutor` config from the environment.
+
+    Streaming is opt-in (A2A_STREAMING_ENABLED=true). When enabled, the
+    agent's model responses are streamed and every chunk is published to the
+    caller's stream as soon as it arrives; after-model callbacks that check
+    the response (e.g. A2UI validation) only see the complete one, after its
+    chunks have been sent. Otherwise an update is published per complete
+    event.
+    """
+    if os.environ.get("A2A_STREAMING_ENABLED", "false").lower() != "true":
+        return A2aAgentExecutorConfig()
+    return A2aAgentExecutorConfig(
+        request_converter=convert_request_for_streaming,
+        event_converter=convert_event_with_partials,
+    )
+
+
+class StreamingRemoteA2aAgent(RemoteA2aAgent):
+    """
+    A `RemoteA2aAgent` that relays the remote agent's streamed chunks.
+
+    `RemoteA2aAgent` turns a working status update into a thought and drops
+    partial artifact updates. Here, status updates marked `adk_partial` (see
+    `convert_event_with_partials`) and partial artifact updates become
+    partial events, which the runner passes on to the caller without adding
+    them to the session. The complete response still arrives as before.
+    """
+
+    async def _handle_a2a_response(self, a2a_response: Any, ctx: InvocationContext) -> Event | None:
+        if isinstance(a2a_response, tuple):
+            _, update = a2a_response
+            message = None
+            if isinstance(update, TaskStatusUpdateEvent) and is_partial(update.status.message):
+                message = update.status.message
+            elif (
+                isinstance(update, TaskArtifactUpdateEvent)
+                and not update.last_chunk
+                and (update.append or update.last_chunk is False)
+            ):
+                message = Message(message_id="", role=Role.agent, parts=update.artifact.parts)
+            if message is not None:
+                event = convert_a2a_message_to_event(message, self.name, ctx, self._a2a_part_converter)
+                event.partial = True
+                return event
+        return await super()._handle_a2a_response(a2a_response, ctx)
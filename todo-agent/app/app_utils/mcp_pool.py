@@ -0,0 +1,424 @@
+import asyncio
+import logging
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from contextlib import AsyncExitStack
+from dataclasses import dataclass, field
+from typing import Any
+
+import httpx
+from google.adk.agents.readonly_context import ReadonlyContext
+from google.adk.auth.auth_credential import AuthCredential
+from google.adk.tools import McpToolset
+from google.adk.tools.base_tool import BaseTool
+from google.adk.tools.mcp_tool.mcp_session_manager import (
+    MCPSessionManager,
+    StreamableHTTPConnectionParams,
+    retry_on_errors,
+)
+from google.adk.tools.mcp_tool.mcp_tool import MCPTool
+from google.adk.tools.tool_context import ToolContext
+from mcp import ClientSession, types
+from mcp.client.streamable_http import streamable_http_client
+
+from app.app_utils.mcp_tool_cache import ToolSchemaCache
+from app.app_utils.metrics import meter
+from app.app_utils.single_flight import SingleFlight
+from app.app_utils.tool_result_cache import ToolResultCache
+
+logger = logging.getLogger(__name__)
+
+DRAIN_TIMEOUT_SECONDS = 0.1
+
+mcp_sessions = meter.create_counter(
+    "mcp.sessions",
+    description="MCP session pool lookups and evictions, by outcome.",
+)
+mcp_tool_schemas = meter.create_counter(
+    "mcp.tool_schemas",
+    description="MCP tool list lookups, by outcome (hit, stale, miss).",
+)
+
+
+class _DrainOnClose(httpx.AsyncByteStream):
+    """Reads what is left of a response body on close, so its connection can be reused."""
+
+    def __init__(self, stream: httpx.AsyncByteStream, timeout: float) -> None:
+        self._stream = stream
+        self._timeout = timeout
+
+    async def __aiter__(self):
+        async for chunk in self._stream:
+            yield chunk
+
+    async def _drain(self) -> None:
+        async for _ in self._stream:
+            pass
+
+    async def aclose(self) -> None:
+        try:
+            await asyncio.wait_for(self._drain(), self._timeout)
+        except Exception:
+            pass
+        finally:
+            await self._stream.aclose()
+
+
+class SharedTransport(httpx.AsyncBaseTransport):
+    """
+    Lends a pooled transport to a client without closing it when the client closes.
+
+    The MCP client closes an SSE response as soon as it has read the JSON-RPC
+    reply, before the server ends the stream. Over HTTP/1.1 that would close
+    the connection, so the rest of the body is drained for up to
+    `drain_timeout` seconds first.
+    """
+
+    def __init__(self, transport: httpx.AsyncBaseTransport, drain_timeout: float = DRAIN_TIMEOUT_SECONDS) -> None:
+        self.transport = transport
+        self.drain_timeout = drain_timeout
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        response = await self.transport.handle_async_request(request)
+        response.stream = _DrainOnClose(response.stream, self.drain_timeout)
+        return response
+
+    async def aclose(self) -> None:
+        pass
+
+
+@dataclass
+class PooledSession:
+    """An initialized MCP session, kept open by its own task until `stop` is set."""
+
+    key: str
+    session: ClientSession
+    http_client: httpx.AsyncClient
+    last_used: float = field(default_factory=time.monotonic)
+    stop: asyncio.Event = field(default_factory=asyncio.Event)
+    task: asyncio.Task | None = None
+
+
+class PooledMCPSessionManager(MCPSessionManager):
+    """
+    An `MCPSessionManager` that pools Streamable HTTP sessions per user.
+
+    ADK keys sessions by their headers, so a refreshed token opens a new
+    session and old ones are never closed. Here sessions are keyed by
+    `session_key_provider()` (the user), the session's headers are updated to
+    the caller's on every lookup, and the pool is bounded: sessions idle for
+    `idle_ttl_seconds` are closed, the least recently used one is closed when
+    `max_sessions` is reached, and a session idle for longer than
+    `health_check_seconds` is pinged before it is reused.
+
+    Every session is opened and closed by its own task, so it can be closed
+    from any request. All sessions send requests through `http_transport`
+    when it is set, instead of opening connections of their own.
+    """
+
+    def __init__(
+        self,
+        *args,
+        session_key_provider: Callable[[], str] | None = None,
+        max_sessions: int = 100,
+        idle_ttl_seconds: float = 300,
+        health_check_seconds: float = 60,
+        **kwargs,
+    ) -> None:
+        super().__init__(*args, **kwargs)
+        self.http_transport: httpx.AsyncBaseTransport | None = None
+        self.session_key_provider = session_key_provider
+        self.max_sessions = max_sessions
+        self.idle_ttl_seconds = idle_ttl_seconds
+        self.health_check_seconds = health_check_seconds
+        # Version reported by the server when the latest session was opened.
+        self.server_version: str | None = None
+        self._pool: OrderedDict[str, PooledSession] = OrderedDict()
+        self._opening = SingleFlight()
+        self._closing: set[asyncio.Task] = set()
+        self._notification_listeners: list[Callable[[types.ServerNotification], None]] = []
+
+    def on_notification(self, listener: Callable[[types.ServerNotification], None]) -> None:
+        """Call `listener` with every notification the server sends on any session."""
+        self._notification_listeners.append(listener)
+
+    def __len__(self) -> int:
+        return len(self._pool)
+
+    async def create_session(self, headers: dict[str, str] | None = None) -> ClientSession:
+        if not isinstance(self._connection_params, StreamableHTTPConnectionParams):
+            return await super().create_session(headers)
+
+        merged_headers = self._merge_headers(headers) or {}
+        user = self.session_key_provider() if self.session_key_provider else ""
+        key = f"user_{user}" if user else self._generate_session_key(merged_headers)
+        self._evict_idle()
+
+        pooled = self._pool.get(key)
+        if pooled is not None and not await self._is_healthy(pooled):
+            mcp_sessions.add(1, {"outcome": "unhealthy"})
+            self._discard(pooled)
+            pooled = None
+        if pooled is None:
+            pooled = await self._opening.run(key, lambda: self._open(key, merged_headers))
+            outcome = "created"
+        else:
+            outcome = "reused"
+        mcp_sessions.add(1, {"outcome": outcome})
+
+        # A user's token changes over time; requests use the caller's.
+        pooled.http_client.headers.update(merged_headers)
+        pooled.last_used = time.monotonic()
+        self._pool.move_to_end(key)
+        return pooled.session
+
+    async def close(self) -> None:
+        await self._opening.cancel()
+        for pooled in list(self._pool.values()):
+            self._discard(pooled)
+        await asyncio.gather(*self._closing, return_exceptions=True)
+        await super().close()
+
+    async def _is_healthy(self, pooled: PooledSession) -> bool:
+        if pooled.task is None or pooled.task.done() or self._is_session_disconnected(pooled.session):
+            return False
+        if time.monotonic() - pooled.last_used < self.health_check_seconds:
+            return True
+        try:
+            await asyncio.wait_for(pooled.session.send_ping(), timeout=self._connection_params.timeout)
+        except Exception as e:
+            logger.info(f"MCP session {pooled.key} failed its health check: {e}")
+            return False
+        return True
+
+    def _evict_idle(self) -> None:
+        deadline = time.monotonic() - self.idle_ttl_seconds
+        for pooled in list(self._pool.values()):
+            if pooled.last_used > deadline:
+                break
+            mcp_sessions.add(1, {"outcome": "evicted_idle"})
+            self._discard(pooled)
+
+    def _discard(self, pooled: PooledSession) -> None:
+        if self._pool.get(pooled.key) is pooled:
+            del self._pool[pooled.key]
+        pooled.stop.set()
+
+    async def _open(self, key: str, merged_headers: dict[str, str]) -> PooledSession:
+        while len(self._pool) >= self.max_sessions:
+            mcp_sessions.add(1, {"outcome": "evicted_lru"})
+            self._discard(next(iter(self._pool.values())))
+
+        opened: asyncio.Future[PooledSession] = asyncio.get_running_loop().create_future()
+        task = asyncio.create_task(self._run_session(key, merged_headers, opened))
+        self._closing.add(task)
+        task.add_done_callback(self._closing.discard)
+        try:
+            pooled = await opened
+        except Exception as e:
+            raise ConnectionError(f"Failed to create MCP session: {e}") from e
+        self._pool[key] = pooled
+        logger.debug(f"Opened MCP session {key} ({len(self._pool)} pooled)")
+        return pooled
+
+    async def _run_session(
+        self, key: str, merged_headers: dict[str, str], opened: asyncio.Future
+    ) -> None:
+        params = self._connection_params
+        try:
+            async with AsyncExitStack() as stack:
+                http_client = await stack.enter_async_context(
+                    httpx.AsyncClient(
+                        transport=SharedTransport(self.http_transport) if self.http_transport else None,
+                        headers=merged_headers,
+                        timeout=httpx.Timeout(params.timeout, read=params.sse_read_timeout),
+                        follow_redirects=True,
+                    )
+                )
+                streams = await stack.enter_async_context(
+                    streamable_http_client(
+                        params.url, http_client=http_client, terminate_on_close=params.terminate_on_close
+                    )
+                )
+                session = await stack.enter_async_context(
+                    ClientSession(*streams[:2], message_handler=self._handle_message)
+                )
+                result = await asyncio.wait_for(session.initialize(), timeout=params.timeout)
+                self.server_version = result.serverInfo.version
+
+                pooled = PooledSession(key, session, http_client, task=asyncio.current_task())
+                opened.set_result(pooled)
+                await pooled.stop.wait()
+        except Exception as e:
+            if not opened.done():
+                opened.set_exception(e)
+            else:
+                logger.warning(f"MCP session {key} ended with an error: {e}")
+        finally:
+            if not opened.done():
+                opened.cancel()
+            elif not opened.cancelled() and opened.exception() is None:
+                self._discard(opened.result())
+
+    async def _handle_message(self, message) -> None:
+        if isinstance(message, types.ServerNotification):
+            for listener in self._notification_listeners:
+                listener(message)
+
+
+class CachedMCPTool(MCPTool):
+    """An `MCPTool` that reads through, or invalidates, a per-user `ToolResultCache`."""
+
+    def __init__(self, *, result_cache: ToolResultCache, user_provider: Callable[[], str], **kwargs) -> None:
+        super().__init__(**kwargs)
+        self._result_cache = result_cache
+        self._user_provider = user_provider
+
+    async def _run_async_impl(
+        self, *, args: dict[str, Any], tool_context: ToolContext, credential: AuthCredential
+    ) -> dict[str, Any]:
+        user = self._user_provider()
+        tool = self._mcp_tool.name
+        if not user:
+            return await super()._run_async_impl(args=args, tool_context=tool_context, credential=credential)
+
+        cache = self._result_cache
+        if not cache.is_read_only(tool):
+            try:
+                return await super()._run_async_impl(args=args, tool_context=tool_context, credential=credential)
+            finally:
+                cache.invalidate(user, tool)
+
+        cached = cache.get(user, tool, args)
+        if cached is not None:
+            return cached
+        generation = cache.generation
+        result = await super()._run_async_impl(args=args, tool_context=tool_context, credential=credential)
+        if not result.get("isError"):
+            cache.set(user, tool, args, result, generation)
+        return result
+
+
+class PooledMcpToolset(McpToolset):
+    """
+    An `McpToolset` whose sessions are pooled per user and share a pooled transport.
+
+    The server's tool list is cached (see `ToolSchemaCache`), so building a
+    model request doesn't wait on `list_tools` once it has been listed. With
+    a `result_cache`, read-only tool results are cached per user as well.
+
+    Args:
+        session_key_provider: Returns the current user, to key sessions by.
+        max_sessions: Maximum number of open sessions.
+        idle_ttl_seconds: Sessions unused for this long are closed.
+        health_check_seconds: Sessions unused for this long are pinged before reuse.
+        tools_ttl_seconds: How long the tool list is used before it is refreshed.
+        tools_snapshot_path: Optional file to persist the tool list to.
+        result_cache: Optional per-user cache of read-only tool results, keyed
+            by `session_key_provider()`.
+        **kwargs: Arguments of `McpToolset`.
+    """
+
+    def __init__(
+        self,
+        *,
+        session_key_provider: Callable[[], str] | None = None,
+        max_sessions: int = 100,
+        idle_ttl_seconds: float = 300,
+        health_check_seconds: float = 60,
+        tools_ttl_seconds: float = 3600,
+        tools_snapshot_path: str | None = None,
+        result_cache: ToolResultCache | None = None,
+        **kwargs,
+    ) -> None:
+        super().__init__(**kwargs)
+        self.result_cache = result_cache
+        self._mcp_session_manager = PooledMCPSessionManager(
+            connection_params=self._connection_params,
+            errlog=self._errlog,
+            session_key_provider=session_key_provider,
+            max_sessions=max_sessions,
+            idle_ttl_seconds=idle_ttl_seconds,
+            health_check_seconds=health_check_seconds,
+        )
+        self._mcp_session_manager.on_notification(self._on_server_notification)
+        self.tool_cache = ToolSchemaCache(
+            getattr(self._connection_params, "url", ""), ttl_seconds=tools_ttl_seconds, snapshot_path=tools_snapshot_path
+        )
+        self.tool_cache.load_snapshot()
+        self._listing = SingleFlight()
+        self._background: set[asyncio.Task] = set()
+
+    def use_http_transport(self, transport: httpx.AsyncBaseTransport | None) -> None:
+        """Open new MCP sessions over `transport`, e.g. one owned by the app lifespan."""
+        self._mcp_session_manager.http_transport = transport
+
+    async def get_tools(self, readonly_context: ReadonlyContext | None = None) -> list[BaseTool]:
+        headers = (
+            self._header_provider(readonly_context)
+            if self._header_provider and readonly_context
+            else None
+        )
+        cache = self.tool_cache
+        server_version = self._mcp_session_manager.server_version
+        if cache.tools is not None and server_version and cache.server_version != server_version:
+            logger.info(f"MCP server {cache.url} is now version {server_version}; listing its tools again")
+            cache.invalidate()
+
+        if cache.tools is None:
+            mcp_tool_schemas.add(1, {"outcome": "miss"})
+            await self._listing.run("tools", lambda: self._list_tools(headers))
+        elif cache.is_stale():
+            mcp_tool_schemas.add(1, {"outcome": "stale"})
+            task = asyncio.ensure_future(self._refresh_tools(headers))
+            self._background.add(task)
+            task.add_done_callback(self._background.discard)
+        else:
+            mcp_tool_schemas.add(1, {"outcome": "hit"})
+
+        tools = []
+        for tool in cache.tools or []:
+            kwargs = {
+                "mcp_tool": tool,
+                "mcp_session_manager": self._mcp_session_manager,
+                "auth_scheme": self._auth_scheme,
+                "auth_credential": self._auth_credential,
+                "require_confirmation": self._require_confirmation,
+                "header_provider": self._header_provider,
+            }
+            user_provider = self._mcp_session_manager.session_key_provider
+            if self.result_cache is not None and user_provider is not None:
+                mcp_tool = CachedMCPTool(result_cache=self.result_cache, user_provider=user_provider, **kwargs)
+            else:
+                mcp_tool = MCPTool(**kwargs)
+            if self._is_tool_selected(mcp_tool, readonly_context):
+                tools.append(mcp_tool)
+        return tools
+
+    @retry_on_errors
+    async def _list_tools(self, headers: dict[str, str] | None) -> None:
+        session = await self._mcp_session_manager.create_session(headers=headers)
+        try:
+            result = await asyncio.wait_for(session.list_tools(), timeout=self._connection_params.timeout)
+        except Exception as e:
+            raise ConnectionError("Failed to get tools from MCP server.") from e
+        self.tool_cache.set(result.tools, self._mcp_session_manager.server_version)
+
+    async def _refresh_tools(self, headers: dict[str, str] | None) -> None:
+        try:
+            await self._listing.run("tools", lambda: self._list_tools(headers))
+        except Exception as e:
+            logger.warning(f"Failed to refresh the tools of {self.tool_cache.url}; using the cached list: {e}")
+
+    def _on_server_notification(self, notification: types.ServerNotification) -> None:
+        if isinstance(notification.root, types.ToolListChangedNotification):
+            logger.info(f"Tools of {self.tool_cache.url} changed; listing them again")
+            self.tool_cache.invalidate()
+
+    async def close(self) -> None:
+        for task in list(self._background):
+            task.cancel()
+        await asyncio.gather(*self._background, return_exceptions=True)
+        await self._listing.cancel()
+        await super().close()
@@ -0,0 +1,83 @@
+import json
+import logging
+import os
+import time
+
+from mcp import types
+
+logger = logging.getLogger(__name__)
+
+
+class ToolSchemaCache:
+    """
+    Keeps an MCP server's tool list, from which function declarations are built.
+
+    Entries expire after `ttl_seconds`; an expired list is still served while
+    it is refreshed in the background. `invalidate()` (on a
+    `tools/list_changed` notification or a new server version) drops it, so
+    the next lookup waits for a fresh list. With a `snapshot_path`, every new
+    list is written to disk and loaded on a cold start.
+    """
+
+    def __init__(self, url: str, ttl_seconds: float = 3600, snapshot_path: str | None = None) -> None:
+        self.url = url
+        self.ttl_seconds = ttl_seconds
+        self.snapshot_path = snapshot_path
+        self.tools: list[types.Tool] | None = None
+        self.server_version: str | None = None
+        self._expires_at = 0.0
+
+    def is_stale(self) -> bool:
+        """Whether the tool list has expired and should be refreshed."""
+        return time.monotonic() >= self._expires_at
+
+    def set(self, tools: list[types.Tool], server_version: str | None) -> None:
+        """Store a freshly listed tool list of the server at `server_version`."""
+        changed = server_version != self.server_version or tools != self.tools
+        self.tools = tools
+        self.server_version = server_version
+        self._expires_at = time.monotonic() + self.ttl_seconds
+        if changed:
+            logger.info(f"Cached {len(tools)} tools of {self.url} (version {server_version})")
+            self._write_snapshot()
+
+    def invalidate(self) -> None:
+        """Drop the tool list, so the next lookup lists the tools again."""
+        self.tools = None
+        self._expires_at = 0.0
+
+    def load_snapshot(self) -> bool:
+        """Load the tool list from the snapshot file, if there is one; it is refreshed on first use."""
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return False
+        try:
+            with open(self.snapshot_path, encoding="utf-8") as f:
+                snapshot = json.load(f)
+            if snapshot.get("url") != self.url:
+                return False
+            self.tools = [types.Tool.model_validate(tool) for tool in snapshot["tools"]]
+            self.server_version = snapshot.get("server_version")
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable tool snapshot {self.snapshot_path}: {e}")
+            return False
+        self._expires_at = 0.0
+        logger.info(f"Loaded {len(self.tools)} tools of {self.url} from {self.snapshot_path}")
+        return True
+
+    def _write_snapshot(self) -> None:
+        if not self.snapshot_path:
+            return
+        snapshot = {
+            "url": self.url,
+            "server_version": self.server_version,
+            "fetched_at": time.time(),
+            "tools": [tool.model_dump(mode="json", by_alias=True, exclude_none=True) for tool in self.tools or []],
+        }
+        tmp_path = f"{self.snapshot_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.snapshot_path) or ".", exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(snapshot, f)
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError as e:
+            logger.warning(f"Failed to write tool snapshot {self.snapshot_path}: {e}")
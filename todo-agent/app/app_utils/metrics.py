@@ -0,0 +1,30 @@
+from opentelemetry import metrics
+
+from app.app_utils.cache import TTLCache
+from app.app_utils.rate_limit import TokenBucketLimiter
+
+# Instruments are no-ops until a MeterProvider is configured (see telemetry.py).
+meter = metrics.get_meter(__name__)
+
+
+def register_cache_metrics(cache: TTLCache) -> None:
+    """Export the size and hit rate of `cache` as OpenTelemetry gauges."""
+    meter.create_observable_gauge(
+        f"{cache.name}.size",
+        callbacks=[lambda _options: [metrics.Observation(len(cache))]],
+        description=f"Number of entries in the {cache.name} cache.",
+    )
+    meter.create_observable_gauge(
+        f"{cache.name}.hit_rate",
+        callbacks=[lambda _options: [metrics.Observation(cache.hit_rate)]],
+        description=f"Fraction of {cache.name} lookups served from the cache.",
+    )
+
+
+def register_limiter_metrics(limiter: TokenBucketLimiter) -> None:
+    """Export the number of keys tracked by `limiter` as an OpenTelemetry gauge."""
+    meter.create_observable_gauge(
+        f"{limiter.name}.tracked_keys",
+        callbacks=[lambda _options: [metrics.Observation(len(limiter))]],
+        description=f"Keys currently tracked by the {limiter.name} limiter.",
+    )
@@ -0,0 +1,69 @@
+import math
+import time
+from collections import OrderedDict
+from typing import Any
+
+
+class TokenBucketLimiter:
+    """
+    Per-key token buckets.
+
+    Each key starts with `burst` tokens that refill at `rate_per_second`;
+    callers `consume()` a token per event they want to limit (e.g. a failed
+    authentication) and check `is_limited()` before doing expensive work.
+    The number of tracked keys is bounded; the least recently used are dropped.
+
+    The limiter is not thread-safe; it is meant to be used from the serving
+    event loop only.
+    """
+
+    def __init__(self, name: str, rate_per_second: float, burst: float, max_keys: int = 10000) -> None:
+        self.name = name
+        self.rate_per_second = rate_per_second
+        self.burst = burst
+        self.max_keys = max_keys
+        self.limited = 0
+        # key -> (tokens, last refill time)
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def _tokens(self, key: str, now: float) -> float:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            return self.burst
+        tokens, updated_at = bucket
+        return min(self.burst, tokens + (now - updated_at) * self.rate_per_second)
+
+    def is_limited(self, key: str) -> bool:
+        """Return True if `key` has used up its bucket."""
+        if key not in self._buckets:
+            return False
+        if self._tokens(key, time.monotonic()) >= 1:
+            return False
+        self.limited += 1
+        return True
+
+    def consume(self, key: str, amount: float = 1) -> None:
+        """Take `amount` tokens from the bucket of `key`."""
+        now = time.monotonic()
+        self._buckets[key] = (max(self._tokens(key, now) - amount, 0.0), now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+
+    def retry_after(self, key: str) -> int:
+        """Return the number of whole seconds until `key` regains one token."""
+        missing = 1 - self._tokens(key, time.monotonic())
+        if missing <= 0 or self.rate_per_second <= 0:
+            return 0
+        return math.ceil(missing / self.rate_per_second)
+
+    def stats(self) -> dict[str, Any]:
+        """Return a snapshot of the limiter state."""
+        return {
+            "name": self.name,
+            "tracked_keys": len(self._buckets),
+            "limited": self.limited,
+        }
@@ -0,0 +1,218 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Any
+
+from a2a.server.apps import A2AFastAPIApplication
+from a2a.types import AgentCard
+from starlette.requests import Request
+from starlette.responses import Response
+
+logger = logging.getLogger(__name__)
+
+
+class ServedAgentCard:
+    """
+    The agent's own card, served at once and completed in the background.
+
+    Building the full card lists the agent's MCP tools, so it waits on the
+    MCP server. `start()` doesn't: it serves the snapshot of the last full
+    card, or the `limited` card without one, and builds the full card in the
+    background, retrying with exponential backoff until it succeeds. The
+    built card replaces the served one in a single assignment, is passed to
+    the `on_change` listeners and is written to the snapshot file.
+    """
+
+    def __init__(
+        self,
+        build: Callable[[], Awaitable[AgentCard]],
+        limited: AgentCard,
+        snapshot_path: str | None = None,
+        retry_initial_seconds: float = 1,
+        retry_max_seconds: float = 60,
+        max_age_seconds: int = 300,
+    ) -> None:
+        self.build = build
+        self.limited = limited
+        self.snapshot_path = snapshot_path
+        self.retry_initial_seconds = retry_initial_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.max_age_seconds = max_age_seconds
+        self.card = limited
+        # Where the served card came from: "limited", "snapshot" or "built".
+        self.source = "limited"
+        self.attempts = 0
+        self.last_error: str | None = None
+        self._listeners: list[Callable[[AgentCard], None]] = []
+        self._build_task: asyncio.Task | None = None
+
+    @property
+    def ready(self) -> bool:
+        """
+        Whether the full card has been built in this process.
+
+        A card from the snapshot doesn't count: it may be out of date, and the
+        MCP server may still be unreachable.
+        """
+        return self.source == "built"
+
+    @property
+    def max_age(self) -> int:
+        """
+        How long clients may reuse the served card without revalidating it.
+
+        0 until the card has been built: the limited card is incomplete, and
+        a snapshot may be out of date, so clients revalidate it.
+        """
+        return self.max_age_seconds if self.ready else 0
+
+    def on_change(self, listener: Callable[[AgentCard], None]) -> None:
+        """Call `listener` with the new card whenever the served card is replaced."""
+        self._listeners.append(listener)
+
+    async def start(self) -> None:
+        """Load the snapshot and start building the full card in the background."""
+        self.attempts = 0
+        self.last_error = None
+        snapshot = self.load_snapshot()
+        if snapshot is not None:
+            self._set_card(snapshot, "snapshot")
+        else:
+            self._set_card(self.limited, "limited")
+        self._build_task = asyncio.get_running_loop().create_task(self.run())
+
+    async def aclose(self) -> None:
+        """Stop building the card and forget the listeners."""
+        self._listeners.clear()
+        if self._build_task is not None:
+            self._build_task.cancel()
+            await asyncio.gather(self._build_task, return_exceptions=True)
+            self._build_task = None
+
+    async def run(self) -> None:
+        """Build the full card, retrying until it succeeds or the task is cancelled."""
+        delay = self.retry_initial_seconds
+        started = time.perf_counter()
+        while True:
+            self.attempts += 1
+            # A failing MCP connection can surface as a CancelledError, so each
+            # attempt runs as its own task to tell that apart from shutdown.
+            attempt = asyncio.get_running_loop().create_task(self.build())
+            try:
+                await asyncio.wait([attempt])
+            except asyncio.CancelledError:
+                attempt.cancel()
+                raise
+            if not attempt.cancelled() and attempt.exception() is None:
+                break
+            self.last_error = "cancelled" if attempt.cancelled() else str(attempt.exception())
+            logger.warning(
+                f"Failed to build agent card (attempt {self.attempts}, retrying in {delay:.0f}s): {self.last_error}"
+            )
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, self.retry_max_seconds)
+
+        self.last_error = None
+        logger.info(f"Built agent card in {time.perf_counter() - started:.1f}s (attempt {self.attempts})")
+        self._set_card(attempt.result(), "built")
+        self._write_snapshot()
+
+    def load_snapshot(self) -> AgentCard | None:
+        """Read the card from the snapshot file, if there is one for this agent and URL."""
+        if not self.snapshot_path or not os.path.exists(self.snapshot_path):
+            return None
+        try:
+            with open(self.snapshot_path, encoding="utf-8") as f:
+                card = AgentCard.model_validate(json.load(f))
+        except Exception as e:
+            logger.warning(f"Ignoring unreadable agent card snapshot {self.snapshot_path}: {e}")
+            return None
+        if (card.name, card.url) != (self.limited.name, self.limited.url):
+            return None
+        logger.info(f"Loaded agent card from {self.snapshot_path}")
+        return card
+
+    def _write_snapshot(self) -> None:
+        if not self.snapshot_path:
+            return
+        tmp_path = f"{self.snapshot_path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.snapshot_path) or ".", exist_ok=True)
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(self.card.model_dump_json(by_alias=True, exclude_none=True))
+            os.replace(tmp_path, self.snapshot_path)
+        except OSError as e:
+            logger.warning(f"Failed to write agent card snapshot {self.snapshot_path}: {e}")
+
+    def _set_card(self, card: AgentCard, source: str) -> None:
+        self.card = card
+        self.source = source
+        for listener in self._listeners:
+            listener(card)
+
+
+@dataclass(frozen=True)
+class CardResponse:
+    """An agent card serialized once, with its strong ETag and `Cache-Control`."""
+
+    body: bytes
+    etag: str
+    cache_control: str
+
+    @classmethod
+    def of(cls, card: AgentCard, cache_control: str) -> "CardResponse":
+        body = card.model_dump_json(by_alias=True, exclude_none=True).encode("utf-8")
+        return cls(body, f'"{hashlib.sha256(body).hexdigest()[:32]}"', cache_control)
+
+    def respond(self, request: Request) -> Response:
+        """The card, or `304 Not Modified` when the request's `If-None-Match` has its ETag."""
+        headers = {"ETag": self.etag, "Cache-Control": self.cache_control}
+        if _etag_matches(request.headers.get("If-None-Match"), self.etag):
+            return Response(status_code=304, headers=headers)
+        return Response(self.body, media_type="application/json", headers=headers)
+
+
+def _etag_matches(if_none_match: str | None, etag: str) -> bool:
+    # If-None-Match uses the weak comparison, so a W/ prefix still matches.
+    if not if_none_match:
+        return False
+    tags = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in tags or any(tag.removeprefix("W/") == etag for tag in tags)
+
+
+class ServedCardA2AFastAPIApplication(A2AFastAPIApplication):
+    """
+    An `A2AFastAPIApplication` that serves the card of a `ServedAgentCard`.
+
+    The card is serialized when it is served or swapped, not per request,
+    and both card endpoints answer conditional GETs with `304 Not Modified`.
+    The same card is used as the public and the extended card.
+    """
+
+    def __init__(self, served_card: ServedAgentCard, **kwargs: Any) -> None:
+        super().__init__(agent_card=served_card.card, extended_agent_card=served_card.card, **kwargs)
+        self._served_card = served_card
+        self._serve(served_card.card)
+        served_card.on_change(self._serve)
+
+    def _serve(self, card: AgentCard) -> None:
+        max_age = self._served_card.max_age
+        public = CardResponse.of(card, f"public, max-age={max_age}" if max_age else "no-cache")
+        extended = CardResponse(public.body, public.etag, f"private, max-age={max_age}" if max_age else "no-cache")
+        # Each request reads one response object, so it never sees a mix of two cards.
+        self._card_response, self._extended_card_response = public, extended
+        self.agent_card = self.extended_agent_card = card
+        self.handler.agent_card = self.handler.extended_agent_card = card
+
+    async def _handle_get_agent_card(self, request: Request) -> Response:
+        return self._card_response.respond(request)
+
+    async def _handle_get_authenticated_extended_agent_card(self, request: Request) -> Response:
+        if not self.agent_card.supports_authenticated_extended_card:
+            return await super()._handle_get_authenticated_extended_agent_card(request)
+        return self._extended_card_response.respond(request)
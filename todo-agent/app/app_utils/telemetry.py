@@ -15,14 +15,20 @@
 import logging
 import os
 
-import google.auth
-from google.adk.cli.adk_web_server import _setup_instrumentation_lib_if_installed
-from google.adk.telemetry.google_cloud import get_gcp_exporters, get_gcp_resource
-from google.adk.telemetry.setup import maybe_set_otel_providers
+from app.app_utils.startup import default_credentials
 
 
 def setup_telemetry() -> str | None:
-    """Configure OpenTelemetry and GenAI telemetry with GCS upload."""
+    """
+    Configure OpenTelemetry and GenAI telemetry with GCS upload.
+
+    Run from the FastAPI lifespan rather than at import. The exporter
+    modules are imported here: they pull in the ADK web server, which the
+    app doesn't otherwise need.
+    """
+    from google.adk.cli.adk_web_server import _setup_instrumentation_lib_if_installed
+    from google.adk.telemetry.google_cloud import get_gcp_exporters, get_gcp_resource
+    from google.adk.telemetry.setup import maybe_set_otel_providers
 
     bucket = os.environ.get("LOGS_BUCKET_NAME")
     capture_content = os.environ.get(
@@ -54,10 +60,11 @@ def setup_telemetry() -> str | None:
         )
 
     # Set up OpenTelemetry exporters for Cloud Trace and Cloud Logging
-    credentials, project_id = google.auth.default()
+    credentials, project_id = default_credentials()
     otel_hooks = get_gcp_exporters(
         enable_cloud_tracing=True,
-        enable_cloud_metrics=False,
+        # Auth, cache and routing metrics are opt-in (exported to Cloud Monitoring).
+        enable_cloud_metrics=os.environ.get("ENABLE_CLOUD_METRICS", "false").lower() == "true",
         enable_cloud_logging=True,
         google_auth=(credentials, project_id),
     )
@@ -4,3 +4,7 @@ from contextvars import ContextVar
 # This allows deep access to the token (e.g., in MCP tool headers) without
 # passing it through every function call.
 auth_token_ctx: ContextVar[str] = ContextVar("auth_token_ctx", default="")
+
+# ContextVar to store the verified user ID for the current request context, so
+# per-user state (e.g. pooled MCP sessions) survives the user's token changing.
+auth_user_ctx: ContextVar[str] = ContextVar("auth_user_ctx", default="")
@@ -0,0 +1,198 @@
+import datetime
+import functools
+import os
+import re
+from collections.abc import Callable
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmRequest, LlmResponse
+from google.genai import types
+
+from app.app_utils.intent_router import user_message
+
+WEEKDAYS = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+MONTHS = ["jan", "feb", "mar", "apr", "may", "jun", "jul", "aug", "sep", "oct", "nov", "dec"]
+NUMBERS = {"a": 1, "an": 1, "one": 1, "two": 2, "three": 3, "four": 4, "five": 5, "six": 6, "seven": 7, "ten": 10}
+
+DateRange = tuple[datetime.date, datetime.date]
+Resolver = Callable[[re.Match, datetime.date], DateRange]
+
+_WEEKDAY = rf"(?P<weekday>{'|'.join(WEEKDAYS)})"
+_MONTH = r"(?P<month>jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)"
+_DAY = r"(?P<day>\d{1,2})(?:st|nd|rd|th)?"
+_YEAR = r"(?:,?\s+(?P<year>\d{4}))?"
+_COUNT = rf"(?P<count>\d+|{'|'.join(NUMBERS)})"
+_UNIT = r"(?P<unit>day|week|month)s?"
+
+# The user's IANA timezone, once known; user-scoped, so it is kept across sessions.
+TIMEZONE_STATE_KEY = "user:timezone"
+
+
+@functools.lru_cache(maxsize=64)
+def get_zone(name: str) -> datetime.tzinfo:
+    """Return the timezone `name` (IANA), or the server's local timezone if it is empty or unknown."""
+    if name:
+        try:
+            return ZoneInfo(name)
+        except (ZoneInfoNotFoundError, ValueError):
+            pass
+    return datetime.datetime.now().astimezone().tzinfo or datetime.timezone.utc
+
+
+def default_timezone() -> str:
+    """The timezone assumed when the user hasn't given one (DEFAULT_TIMEZONE, else the server's)."""
+    return os.environ.get("DEFAULT_TIMEZONE", "")
+
+
+def _day(date: datetime.date) -> DateRange:
+    return date, date
+
+
+def _add_months(date: datetime.date, months: int) -> datetime.date:
+    month = date.month - 1 + months
+    year, month = date.year + month // 12, month % 12 + 1
+    return date.replace(year=year, month=month, day=min(date.day, _month_end(year, month).day))
+
+
+def _month_end(year: int, month: int) -> datetime.date:
+    first_of_next = datetime.date(year + month // 12, month % 12 + 1, 1)
+    return first_of_next - datetime.timedelta(days=1)
+
+
+def _week(today: datetime.date, weeks: int) -> DateRange:
+    monday = today - datetime.timedelta(days=today.weekday()) + datetime.timedelta(weeks=weeks)
+    return monday, monday + datetime.timedelta(days=6)
+
+
+def _weekday(match: re.Match, today: datetime.date) -> DateRange:
+    weekday = WEEKDAYS.index(match["weekday"])
+    which = match["which"]
+    if which == "next":
+        # The one in the following week.
+        return _day(_week(today, 1)[0] + datetime.timedelta(days=weekday))
+    if which == "last":
+        return _day(today - datetime.timedelta(days=(today.weekday() - weekday - 1) % 7 + 1))
+    # "Friday", "this Friday", "on Friday": the next one, today included.
+    return _day(today + datetime.timedelta(days=(weekday - today.weekday()) % 7))
+
+
+def _weekend(match: re.Match, today: datetime.date) -> DateRange:
+    saturday = today - datetime.timedelta(days=today.weekday()) + datetime.timedelta(days=5)
+    if match["which"] == "next":
+        saturday += datetime.timedelta(weeks=1)
+    return saturday, saturday + datetime.timedelta(days=1)
+
+
+def _month(match: re.Match, today: datetime.date) -> DateRange:
+    first = _add_months(today.replace(day=1), {"this": 0, "next": 1, "last": -1}[match["which"]])
+    return first, _month_end(first.year, first.month)
+
+
+def _relative(match: re.Match, today: datetime.date) -> DateRange:
+    count = int(match["count"]) if match["count"].isdigit() else NUMBERS[match["count"]]
+    if match["unit"] == "month":
+        return _day(_add_months(today, count))
+    return _day(today + datetime.timedelta(days=count * (7 if match["unit"] == "week" else 1)))
+
+
+def _calendar_date(match: re.Match, today: datetime.date) -> DateRange:
+    month = MONTHS.index(match["month"][:3]) + 1
+    year = int(match["year"]) if match["year"] else today.year
+    date = datetime.date(year, month, int(match["day"]))
+    # "March 3" in October means next March.
+    if not match["year"] and date < today:
+        date = date.replace(year=year + 1)
+    return _day(date)
+
+
+def _iso_date(match: re.Match, today: datetime.date) -> DateRange:
+    return _day(datetime.date.fromisoformat(match[0]))
+
+
+# Tried in order; longer phrases come before the phrases they contain.
+PATTERNS: list[tuple[re.Pattern, Resolver]] = [
+    (re.compile(r"\d{4}-\d{2}-\d{2}"), _iso_date),
+    (re.compile(rf"{_MONTH}\.?\s+{_DAY}{_YEAR}"), _calendar_date),
+    (re.compile(rf"{_DAY}\s+(?:of\s+)?{_MONTH}{_YEAR}"), _calendar_date),
+    (re.compile(r"(?:the\s+)?day\s+after\s+tomorrow"), lambda m, today: _day(today + datetime.timedelta(days=2))),
+    (re.compile(r"tomorrow(?:\s+(?:morning|afternoon|evening|night))?"), lambda m, today: _day(today + datetime.timedelta(days=1))),
+    (re.compile(r"today|tonight|this\s+(?:morning|afternoon|evening)"), lambda m, today: _day(today)),
+    (re.compile(r"yesterday"), lambda m, today: _day(today - datetime.timedelta(days=1))),
+    (re.compile(rf"in\s+{_COUNT}\s+{_UNIT}"), _relative),
+    (re.compile(rf"{_COUNT}\s+{_UNIT}\s+from\s+(?:now|today)"), _relative),
+    (re.compile(r"(?:(?P<which>this|next|coming)\s+)?weekend"), _weekend),
+    (re.compile(r"end\s+of\s+(?:the\s+)?week"), lambda m, today: _day(_week(today, 0)[1])),
+    (re.compile(r"(?P<which>this|next|last)\s+week"), lambda m, today: _week(today, {"this": 0, "next": 1, "last": -1}[m["which"]])),
+    (re.compile(r"end\s+of\s+(?:the\s+)?month"), lambda m, today: _day(_month_end(today.year, today.month))),
+    (re.compile(r"(?P<which>this|next|last)\s+month"), _month),
+    (re.compile(rf"(?:(?P<which>this|next|last|coming)\s+|on\s+)?{_WEEKDAY}"), _weekday),
+]
+_SCANNERS = [(re.compile(rf"\b(?:{pattern.pattern})\b"), resolver) for pattern, resolver in PATTERNS]
+_NORMALIZE = re.compile(r"\s+")
+
+
+def resolve(expression: str, timezone: str = "", now: datetime.datetime | None = None) -> DateRange | None:
+    """
+    Resolve a relative or calendar date expression to a date range.
+
+    Args:
+        expression: E.g. "tomorrow", "next Friday", "this weekend", "in 3 days", "May 3".
+        timezone: IANA timezone that "today" is taken in (default: `default_timezone()`).
+        now: The current time (default: now).
+
+    Returns:
+        The first and last day of the range (the same day for a single
+        date), or None if the expression isn't understood.
+    """
+    text = _NORMALIZE.sub(" ", expression.strip().lower()).rstrip(".?!")
+    zone = get_zone(timezone or default_timezone())
+    today = (now.astimezone(zone) if now else datetime.datetime.now(zone)).date()
+    for pattern, resolver in PATTERNS:
+        match = pattern.fullmatch(text)
+        if match:
+            try:
+                return resolver(match, today)
+            except ValueError:
+                return None
+    return None
+
+
+def find_expressions(text: str) -> list[str]:
+    """Return the date expressions in `text`, in order of appearance."""
+    text = _NORMALIZE.sub(" ", text.lower())
+    found: list[tuple[int, int]] = []
+    for scanner, _ in _SCANNERS:
+        for match in scanner.finditer(text):
+            if not any(match.start() < end and start < match.end() for start, end in found):
+                found.append(match.span())
+    return [text[start:end] for start, end in sorted(found)]
+
+
+def describe(date_range: DateRange) -> str:
+    """E.g. "2026-10-23 (Friday)" or "2026-10-24 (Saturday) to 2026-10-25 (Sunday)"."""
+    start, end = (f"{date.isoformat()} ({date.strftime('%A')})" for date in date_range)
+    return start if date_range[0] == date_range[1] else f"{start} to {end}"
+
+
+def attach_resolved_dates(callback_context: CallbackContext, llm_request: LlmRequest) -> LlmResponse | None:
+    """
+    Before-model callback that resolves the dates mentioned in the user's message.
+
+    They are resolved in the user's timezone from the session state, if
+    known, and appended as request-only content, so the model can fill in due
+    dates without first calling `get_current_time` or `resolve_date`.
+    """
+    text = user_message(callback_context, llm_request)
+    timezone = callback_context.state.get(TIMEZONE_STATE_KEY) or default_timezone()
+    resolved = [(expression, resolve(expression, timezone)) for expression in find_expressions(text or "")]
+    lines = [f'- "{expression}" = {describe(date_range)}' for expression, date_range in resolved if date_range]
+    if lines:
+        today = describe(_day(datetime.datetime.now(get_zone(timezone)).date()))
+        llm_request.contents.append(
+            types.Content(
+                role="user",
+                parts=[types.Part(text=f"Dates in the user's message, resolved locally (today is {today}):\n" + "\n".join(lines))],
+            )
+        )
+    return None
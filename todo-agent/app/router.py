@@ -0,0 +1,56 @@
+import re
+from typing import Any
+
+from google.adk.agents.callback_context import CallbackContext
+from google.adk.models import LlmResponse
+from google.adk.tools.base_toolset import BaseToolset
+
+from app.app_utils.intent_router import (
+    LIST_CONTENTS_PATTERNS,
+    LIST_TASKS_PATTERN,
+    IntentRouter,
+    Route,
+    call_tool,
+    text_response,
+)
+
+
+def format_tasks(tasks: list[dict[str, Any]], list_title: str | None = None) -> str:
+    """Render tasks as a Markdown checklist."""
+    where = f" in {list_title}" if list_title else ""
+    if not tasks:
+        return f"You have no tasks{where}."
+    lines = [f"You have {len(tasks)} task{'s' if len(tasks) != 1 else ''}{where}:"]
+    for task in tasks:
+        details = [value for value in (task.get("dueDate") and f"due {task['dueDate']}", task.get("priority")) if value]
+        suffix = f" ({', '.join(details)})" if details else ""
+        lines.append(f"- [{'x' if task.get('status') == 'done' else ' '}] {task.get('title', '')}{suffix}")
+    return "\n".join(lines)
+
+
+def create_intent_router(checkmate_tools: BaseToolset) -> IntentRouter:
+    """Route "list my tasks" and "what's in <list>" straight to the Checkmate tools."""
+
+    async def list_tasks(match: re.Match, callback_context: CallbackContext) -> LlmResponse | None:
+        tasks = await call_tool(checkmate_tools, "get_tasks", {}, callback_context)
+        return text_response(format_tasks(tasks)) if isinstance(tasks, list) else None
+
+    async def list_contents(match: re.Match, callback_context: CallbackContext) -> LlmResponse | None:
+        name = match["name"].strip()
+        if name.lower() == "inbox":
+            list_id, title = "inbox", "Inbox"
+        else:
+            lists = await call_tool(checkmate_tools, "get_lists", {}, callback_context)
+            found = [
+                item for item in (lists or {}).get("lists", []) if item.get("title", "").casefold() == name.casefold()
+            ]
+            # Unknown or ambiguous list names are left to the model.
+            if len(found) != 1:
+                return None
+            list_id, title = found[0]["id"], found[0]["title"]
+        tasks = await call_tool(checkmate_tools, "get_tasks", {"listId": list_id}, callback_context)
+        return text_response(format_tasks(tasks, title)) if isinstance(tasks, list) else None
+
+    routes = [Route("list_tasks", LIST_TASKS_PATTERN, list_tasks)]
+    routes += [Route("list_contents", pattern, list_contents) for pattern in LIST_CONTENTS_PATTERNS]
+    return IntentRouter("todo_agent", routes)
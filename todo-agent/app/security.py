@@ -1,119 +1,328 @@
+import hashlib
 import logging
-from typing import Optional
+import threading
+import time
+from typing import Any, Optional
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.datastructures import Headers
 from starlette.responses import JSONResponse
-from google.oauth2 import id_token
-from google.auth.transport import requests
+from starlette.types import ASGIApp, Receive, Scope, Send
 import os
 import firebase_admin
-from firebase_admin import auth as firebase_auth
+import httpx
 
 from app.agent import app as adk_app
-from app.context import auth_token_ctx
+from app.app_utils.cache import TTLCache
+from app.app_utils.metrics import meter, register_cache_metrics, register_limiter_metrics
+from app.app_utils.rate_limit import TokenBucketLimiter
+from app.app_utils.single_flight import SingleFlight
+from app.app_utils.startup import default_credentials
+from app.app_utils.token_verifier import (
+    GOOGLE_TOKENINFO_URL,
+    TokenKind,
+    TokenVerifier,
+    VerificationUnavailableError,
+    classify_token,
+)
+from app.context import auth_token_ctx, auth_user_ctx
 
 logger = logging.getLogger(__name__)
 
-# Initialize Firebase Admin SDK
-try:
-    firebase_admin.initialize_app()
-    logger.info("Firebase Admin SDK initialized successfully")
-except ValueError:
-    # Already initialized
-    logger.info("Firebase Admin SDK already initialized")
-except Exception as e:
-    logger.error(f"Failed to initialize Firebase Admin SDK: {e}")
-
-class AuthMiddleware(BaseHTTPMiddleware):
+# Verified-token cache. Entries never outlive the token's own `exp` claim.
+verified_token_cache = TTLCache(
+    name="auth.verified_token_cache",
+    max_size=int(os.environ.get("AUTH_TOKEN_CACHE_MAX_SIZE", "1024")),
+    ttl_seconds=float(os.environ.get("AUTH_TOKEN_CACHE_TTL_SECONDS", "300")),
+)
+register_cache_metrics(verified_token_cache)
+
+# Short-lived negative cache, so a client retrying a bad token in a loop
+# doesn't trigger a signature check or tokeninfo call on every attempt.
+rejected_token_cache = TTLCache(
+    name="auth.rejected_token_cache",
+    max_size=int(os.environ.get("AUTH_REJECTED_CACHE_MAX_SIZE", "4096")),
+    ttl_seconds=float(os.environ.get("AUTH_REJECTED_CACHE_TTL_SECONDS", "30")),
+)
+register_cache_metrics(rejected_token_cache)
+
+# Every failed authentication takes a token from the client's bucket; clients
+# with an empty bucket get a 429 before any verification work is done.
+failed_auth_limiter = TokenBucketLimiter(
+    name="auth.failed_auth_limiter",
+    rate_per_second=float(os.environ.get("AUTH_FAILURE_RATE_PER_SECOND", "0.2")),
+    burst=float(os.environ.get("AUTH_FAILURE_BURST", "10")),
+)
+register_limiter_metrics(failed_auth_limiter)
+
+# Verifies tokens against in-memory signing keys. The certificates are kept
+# fresh by a background task, and outbound calls share a pooled HTTP client;
+# both are set up in the FastAPI lifespan.
+token_verifier = TokenVerifier(
+    max_workers=int(os.environ.get("AUTH_VERIFIER_THREADS", "4")),
+    tokeninfo_url=os.environ.get("GOOGLE_TOKENINFO_URL", GOOGLE_TOKENINFO_URL),
+)
+
+# Concurrent requests carrying the same token share one verification.
+inflight_verifications = SingleFlight()
+
+# Number of tokens sent down each verification path, by TokenKind.
+token_routes = meter.create_counter(
+    "auth.token_routes",
+    description="Bearer tokens routed to each verifier, by token kind.",
+)
+
+# Rejected requests, by reason (invalid, cached, throttled, missing_email).
+auth_rejections = meter.create_counter(
+    "auth.rejections",
+    description="Requests rejected by AuthMiddleware, by reason.",
+)
+
+
+def token_cache_key(token: str) -> str:
+    """Hash the raw token so bearer credentials are never kept as cache keys."""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+# Guards the one-time Firebase Admin SDK initialization.
+_firebase_lock = threading.Lock()
+_firebase_init_attempted = False
+
+
+def firebase_project_id() -> str | None:
+    """
+    Return the project ID Firebase ID tokens must be issued for.
+
+    The Firebase Admin SDK is initialized on first use (or by the startup
+    phase in the FastAPI lifespan), with the project from the shared
+    credential lookup unless FIREBASE_CONFIG says otherwise. A failed
+    initialization is logged once and not retried.
+    """
+    global _firebase_init_attempted
+    with _firebase_lock:
+        try:
+            return firebase_admin.get_app().project_id
+        except ValueError:
+            if _firebase_init_attempted:
+                return None
+        _firebase_init_attempted = True
+        try:
+            options = None if os.environ.get("FIREBASE_CONFIG") else {"projectId": default_credentials()[1]}
+            app = firebase_admin.initialize_app(options=options)
+            logger.info("Firebase Admin SDK initialized successfully")
+            return app.project_id
+        except Exception as e:
+            logger.error(f"Failed to initialize Firebase Admin SDK: {e}")
+            return None
+
+
+def _seconds_until_expiry(claims: dict[str, Any]) -> float | None:
+    """Return the remaining lifetime of a token from its `exp` claim, if any."""
+    exp = claims.get("exp")
+    if exp is None:
+        return None
+    try:
+        return float(exp) - time.time()
+    except (TypeError, ValueError):
+        return None
+
+
+async def verify_token(token: str) -> dict[str, Any]:
+    """
+    Verify a bearer token with the one verifier its kind calls for: Firebase ID
+    tokens (Portal), Google ID tokens, or opaque Google access tokens.
+
+    Returns:
+        The verified claims, normalized to contain `user_id` and `email`.
+
+    Raises:
+        ValueError: If the token is rejected.
+        VerificationUnavailableError: If the token can't be checked right now
+            (Google unreachable or erroring, or missing configuration).
+    """
+    kind = classify_token(token)
+    token_routes.add(1, {"route": kind.value})
+
+    try:
+        if kind is TokenKind.FIREBASE_ID_TOKEN:
+            claims = await token_verifier.verify_firebase_id_token(token, firebase_project_id())
+            claims["user_id"] = claims.get("uid")
+        elif kind is TokenKind.GOOGLE_ID_TOKEN:
+            client_id = os.environ.get("GOOGLE_CLIENT_ID")
+            claims = await token_verifier.verify_google_id_token(token, audience=client_id)
+            claims["user_id"] = claims.get("sub")
+        elif kind is TokenKind.ACCESS_TOKEN:
+            claims = await token_verifier.verify_access_token(token)
+            claims["user_id"] = claims.get("sub")
+        else:
+            raise ValueError("Unsupported token type or issuer")
+    except (VerificationUnavailableError, httpx.HTTPError) as e:
+        logger.error(f"Token verification unavailable ({kind.value}): {e}")
+        raise VerificationUnavailableError("Token verification unavailable") from e
+    except Exception as e:
+        logger.warning(f"Token verification failed ({kind.value}): {e}")
+        raise ValueError("Token verification failed") from e
+
+    logger.info(f"Authenticated via {kind.value}: {claims['user_id']} ({claims.get('email')})")
+    return claims
+
+
+async def authenticate(token: str) -> dict[str, Any]:
+    """
+    Return the verified claims for `token`, consulting the verified-token cache
+    first so repeated requests with the same token skip verification entirely.
+    On a miss, concurrent requests with the same token share one verification.
+
+    Raises:
+        TokenRejectedError: If the token was rejected within the negative-cache TTL.
+        ValueError: If the token is rejected.
+        VerificationUnavailableError: If the token can't be checked right now.
+    """
+    cache_key = token_cache_key(token)
+    claims = verified_token_cache.get(cache_key)
+    if claims is not None:
+        return claims
+
+    if rejected_token_cache.get(cache_key) is not None:
+        raise TokenRejectedError("Token was recently rejected")
+
+    return await inflight_verifications.run(cache_key, lambda: _verify_and_cache(token, cache_key))
+
+
+async def _verify_and_cache(token: str, cache_key: str) -> dict[str, Any]:
+    try:
+        claims = await verify_token(token)
+    except ValueError:
+        # Only definitive rejections are remembered; VerificationUnavailableError
+        # (our connectivity or configuration problems) passes through.
+        rejected_token_cache.set(cache_key, True)
+        raise
+    if claims.get("email"):
+        ttl = _seconds_until_expiry(claims)
+        verified_token_cache.set(cache_key, claims, ttl_seconds=ttl)
+    return claims
+
+
+class TokenRejectedError(ValueError):
+    """Raised for tokens that are in the negative cache."""
+
+
+def _unauthorized(message: str) -> JSONResponse:
+    return JSONResponse(status_code=401, content={"error": message})
+
+
+def _throttle_key(headers: Headers, token: str) -> str:
+    """
+    Throttle by token hash. Every caller behind the Portal proxy (or the
+    assistant's hop to the todo-agent) shares one peer address, so throttling
+    by it would let one bad client lock everyone out.
+
+    When the app is only reachable through trusted proxies that set
+    AUTH_CLIENT_IP_HEADER (e.g. X-Forwarded-For), throttle by the client
+    address they report instead: the entry AUTH_TRUSTED_PROXY_HOPS (default
+    1) from the right, as entries further left are set by the client.
+    """
+    header = os.environ.get("AUTH_CLIENT_IP_HEADER")
+    addresses = [address.strip() for address in (headers.get(header) or "").split(",")] if header else []
+    hops = int(os.environ.get("AUTH_TRUSTED_PROXY_HOPS", "1"))
+    if 0 < hops <= len(addresses) and addresses[-hops]:
+        return f"ip:{addresses[-hops]}"
+    return f"token:{token_cache_key(token)}"
+
+
+async def _verify_throttled(headers: Headers, token: str) -> dict[str, Any] | JSONResponse:
+    """
+    Verify a token that isn't in the verified-token cache, returning its
+    claims or the error response. Only definitive rejections count against
+    the client's failed-authentication bucket.
+    """
+    throttle_key = _throttle_key(headers, token)
+    if failed_auth_limiter.is_limited(throttle_key):
+        auth_rejections.add(1, {"reason": "throttled"})
+        logger.debug(f"Throttling {throttle_key} after repeated authentication failures")
+        return JSONResponse(
+            status_code=429,
+            content={"error": "Too many failed authentication attempts"},
+            headers={"Retry-After": str(failed_auth_limiter.retry_after(throttle_key))},
+        )
+
+    try:
+        claims = await authenticate(token)
+    except VerificationUnavailableError:
+        auth_rejections.add(1, {"reason": "unavailable"})
+        return JSONResponse(status_code=503, content={"error": "Token verification is temporarily unavailable"})
+    except TokenRejectedError:
+        auth_rejections.add(1, {"reason": "cached"})
+        failed_auth_limiter.consume(throttle_key)
+        return _unauthorized("Token verification failed")
+    except ValueError:
+        auth_rejections.add(1, {"reason": "invalid"})
+        failed_auth_limiter.consume(throttle_key)
+        return _unauthorized("Token verification failed")
+
+    if not claims.get("email"):
+        logger.warning("Token verification passed but no email found in payload.")
+        auth_rejections.add(1, {"reason": "missing_email"})
+        failed_auth_limiter.consume(throttle_key)
+        return _unauthorized("Invalid token payload.")
+    return claims
+
+
+class AuthMiddleware:
     """
     Middleware that enforces Google OAuth2 authentication for A2A endpoints.
     It verifies the Bearer token and stores it in a ContextVar for downstream use.
+
+    Implemented as a pure ASGI middleware (rather than `BaseHTTPMiddleware`) so
+    streaming SSE responses are passed through without extra buffering or
+    per-request task overhead.
     """
 
-    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
         # Only enforce on A2A RPC endpoints
-        if request.url.path.startswith("/a2a/"):
-            # Allow OPTIONS for CORS (handled by CORSMiddleware usually, but good to be safe)
-            if request.method == "OPTIONS":
-                return await call_next(request)
-            
-            # Allow the Agent Card GET requests to be public for discovery
-            if request.method == "GET":
-                 return await call_next(request)
-
-            auth_header = request.headers.get("Authorization")
-            if not auth_header:
-                logger.warning("Missing Authorization header")
-                return JSONResponse(
-                    status_code=401,
-                    content={"error": "Missing Authorization header"},
-                )
-
-            if not auth_header.startswith("Bearer "):
-                logger.warning("Invalid Authorization header format")
-                return JSONResponse(
-                    status_code=401,
-                    content={"error": "Invalid Authorization header format. Expected 'Bearer <token>'"},
-                )
-
-            token = auth_header.split(" ")[1]
-
-            user_email = None
-            user_id = None
-
-            try:
-                # 1. Try Firebase ID Token verification first (for Portal)
-                decoded_token = firebase_auth.verify_id_token(token)
-                user_email = decoded_token.get("email")
-                user_id = decoded_token.get("uid")
-                logger.info(f"Authenticated via Firebase ID Token: {user_id} ({user_email})")
-            except Exception as firebase_error:
-                logger.debug(f"Firebase token verification failed, trying Google OAuth2: {firebase_error}")
-                
-                try:
-                    # 2. Fall back to Google OAuth2 verification
-                    client_id = os.environ.get("GOOGLE_CLIENT_ID")
-                    
-                    # If it looks like a JWT (3 segments), try verifying as an ID Token
-                    if token.count(".") == 2:
-                        id_info = id_token.verify_oauth2_token(token, requests.Request(), audience=client_id)
-                    else:
-                        # Otherwise, treat as an opaque Access Token and verify via tokeninfo
-                        import httpx
-                        async with httpx.AsyncClient() as client:
-                            resp = await client.get(
-                                "https://oauth2.googleapis.com/tokeninfo",
-                                params={"access_token": token}
-                            )
-                            if resp.status_code != 200:
-                                raise ValueError(f"Access token verification failed: {resp.text}")
-                            id_info = resp.json()
-
-                    user_email = id_info.get("email")
-                    user_id = id_info.get("sub")
-                    logger.info(f"Authenticated via Google OAuth2: {user_id} ({user_email})")
-                except Exception as google_error:
-                    logger.error(f"Both Firebase and Google OAuth2 verification failed. Firebase: {firebase_error}, Google: {google_error}")
-                    return JSONResponse(
-                        status_code=401,
-                        content={"error": "Token verification failed"},
-                    )
-
-            if not user_email:
-                logger.warning("Token verification passed but no email found in payload.")
-                return JSONResponse(
-                    status_code=401,
-                    content={"error": "Invalid token payload."},
-                )
-
-            # Token is valid. Set context.
-            token_reset_token = auth_token_ctx.set(token)
-            try:
-                response = await call_next(request)
-                return response
-            finally:
-                auth_token_ctx.reset(token_reset_token)
-
-        # Non-A2A paths or explicitly allowed methods
-        return await call_next(request)
+        if scope["type"] != "http" or not scope["path"].startswith("/a2a/"):
+            await self.app(scope, receive, send)
+            return
+
+        # Allow OPTIONS for CORS (handled by CORSMiddleware usually, but good to be safe)
+        # and the Agent Card GET requests to be public for discovery
+        if scope["method"] in ("OPTIONS", "GET"):
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        auth_header = headers.get("Authorization")
+        if not auth_header:
+            logger.warning("Missing Authorization header")
+            response = _unauthorized("Missing Authorization header")
+            await response(scope, receive, send)
+            return
+
+        if not auth_header.startswith("Bearer "):
+            logger.warning("Invalid Authorization header format")
+            response = _unauthorized("Invalid Authorization header format. Expected 'Bearer <token>'")
+            await response(scope, receive, send)
+            return
+
+        token = auth_header.split(" ")[1]
+
+        # Tokens verified before skip the failure throttle as well as verification.
+        claims = verified_token_cache.get(token_cache_key(token))
+        if claims is None:
+            claims_or_error = await _verify_throttled(headers, token)
+            if isinstance(claims_or_error, JSONResponse):
+                await claims_or_error(scope, receive, send)
+                return
+            claims = claims_or_error
+
+        # Token is valid. Set context for the rest of the request, including
+        # the body of streaming responses.
+        token_reset_token = auth_token_ctx.set(token)
+        user_reset_token = auth_user_ctx.set(claims.get("user_id") or "")
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            auth_user_ctx.reset(user_reset_token)
+            auth_token_ctx.reset(token_reset_token)
@@ -1,5 +1,10 @@
 import datetime
-from zoneinfo import ZoneInfo
+from zoneinfo import ZoneInfo, ZoneInfoNotFoundError
+
+from google.adk.tools import ToolContext
+
+from app.dates import TIMEZONE_STATE_KEY, resolve
+
 
 def get_current_time() -> dict:
     """Returns the current date and time.
@@ -24,3 +29,31 @@ def get_current_time() -> dict:
         "weekday": now.strftime("%A"),
         "timezone": timezone_name
     }
+
+
+def resolve_date(expression: str, tool_context: ToolContext, timezone: str = "") -> dict:
+    """Resolves a date expression such as "tomorrow", "next Friday" or "this weekend" to ISO dates.
+
+    Args:
+        expression: The date expression, e.g. "in 3 days", "end of the month" or "May 3".
+        timezone: The user's IANA timezone (e.g. "Europe/Berlin"), if known. It is remembered
+            for the user's later requests.
+
+    Returns:
+        dict: A dictionary containing:
+            - start: ISO 8601 date of the first day.
+            - end: ISO 8601 date of the last day (same as start for a single day).
+            - weekday: Name of the weekday of start.
+        or an error if the expression or the timezone isn't understood.
+    """
+    if timezone:
+        try:
+            ZoneInfo(timezone)
+        except (ZoneInfoNotFoundError, ValueError):
+            return {"error": f"Unknown timezone '{timezone}'; use an IANA name such as 'Europe/Berlin'."}
+        tool_context.state[TIMEZONE_STATE_KEY] = timezone
+    date_range = resolve(expression, timezone or tool_context.state.get(TIMEZONE_STATE_KEY, ""))
+    if date_range is None:
+        return {"error": f"Could not resolve '{expression}'; use get_current_time and work it out."}
+    start, end = date_range
+    return {"start": start.isoformat(), "end": end.isoformat(), "weekday": start.strftime("%A")}
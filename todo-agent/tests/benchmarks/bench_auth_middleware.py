@@ -0,0 +1,146 @@
+"""
+Benchmark AuthMiddleware on streaming (SSE) responses.
+
+Serves the same `message/stream`-like SSE endpoint behind the previous
+`BaseHTTPMiddleware`-based implementation and behind the pure ASGI
+`AuthMiddleware`, and reports throughput and time-to-first-byte for each.
+The bearer token is pre-seeded in the verified-token cache so only the
+middleware overhead is measured.
+
+Usage:
+    uv run python -m tests.benchmarks.bench_auth_middleware --requests 500 --concurrency 20
+"""
+
+import argparse
+import asyncio
+import socket
+import statistics
+import threading
+import time
+
+import httpx
+import uvicorn
+from starlette.applications import Starlette
+from starlette.middleware.base import BaseHTTPMiddleware, RequestResponseEndpoint
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Route
+
+from app.context import auth_token_ctx
+from app.security import (
+    AuthMiddleware,
+    authenticate,
+    token_cache_key,
+    verified_token_cache,
+)
+
+TOKEN = "bench-token"
+RPC_PATH = "/a2a/app"
+
+
+class BaseHTTPAuthMiddleware(BaseHTTPMiddleware):
+    """The previous implementation, kept here as the benchmark baseline."""
+
+    async def dispatch(self, request: Request, call_next: RequestResponseEndpoint) -> Response:
+        if not request.url.path.startswith("/a2a/") or request.method in ("OPTIONS", "GET"):
+            return await call_next(request)
+
+        auth_header = request.headers.get("Authorization")
+        if not auth_header or not auth_header.startswith("Bearer "):
+            return JSONResponse(status_code=401, content={"error": "Missing Authorization header"})
+
+        token = auth_header.split(" ")[1]
+        try:
+            await authenticate(token)
+        except ValueError:
+            return JSONResponse(status_code=401, content={"error": "Token verification failed"})
+
+        token_reset_token = auth_token_ctx.set(token)
+        try:
+            return await call_next(request)
+        finally:
+            auth_token_ctx.reset(token_reset_token)
+
+
+def _build_app(middleware_class: type, events: int, interval: float) -> Starlette:
+    async def stream(request: Request) -> StreamingResponse:
+        async def body():
+            for i in range(events):
+                yield f'data: {{"id": {i}, "kind": "status-update"}}\n\n'
+                await asyncio.sleep(interval)
+
+        return StreamingResponse(body(), media_type="text/event-stream")
+
+    app = Starlette(routes=[Route(RPC_PATH, stream, methods=["POST"])])
+    app.add_middleware(middleware_class)
+    return app
+
+
+def _serve(app: Starlette) -> tuple[uvicorn.Server, str]:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, f"http://127.0.0.1:{port}{RPC_PATH}"
+
+
+async def _run(url: str, requests: int, concurrency: int) -> list[float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    ttfb: list[float] = []
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+
+    async with httpx.AsyncClient(limits=limits, timeout=30) as client:
+
+        async def one() -> None:
+            async with semaphore:
+                start = time.perf_counter()
+                async with client.stream(
+                    "POST", url, json={}, headers={"Authorization": f"Bearer {TOKEN}"}
+                ) as resp:
+                    first = True
+                    async for _ in resp.aiter_raw():
+                        if first:
+                            ttfb.append(time.perf_counter() - start)
+                            first = False
+
+        await asyncio.gather(*(one() for _ in range(requests)))
+    return ttfb
+
+
+def _report(label: str, ttfb: list[float], elapsed: float) -> None:
+    ttfb.sort()
+    p99 = ttfb[int(len(ttfb) * 0.99) - 1]
+    print(
+        f"{label:<20} {len(ttfb) / elapsed:8.0f} streams/s  "
+        f"ttfb p50={statistics.median(ttfb) * 1000:6.2f}ms  p99={p99 * 1000:6.2f}ms"
+    )
+
+
+async def main(requests: int, concurrency: int, events: int, interval: float) -> None:
+    verified_token_cache.set(token_cache_key(TOKEN), {"email": "bench@example.com"})
+
+    for label, middleware_class in (
+        ("BaseHTTPMiddleware", BaseHTTPAuthMiddleware),
+        ("pure ASGI", AuthMiddleware),
+    ):
+        server, url = _serve(_build_app(middleware_class, events, interval))
+        try:
+            await _run(url, min(requests, 20), concurrency)  # warm up
+            start = time.perf_counter()
+            ttfb = await _run(url, requests, concurrency)
+            _report(label, ttfb, time.perf_counter() - start)
+        finally:
+            server.should_exit = True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--concurrency", type=int, default=20)
+    parser.add_argument("--events", type=int, default=20, help="SSE events per stream")
+    parser.add_argument("--interval", type=float, default=0.001, help="Seconds between events")
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency, args.events, args.interval))
@@ -0,0 +1,112 @@
+"""
+Benchmark resolving relative dates locally vs. the two-step approach.
+
+Two-step (before): the model calls `get_current_time`, then works out the
+date itself from the result in a second model call. Local (now): the dates
+in the user's message are resolved by `app.dates` and attached to the first
+model request, so no tool round trip is needed.
+
+For a corpus of phrases (relative to a fixed "now"), reports accuracy and
+latency of local resolution. With --model, every phrase is also resolved by
+the model from the `get_current_time` result, to measure its accuracy and
+latency (needs Google Cloud credentials).
+
+Usage:
+    uv run python -m tests.benchmarks.bench_date_resolution
+    uv run python -m tests.benchmarks.bench_date_resolution --model gemini-2.5-flash
+"""
+
+import argparse
+import asyncio
+import datetime
+import re
+import statistics
+import time
+
+from google.genai import Client
+
+from app.dates import resolve
+
+# A Wednesday.
+NOW = datetime.datetime(2026, 10, 14, 10, 0, tzinfo=datetime.timezone.utc)
+
+# (expression, first day, last day)
+CORPUS = [
+    ("today", "2026-10-14", "2026-10-14"),
+    ("tonight", "2026-10-14", "2026-10-14"),
+    ("tomorrow", "2026-10-15", "2026-10-15"),
+    ("tomorrow evening", "2026-10-15", "2026-10-15"),
+    ("the day after tomorrow", "2026-10-16", "2026-10-16"),
+    ("yesterday", "2026-10-13", "2026-10-13"),
+    ("Friday", "2026-10-16", "2026-10-16"),
+    ("this Friday", "2026-10-16", "2026-10-16"),
+    ("next Friday", "2026-10-23", "2026-10-23"),
+    ("on Monday", "2026-10-19", "2026-10-19"),
+    ("next Monday", "2026-10-19", "2026-10-19"),
+    ("last Friday", "2026-10-09", "2026-10-09"),
+    ("Wednesday", "2026-10-14", "2026-10-14"),
+    ("this weekend", "2026-10-17", "2026-10-18"),
+    ("next weekend", "2026-10-24", "2026-10-25"),
+    ("this week", "2026-10-12", "2026-10-18"),
+    ("next week", "2026-10-19", "2026-10-25"),
+    ("end of the week", "2026-10-18", "2026-10-18"),
+    ("in 3 days", "2026-10-17", "2026-10-17"),
+    ("in two weeks", "2026-10-28", "2026-10-28"),
+    ("in a month", "2026-11-14", "2026-11-14"),
+    ("10 days from now", "2026-10-24", "2026-10-24"),
+    ("this month", "2026-10-01", "2026-10-31"),
+    ("next month", "2026-11-01", "2026-11-30"),
+    ("end of the month", "2026-10-31", "2026-10-31"),
+    ("May 3", "2027-05-03", "2027-05-03"),
+    ("3rd of November", "2026-11-03", "2026-11-03"),
+    ("Dec 25", "2026-12-25", "2026-12-25"),
+    ("October 20, 2027", "2027-10-20", "2027-10-20"),
+    ("2026-12-01", "2026-12-01", "2026-12-01"),
+]
+
+PROMPT = """get_current_time returned: {now}
+
+Resolve the date expression "{expression}" for the user. Answer with the first and last day
+of the range as two ISO dates separated by a space (the same date twice for a single day), nothing else."""
+
+
+def _local(expression: str) -> tuple[tuple[str, str] | None, float]:
+    started = time.perf_counter()
+    date_range = resolve(expression, "UTC", NOW)
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    return (tuple(date.isoformat() for date in date_range) if date_range else None), elapsed_ms
+
+
+async def _two_step(client: Client, model: str, expression: str) -> tuple[tuple[str, str] | None, float]:
+    now = {"current_time": NOW.isoformat(), "weekday": NOW.strftime("%A"), "timezone": "UTC"}
+    started = time.perf_counter()
+    response = await client.aio.models.generate_content(model=model, contents=PROMPT.format(now=now, expression=expression))
+    elapsed_ms = (time.perf_counter() - started) * 1000
+    dates = re.findall(r"\d{4}-\d{2}-\d{2}", response.text or "")
+    return (tuple(dates[:2]) if len(dates) >= 2 else None), elapsed_ms
+
+
+def _report(label: str, results: list[tuple[tuple[str, str] | None, float]], round_trips: int) -> None:
+    correct = sum(result == (start, end) for (result, _), (_, start, end) in zip(results, CORPUS, strict=True))
+    timings = [elapsed_ms for _, elapsed_ms in results]
+    print(
+        f"{label:<10} correct={correct:3d}/{len(CORPUS)}  median={statistics.median(timings):9.3f} ms  "
+        f"max={max(timings):9.3f} ms  model round trips before the tool call={round_trips}"
+    )
+
+
+async def main(model: str | None) -> None:
+    resolve("warm up", "UTC", NOW)
+    _report("local", [_local(expression) for expression, _, _ in CORPUS], round_trips=1)
+    if model:
+        client = Client()
+        _report("two-step", [await _two_step(client, model, expression) for expression, _, _ in CORPUS], round_trips=2)
+    else:
+        print("two-step   (pass --model to measure; it adds one model round trip for get_current_time per turn)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model", help="Also resolve every phrase with this model, e.g. gemini-2.5-flash")
+    args = parser.parse_args()
+    asyncio.run(main(args.model))
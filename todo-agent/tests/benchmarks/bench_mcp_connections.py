@@ -0,0 +1,79 @@
+"""
+Count the TCP connections MCP tool calls open against a local MCP stand-in.
+
+Compares ADK's `McpToolset`, where every MCP session has its own httpx
+client and connection pool, with `PooledMcpToolset`, where all sessions
+share the pooled transport the FastAPI lifespan creates. Calls are spread
+across users, each with its own bearer token and therefore its own session.
+
+Usage:
+    uv run python -m tests.benchmarks.bench_mcp_connections --calls 100 --users 10
+"""
+
+import argparse
+import asyncio
+import io
+import time
+
+from google.adk.tools import McpToolset
+from google.adk.tools.mcp_tool import StreamableHTTPConnectionParams
+from uvicorn.protocols.http.h11_impl import H11Protocol
+
+from app.app_utils.http_client import create_http_transport
+from app.app_utils.mcp_pool import PooledMcpToolset
+from tests.benchmarks import fake_mcp
+
+
+class CountingH11Protocol(H11Protocol):
+    connections = 0
+
+    def connection_made(self, transport) -> None:
+        CountingH11Protocol.connections += 1
+        super().connection_made(transport)
+
+
+async def _run(toolset: McpToolset, calls: int, users: int, concurrency: int) -> float:
+    semaphore = asyncio.Semaphore(concurrency)
+    manager = toolset._mcp_session_manager
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            # What MCPTool does for every call: look up the session for the
+            # caller's headers, creating and initializing it the first time.
+            session = await manager.create_session(headers={"Authorization": f"Bearer user{i % users}"})
+            await session.call_tool("list_tasks", arguments={"list_name": "Inbox"})
+
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i) for i in range(calls)))
+    elapsed = time.perf_counter() - start
+    await toolset.close()
+    return elapsed
+
+
+async def main(calls: int, users: int, concurrency: int) -> None:
+    server, url = fake_mcp.serve(http=CountingH11Protocol)
+    params = StreamableHTTPConnectionParams(url=url)
+
+    try:
+        CountingH11Protocol.connections = 0
+        elapsed = await _run(McpToolset(connection_params=params, errlog=io.StringIO()), calls, users, concurrency)
+        print(f"{'client per session':<22} {CountingH11Protocol.connections:5d} connections  {elapsed * 1000:8.1f}ms")
+
+        CountingH11Protocol.connections = 0
+        toolset = PooledMcpToolset(connection_params=params, errlog=io.StringIO())
+        transport = create_http_transport("MCP_HTTP")
+        toolset.use_http_transport(transport)
+        async with transport:
+            elapsed = await _run(toolset, calls, users, concurrency)
+        print(f"{'shared pooled transport':<22} {CountingH11Protocol.connections:5d} connections  {elapsed * 1000:8.1f}ms")
+    finally:
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--calls", type=int, default=100)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=5)
+    args = parser.parse_args()
+    asyncio.run(main(args.calls, args.users, args.concurrency))
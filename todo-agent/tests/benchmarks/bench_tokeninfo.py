@@ -0,0 +1,90 @@
+"""
+Benchmark opaque access-token verification against a local tokeninfo stand-in.
+
+Compares a fresh httpx client per verification (one TCP handshake per call)
+with the pooled client the FastAPI lifespan shares across requests.
+
+Usage:
+    uv run python -m tests.benchmarks.bench_tokeninfo --requests 2000 --concurrency 20
+"""
+
+import argparse
+import asyncio
+import socket
+import statistics
+import threading
+import time
+
+import uvicorn
+
+from app.app_utils.http_client import create_http_client
+from app.app_utils.token_verifier import TokenVerifier
+from tests.benchmarks.fake_tokeninfo import app as fake_tokeninfo_app
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def _start_server(port: int) -> uvicorn.Server:
+    server = uvicorn.Server(
+        uvicorn.Config(fake_tokeninfo_app, host="127.0.0.1", port=port, log_level="warning")
+    )
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+async def _run(verifier: TokenVerifier, requests: int, concurrency: int) -> list[float]:
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: list[float] = []
+
+    async def one(i: int) -> None:
+        async with semaphore:
+            start = time.perf_counter()
+            await verifier.verify_access_token(f"user{i % 50}")
+            latencies.append(time.perf_counter() - start)
+
+    await asyncio.gather(*(one(i) for i in range(requests)))
+    return latencies
+
+
+def _report(label: str, latencies: list[float], elapsed: float) -> None:
+    latencies.sort()
+    p99 = latencies[int(len(latencies) * 0.99) - 1]
+    print(
+        f"{label:<22} {len(latencies) / elapsed:8.0f} req/s  "
+        f"p50={statistics.median(latencies) * 1000:6.2f}ms  p99={p99 * 1000:6.2f}ms"
+    )
+
+
+async def main(requests: int, concurrency: int) -> None:
+    port = _free_port()
+    server = _start_server(port)
+    tokeninfo_url = f"http://127.0.0.1:{port}/tokeninfo"
+
+    try:
+        per_request = TokenVerifier(tokeninfo_url=tokeninfo_url)
+        start = time.perf_counter()
+        latencies = await _run(per_request, requests, concurrency)
+        _report("client per request", latencies, time.perf_counter() - start)
+
+        pooled = TokenVerifier(tokeninfo_url=tokeninfo_url)
+        async with create_http_client("AUTH_HTTP") as client:
+            pooled.use_http_client(client)
+            start = time.perf_counter()
+            latencies = await _run(pooled, requests, concurrency)
+            _report("shared pooled client", latencies, time.perf_counter() - start)
+    finally:
+        server.should_exit = True
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
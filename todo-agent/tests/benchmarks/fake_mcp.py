@@ -0,0 +1,61 @@
+"""
+Local stand-in for the Checkmate MCP server.
+
+Serves a couple of task tools over Streamable HTTP at `/mcp`, so MCP
+sessions and tool calls can be exercised and benchmarked offline:
+
+    uv run uvicorn tests.benchmarks.fake_mcp:app --port 8098
+    CHECKMATE_MCP_URL=http://127.0.0.1:8098/mcp make local-backend
+
+Set FAKE_MCP_LATENCY_MS to simulate upstream latency per tool call.
+"""
+
+import asyncio
+import os
+import socket
+import threading
+import time
+
+import uvicorn
+from mcp.server.fastmcp import Context, FastMCP
+
+LATENCY_SECONDS = float(os.environ.get("FAKE_MCP_LATENCY_MS", "0")) / 1000
+
+# Stateless, with SSE replies to POSTs, like the Checkmate and Stash MCP servers.
+mcp = FastMCP("fake-checkmate", log_level="WARNING", stateless_http=True)
+
+# Authorization header of every tool call, in order.
+authorizations: list[str] = []
+
+
+@mcp.tool()
+async def list_tasks(ctx: Context, list_name: str = "Inbox") -> list[dict]:
+    """List the tasks in a task list."""
+    authorizations.append(ctx.request_context.request.headers.get("authorization", ""))
+    if LATENCY_SECONDS:
+        await asyncio.sleep(LATENCY_SECONDS)
+    return [{"id": "1", "title": "Buy milk", "list": list_name, "status": "todo"}]
+
+
+@mcp.tool()
+async def create_task(ctx: Context, title: str, list_name: str = "Inbox") -> dict:
+    """Create a task in a task list."""
+    authorizations.append(ctx.request_context.request.headers.get("authorization", ""))
+    if LATENCY_SECONDS:
+        await asyncio.sleep(LATENCY_SECONDS)
+    return {"id": "2", "title": title, "list": list_name, "status": "todo"}
+
+
+app = mcp.streamable_http_app()
+
+
+def serve(**config) -> tuple[uvicorn.Server, str]:
+    """Serve the stand-in on a free local port in a background thread; returns the server and MCP URL."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", **config))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server, f"http://127.0.0.1:{port}/mcp"
@@ -0,0 +1,48 @@
+"""
+Local stand-in for Google's `oauth2.googleapis.com/tokeninfo` endpoint.
+
+Lets the access-token verification path be exercised and benchmarked offline.
+Any token is accepted except those starting with "invalid". Point the agent
+at it with:
+
+    uv run uvicorn tests.benchmarks.fake_tokeninfo:app --port 8099
+    GOOGLE_TOKENINFO_URL=http://127.0.0.1:8099/tokeninfo make local-backend
+
+Set FAKE_TOKENINFO_LATENCY_MS to simulate upstream latency.
+"""
+
+import asyncio
+import os
+import time
+
+from fastapi import FastAPI
+from fastapi.responses import JSONResponse
+
+LATENCY_SECONDS = float(os.environ.get("FAKE_TOKENINFO_LATENCY_MS", "0")) / 1000
+
+app = FastAPI(title="fake-tokeninfo")
+
+
+@app.get("/tokeninfo")
+async def tokeninfo(access_token: str = "") -> JSONResponse:
+    if LATENCY_SECONDS:
+        await asyncio.sleep(LATENCY_SECONDS)
+
+    if not access_token or access_token.startswith("invalid"):
+        return JSONResponse(
+            status_code=400,
+            content={"error": "invalid_token", "error_description": "Invalid Value"},
+        )
+
+    return JSONResponse(
+        content={
+            "azp": "local-client",
+            "aud": "local-client",
+            "sub": f"sub-{access_token}",
+            "scope": "openid https://www.googleapis.com/auth/userinfo.email",
+            "exp": str(int(time.time()) + 3600),
+            "expires_in": "3600",
+            "email": f"{access_token}@example.com",
+            "email_verified": "true",
+        }
+    )
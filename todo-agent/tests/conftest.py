@@ -0,0 +1,13 @@
+from collections.abc import Iterator
+
+import pytest
+
+from tests.benchmarks import fake_mcp
+
+
+@pytest.fixture(scope="session")
+def mcp_url() -> Iterator[str]:
+    """URL of a local Checkmate MCP stand-in (see tests/benchmarks/fake_mcp.py)."""
+    server, url = fake_mcp.serve()
+    yield url
+    server.should_exit = True
@@ -1,7 +1,25 @@
+import asyncio
+import base64
+import json
+import time
+from collections import OrderedDict
+
 import pytest
 from fastapi.testclient import TestClient
-from unittest.mock import patch, MagicMock
+from unittest.mock import AsyncMock, patch, MagicMock
+from starlette.applications import Starlette
+from starlette.responses import StreamingResponse
+from starlette.routing import Route
+from app.context import auth_token_ctx
 from app.fast_api_app import app, A2A_RPC_PATH
+from app.app_utils.token_verifier import VerificationUnavailableError
+from app.security import (
+    AuthMiddleware,
+    authenticate,
+    failed_auth_limiter,
+    rejected_token_cache,
+    verified_token_cache,
+)
 
 client = TestClient(app)
 ENDPOINT = A2A_RPC_PATH
@@ -23,10 +41,11 @@ def test_invalid_bearer_format():
     assert response.status_code == 401
     assert "Invalid Authorization header format" in response.json()["error"]
 
-@patch("app.security.id_token.verify_oauth2_token")
+@patch("app.security.token_verifier.verify_access_token", new_callable=AsyncMock)
 @patch("app.security.auth_token_ctx") 
 def test_valid_auth_token(mock_ctx, mock_verify):
     """Verify that valid tokens set the context variable and proceed."""
+    verified_token_cache.clear()
     mock_verify.return_value = {"email": "test@example.com"}
     
     # We expect the middleware to call auth_token_ctx.set("valid-token")
@@ -52,3 +71,191 @@ def test_public_endpoints_bypass_auth():
     # This shouldn't be 401. 
     response = client.get(ENDPOINT)
     assert response.status_code != 401
+
+@patch("app.security.verify_token", new_callable=AsyncMock)
+def test_verified_token_is_cached(mock_verify):
+    """Verify that a second request with the same token skips verification."""
+    verified_token_cache.clear()
+    mock_verify.return_value = {"email": "test@example.com", "exp": time.time() + 3600}
+
+    for _ in range(2):
+        response = client.post(
+            ENDPOINT,
+            json={"method": "foo"},
+            headers={"Authorization": "Bearer cached-token"}
+        )
+        assert response.status_code == 404
+
+    mock_verify.assert_awaited_once_with("cached-token")
+    assert verified_token_cache.stats()["hits"] == 1
+
+@patch("app.security.verify_token", new_callable=AsyncMock)
+def test_expired_token_is_not_cached(mock_verify):
+    """Verify that cache entries never outlive the token's exp claim."""
+    verified_token_cache.clear()
+    mock_verify.return_value = {"email": "test@example.com", "exp": time.time() - 1}
+
+    for _ in range(2):
+        client.post(
+            ENDPOINT,
+            json={"method": "foo"},
+            headers={"Authorization": "Bearer expired-token"}
+        )
+
+    assert mock_verify.await_count == 2
+    assert len(verified_token_cache) == 0
+
+@patch("app.security.verify_token", new_callable=AsyncMock)
+def test_token_context_covers_streaming_body(mock_verify):
+    """Verify that the token is visible while a streaming response is produced."""
+    verified_token_cache.clear()
+    mock_verify.return_value = {"email": "test@example.com"}
+
+    async def stream(request):
+        async def events():
+            for i in range(3):
+                yield f"data: {i} {auth_token_ctx.get()}\n\n"
+        return StreamingResponse(events(), media_type="text/event-stream")
+
+    streaming_app = Starlette(routes=[Route(ENDPOINT, stream, methods=["POST"])])
+    streaming_app.add_middleware(AuthMiddleware)
+
+    response = TestClient(streaming_app).post(
+        ENDPOINT,
+        headers={"Authorization": "Bearer stream-token"}
+    )
+
+    assert response.status_code == 200
+    assert response.text == "".join(f"data: {i} stream-token\n\n" for i in range(3))
+    assert auth_token_ctx.get() == ""
+
+@patch("app.security.token_verifier.verify_google_id_token", new_callable=AsyncMock)
+@patch("app.security.token_verifier.verify_firebase_id_token", new_callable=AsyncMock)
+def test_firebase_token_routed_to_single_verifier(mock_firebase, mock_google):
+    """Verify that a Firebase ID token only goes through the Firebase verifier."""
+    verified_token_cache.clear()
+    mock_firebase.return_value = {"uid": "123", "email": "test@example.com"}
+    token = ".".join(
+        base64.urlsafe_b64encode(json.dumps(part).encode()).decode().rstrip("=")
+        for part in ({"alg": "RS256", "kid": "k"}, {"iss": "https://securetoken.google.com/p"}, "sig")
+    )
+
+    response = client.post(
+        ENDPOINT,
+        json={"method": "foo"},
+        headers={"Authorization": f"Bearer {token}"}
+    )
+
+    assert response.status_code == 404
+    mock_firebase.assert_awaited_once()
+    mock_google.assert_not_called()
+
+@pytest.mark.asyncio
+@patch("app.security.verify_token", new_callable=AsyncMock)
+async def test_concurrent_requests_share_one_verification(mock_verify):
+    """Verify that simultaneous requests with a cold cache verify the token once."""
+    verified_token_cache.clear()
+
+    async def slow_verify(token):
+        await asyncio.sleep(0.01)
+        return {"email": "test@example.com"}
+
+    mock_verify.side_effect = slow_verify
+
+    results = await asyncio.gather(*(authenticate("shared-token") for _ in range(10)))
+
+    assert all(result["email"] == "test@example.com" for result in results)
+    mock_verify.assert_awaited_once_with("shared-token")
+
+@patch("app.security.verify_token", new_callable=AsyncMock)
+def test_rejected_token_is_negatively_cached(mock_verify):
+    """Verify that a rejected token isn't re-verified while in the negative cache."""
+    rejected_token_cache.clear()
+    mock_verify.side_effect = ValueError("Token verification failed")
+
+    for _ in range(3):
+        response = client.post(
+            ENDPOINT,
+            json={"method": "foo"},
+            headers={"Authorization": "Bearer bad-token"}
+        )
+        assert response.status_code == 401
+
+    mock_verify.assert_awaited_once_with("bad-token")
+
+@patch("app.security.verify_token", new_callable=AsyncMock)
+def test_repeated_failures_are_throttled(mock_verify):
+    """Verify that retrying a bad token too often gets 429 before verification."""
+    rejected_token_cache.clear()
+    mock_verify.side_effect = ValueError("Token verification failed")
+
+    with patch.object(failed_auth_limiter, "burst", 2), patch.object(failed_auth_limiter, "_buckets", OrderedDict()):
+        statuses = [
+            client.post(
+                ENDPOINT,
+                json={"method": "foo"},
+                headers={"Authorization": "Bearer bad-token"}
+            ).status_code
+            for _ in range(4)
+        ]
+
+    assert statuses == [401, 401, 429, 429]
+    assert mock_verify.await_count == 1
+
+@patch("app.security.verify_token", new_callable=AsyncMock)
+def test_bad_tokens_dont_lock_out_other_users(mock_verify):
+    """Verify that failures from a shared peer address don't throttle other tokens."""
+    rejected_token_cache.clear()
+    verified_token_cache.clear()
+
+    async def verify(token):
+        if token.startswith("bad-token"):
+            raise ValueError("Token verification failed")
+        return {"email": "test@example.com", "user_id": "123"}
+
+    mock_verify.side_effect = verify
+
+    with patch.object(failed_auth_limiter, "burst", 2), patch.object(failed_auth_limiter, "_buckets", OrderedDict()):
+        bad = [
+            client.post(ENDPOINT, json={"method": "foo"}, headers={"Authorization": f"Bearer bad-token-{i}"}).status_code
+            for i in range(4)
+        ]
+        good = client.post(ENDPOINT, json={"method": "foo"}, headers={"Authorization": "Bearer good-token"})
+
+    assert bad == [401] * 4
+    assert good.status_code != 429
+
+@patch("app.security.verify_token", new_callable=AsyncMock)
+def test_failures_are_throttled_by_forwarded_client_address(mock_verify, monkeypatch):
+    """Verify that, behind a trusted proxy, failures are counted per forwarded client address."""
+    monkeypatch.setenv("AUTH_CLIENT_IP_HEADER", "X-Forwarded-For")
+    rejected_token_cache.clear()
+    mock_verify.side_effect = ValueError("Token verification failed")
+
+    with patch.object(failed_auth_limiter, "burst", 2), patch.object(failed_auth_limiter, "_buckets", OrderedDict()):
+        statuses = [
+            client.post(
+                ENDPOINT,
+                json={"method": "foo"},
+                headers={"Authorization": f"Bearer bad-token-{i}", "X-Forwarded-For": f"10.0.0.{i}, 203.0.113.7"},
+            ).status_code
+            for i in range(4)
+        ]
+
+    assert statuses == [401, 401, 429, 429]
+    assert mock_verify.await_count == 2
+
+@patch("app.security.token_verifier.verify_access_token", new_callable=AsyncMock)
+def test_unavailable_verification_is_not_cached_or_charged(mock_verify):
+    """Verify that a tokeninfo outage returns 503 without caching the token or throttling the client."""
+    rejected_token_cache.clear()
+    mock_verify.side_effect = VerificationUnavailableError("tokeninfo returned 503")
+
+    with patch.object(failed_auth_limiter, "burst", 1), patch.object(failed_auth_limiter, "_buckets", OrderedDict()):
+        statuses = [
+            client.post(ENDPOINT, json={"method": "foo"}, headers={"Authorization": "Bearer opaque-token"}).status_code
+            for _ in range(3)
+        ]
+
+    assert statuses == [503, 503, 503]
+    assert mock_verify.await_count == 3
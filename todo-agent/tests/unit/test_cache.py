@@ -0,0 +1,47 @@
+from app.app_utils import cache as cache_module
+from app.app_utils.cache import TTLCache
+
+
+def test_entries_expire(monkeypatch) -> None:
+    """Entries are served until their deadline and dropped afterwards."""
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    cache = TTLCache(name="test", max_size=10, ttl_seconds=60)
+
+    cache.set("a", 1)
+    cache.set("b", 2, ttl_seconds=5)
+    now[0] += 10
+
+    assert cache.get("a") == 1
+    assert cache.get("b") is None
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["misses"] == 1
+
+
+def test_entry_ttl_is_capped_and_non_positive_is_skipped(monkeypatch) -> None:
+    """Per-entry TTLs never exceed the cache TTL; expired inputs aren't stored."""
+    now = [1000.0]
+    monkeypatch.setattr(cache_module.time, "monotonic", lambda: now[0])
+    cache = TTLCache(name="test", max_size=10, ttl_seconds=60)
+
+    cache.set("long", 1, ttl_seconds=3600)
+    cache.set("expired", 2, ttl_seconds=-1)
+    now[0] += 61
+
+    assert cache.get("long") is None
+    assert len(cache) == 0
+
+
+def test_lru_eviction() -> None:
+    """The least recently used entry is evicted when the cache is full."""
+    cache = TTLCache(name="test", max_size=2, ttl_seconds=60)
+    cache.set("a", 1)
+    cache.set("b", 2)
+    cache.get("a")
+    cache.set("c", 3)
+
+    assert cache.get("b") is None
+    assert cache.get("a") == 1
+    assert cache.get("c") == 3
+    assert cache.stats()["evictions"] == 1
+    assert cache.hit_rate == 3 / 4
@@ -0,0 +1,78 @@
+import datetime
+from types import SimpleNamespace
+
+import pytest
+from google.adk.models import LlmRequest
+from google.genai import types
+
+from app.dates import (
+    TIMEZONE_STATE_KEY,
+    attach_resolved_dates,
+    find_expressions,
+    resolve,
+)
+from app.tools import resolve_date
+from tests.benchmarks.bench_date_resolution import CORPUS, NOW
+
+
+@pytest.mark.parametrize("expression,start,end", CORPUS)
+def test_corpus_is_resolved(expression: str, start: str, end: str) -> None:
+    assert resolve(expression, "UTC", NOW) == (datetime.date.fromisoformat(start), datetime.date.fromisoformat(end))
+
+
+def test_today_is_taken_in_the_users_timezone() -> None:
+    late_evening_utc = datetime.datetime(2026, 10, 14, 23, 30, tzinfo=datetime.timezone.utc)
+    assert resolve("tomorrow", "Europe/Berlin", late_evening_utc)[0] == datetime.date(2026, 10, 16)
+    assert resolve("tomorrow", "America/New_York", late_evening_utc)[0] == datetime.date(2026, 10, 15)
+
+
+def test_unknown_expressions_are_reported() -> None:
+    assert resolve("whenever", "UTC", NOW) is None
+    assert resolve("February 30", "UTC", NOW) is None
+    assert "error" in resolve_date("sometime soon", SimpleNamespace(state={}))
+
+
+def test_resolve_date_remembers_the_users_timezone() -> None:
+    tool_context = SimpleNamespace(state={})
+    resolve_date("tomorrow", tool_context, timezone="Pacific/Kiritimati")
+
+    assert tool_context.state == {TIMEZONE_STATE_KEY: "Pacific/Kiritimati"}
+    assert resolve_date("today", tool_context)["start"] == resolve("today", "Pacific/Kiritimati")[0].isoformat()
+
+
+@pytest.mark.parametrize("timezone", ["Europe/Pariss", "PST8", "../etc/passwd"])
+def test_unknown_timezones_are_reported_and_not_remembered(timezone: str) -> None:
+    tool_context = SimpleNamespace(state={TIMEZONE_STATE_KEY: "Pacific/Kiritimati"})
+
+    assert "error" in resolve_date("tomorrow", tool_context, timezone=timezone)
+    assert tool_context.state == {TIMEZONE_STATE_KEY: "Pacific/Kiritimati"}
+
+
+def test_expressions_are_found_in_messages() -> None:
+    text = "Remind me to call mum next Friday and pay rent by the end of the month, not tomorrow."
+    assert find_expressions(text) == ["next friday", "end of the month", "tomorrow"]
+    # Words that merely contain a date word aren't dates.
+    assert find_expressions("Add 'Mayday drill' to my Sundays list") == []
+
+
+class _Context:
+    def __init__(self, text: str, state: dict | None = None) -> None:
+        self.user_content = types.Content(role="user", parts=[types.Part(text=text)])
+        self.state = state or {}
+
+
+def test_resolved_dates_are_attached_to_the_request() -> None:
+    request = LlmRequest(contents=[types.Content(role="user", parts=[types.Part(text="Buy milk tomorrow")])])
+    attach_resolved_dates(_Context("Buy milk tomorrow"), request)
+
+    assert len(request.contents) == 2
+    assert '"tomorrow" = ' in request.contents[-1].parts[0].text
+
+
+def test_dates_are_resolved_in_the_users_timezone_from_state() -> None:
+    # UTC+14, so a day ahead of most servers for most of the day.
+    request = LlmRequest(contents=[types.Content(role="user", parts=[types.Part(text="Buy milk today")])])
+    attach_resolved_dates(_Context("Buy milk today", {TIMEZONE_STATE_KEY: "Pacific/Kiritimati"}), request)
+
+    today = resolve("today", "Pacific/Kiritimati")[0].isoformat()
+    assert f'"today" = {today}' in request.contents[-1].parts[0].text
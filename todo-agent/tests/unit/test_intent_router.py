@@ -0,0 +1,101 @@
+import json
+from collections.abc import AsyncGenerator
+
+import pytest
+from google.adk.agents import Agent
+from google.adk.models import BaseLlm, LlmRequest, LlmResponse
+from google.adk.runners import Runner
+from google.adk.sessions import InMemorySessionService
+from google.adk.tools import FunctionTool
+from google.adk.tools.base_toolset import BaseToolset
+from google.genai import types
+
+from app.app_utils.intent_router import LIST_TASKS_PATTERN
+from app.router import create_intent_router
+
+TASKS = [
+    {"id": "t1", "title": "Buy milk", "listId": "l1", "status": "todo", "priority": "high"},
+    {"id": "t2", "title": "Call mum", "listId": "inbox", "status": "done", "dueDate": "2026-10-18"},
+]
+
+
+def _result(value) -> dict:
+    return {"content": [{"type": "text", "text": json.dumps(value)}], "isError": False}
+
+
+def get_lists() -> dict:
+    """Get the task lists."""
+    return _result({"lists": [{"id": "l1", "title": "Groceries"}], "inboxCount": 1})
+
+
+def get_tasks(listId: str | None = None) -> dict:
+    """Get tasks, optionally of one list."""
+    return _result([task for task in TASKS if listId in (None, task["listId"])])
+
+
+class _Checkmate(BaseToolset):
+    """Stands in for the Checkmate MCP toolset."""
+
+    async def get_tools(self, readonly_context=None):
+        return [FunctionTool(get_lists), FunctionTool(get_tasks)]
+
+    async def close(self) -> None:
+        pass
+
+
+class _CountingModel(BaseLlm):
+    calls: int = 0
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        self.calls += 1
+        yield LlmResponse(content=types.Content(role="model", parts=[types.Part(text="OK")]))
+
+
+async def _reply(text: str) -> tuple[str, int]:
+    checkmate = _Checkmate()
+    router = create_intent_router(checkmate)
+    model = _CountingModel(model="stand-in")
+    agent = Agent(
+        name="todo_agent",
+        model=model,
+        tools=[checkmate],
+        before_model_callback=router,
+        after_model_callback=router.after_model,
+    )
+    runner = Runner(app_name="app", agent=agent, session_service=InMemorySessionService())
+    session = await runner.session_service.create_session(app_name="app", user_id="user")
+    message = types.Content(role="user", parts=[types.Part(text=text)])
+    replies = []
+    async for event in runner.run_async(user_id="user", session_id=session.id, new_message=message):
+        replies += [part.text for part in event.content.parts if part.text] if event.content else []
+    return "\n".join(replies), model.calls
+
+
+@pytest.mark.asyncio
+async def test_list_contents_are_answered_without_the_model() -> None:
+    reply, model_calls = await _reply("What's in Groceries?")
+
+    assert model_calls == 0
+    assert reply == "You have 1 task in Groceries:\n- [ ] Buy milk (high)"
+
+
+@pytest.mark.asyncio
+async def test_all_tasks_are_answered_without_the_model() -> None:
+    reply, model_calls = await _reply("list my tasks")
+
+    assert model_calls == 0
+    assert "- [x] Call mum (due 2026-10-18)" in reply
+
+
+@pytest.mark.asyncio
+async def test_uncertain_requests_fall_through_to_the_model() -> None:
+    # Unknown list, and a request that isn't a plain listing.
+    assert (await _reply("What's in Hardware?"))[1] == 1
+    assert (await _reply("Add milk to Groceries"))[1] == 1
+
+
+def test_patterns_match_whole_messages_only() -> None:
+    assert LIST_TASKS_PATTERN.fullmatch("Show me all my tasks.")
+    assert not LIST_TASKS_PATTERN.fullmatch("show my tasks and delete the done ones")
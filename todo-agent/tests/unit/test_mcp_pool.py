@@ -0,0 +1,128 @@
+import asyncio
+from contextvars import ContextVar
+
+import httpx
+import pytest
+from google.adk.tools.mcp_tool import StreamableHTTPConnectionParams
+
+from app.app_utils.http_client import create_http_transport
+from app.app_utils.mcp_pool import PooledMCPSessionManager, SharedTransport
+from tests.benchmarks import fake_mcp
+
+SSE_EVENT = b"event: message\ndata: {}\n\n"
+SSE_REPLY = (
+    b"HTTP/1.1 200 OK\r\nContent-Type: text/event-stream\r\nTransfer-Encoding: chunked\r\n\r\n"
+    + f"{len(SSE_EVENT):x}\r\n".encode()
+    + SSE_EVENT
+    + b"\r\n"
+)
+
+
+async def _sse_server() -> tuple[asyncio.Server, str, list[int]]:
+    """Replies with one SSE event, then ends the stream a little later, like an MCP server."""
+    accepted: list[int] = []
+
+    async def handle(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        accepted.append(1)
+        try:
+            while await reader.readuntil(b"\r\n\r\n"):
+                writer.write(SSE_REPLY)
+                await writer.drain()
+                await asyncio.sleep(0.01)
+                writer.write(b"0\r\n\r\n")
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            writer.close()
+
+    server = await asyncio.start_server(handle, "127.0.0.1", 0)
+    port = server.sockets[0].getsockname()[1]
+    return server, f"http://127.0.0.1:{port}/mcp", accepted
+
+
+async def _read_first_event(client: httpx.AsyncClient, url: str) -> None:
+    # Like the MCP client: close the response as soon as the reply has arrived.
+    async with client.stream("POST", url, json={}) as response:
+        async for _ in response.aiter_lines():
+            await response.aclose()
+            return
+
+
+@pytest.mark.asyncio
+async def test_session_clients_share_connections(monkeypatch) -> None:
+    """Responses closed after the first event don't cost a new connection per request."""
+    monkeypatch.setenv("MCP_HTTP_HTTP2", "false")
+    server, url, accepted = await _sse_server()
+
+    async with server, create_http_transport("MCP_HTTP") as transport:
+        for _ in range(3):
+            # One short-lived client per MCP session, as the session manager does.
+            async with httpx.AsyncClient(transport=SharedTransport(transport)) as client:
+                await _read_first_event(client, url)
+                await _read_first_event(client, url)
+
+        assert len(accepted) == 1
+        assert transport.connection_counts() == (0, 1)
+
+
+def _manager(url: str, user: ContextVar[str], **kwargs) -> PooledMCPSessionManager:
+    return PooledMCPSessionManager(
+        connection_params=StreamableHTTPConnectionParams(url=url), session_key_provider=user.get, **kwargs
+    )
+
+
+@pytest.mark.asyncio
+async def test_sessions_are_reused_per_user_across_tokens(mcp_url) -> None:
+    """A user's refreshed token reuses their session, with the new token."""
+    user: ContextVar[str] = ContextVar("user")
+    manager = _manager(mcp_url, user)
+    fake_mcp.authorizations.clear()
+
+    user.set("alice")
+    first = await manager.create_session({"Authorization": "Bearer alice-1"})
+    second = await manager.create_session({"Authorization": "Bearer alice-2"})
+    await second.call_tool("list_tasks", arguments={})
+    user.set("bob")
+    other = await manager.create_session({"Authorization": "Bearer bob-1"})
+
+    assert first is second
+    assert other is not first
+    assert fake_mcp.authorizations == ["Bearer alice-2"]
+    await manager.close()
+    assert len(manager) == 0
+
+
+@pytest.mark.asyncio
+async def test_pool_is_bounded_and_idle_sessions_are_closed(mcp_url) -> None:
+    user: ContextVar[str] = ContextVar("user")
+    manager = _manager(mcp_url, user, max_sessions=1, idle_ttl_seconds=0.2)
+
+    user.set("alice")
+    alice = await manager.create_session()
+    user.set("bob")
+    await manager.create_session()
+    assert len(manager) == 1
+
+    await asyncio.sleep(0.3)
+    user.set("alice")
+    assert await manager.create_session() is not alice
+    assert len(manager) == 1
+    await manager.close()
+
+
+@pytest.mark.asyncio
+async def test_unhealthy_session_is_replaced(mcp_url) -> None:
+    """A session idle past the health-check interval is pinged, and replaced if the ping fails."""
+    user: ContextVar[str] = ContextVar("user")
+    manager = _manager(mcp_url, user, health_check_seconds=0)
+    user.set("alice")
+    session = await manager.create_session()
+    assert await manager.create_session() is session
+
+    async def failing_ping():
+        raise ConnectionError("gone")
+
+    session.send_ping = failing_ping
+    replacement = await manager.create_session()
+    assert replacement is not session
+    await replacement.call_tool("list_tasks", arguments={})
+    await manager.close()
@@ -0,0 +1,96 @@
+import asyncio
+import json
+
+import pytest
+from google.adk.tools.mcp_tool import StreamableHTTPConnectionParams
+from mcp import ClientSession, types
+
+from app.app_utils.mcp_pool import PooledMcpToolset
+
+
+@pytest.fixture
+def list_tools_calls(monkeypatch) -> list[int]:
+    calls: list[int] = []
+    list_tools = ClientSession.list_tools
+
+    async def counting_list_tools(self, *args, **kwargs):
+        calls.append(1)
+        return await list_tools(self, *args, **kwargs)
+
+    monkeypatch.setattr(ClientSession, "list_tools", counting_list_tools)
+    return calls
+
+
+def _toolset(url: str, **kwargs) -> PooledMcpToolset:
+    return PooledMcpToolset(connection_params=StreamableHTTPConnectionParams(url=url), **kwargs)
+
+
+@pytest.mark.asyncio
+async def test_tools_are_listed_once(mcp_url, list_tools_calls) -> None:
+    toolset = _toolset(mcp_url)
+
+    first = await toolset.get_tools()
+    second = await toolset.get_tools()
+
+    assert [tool.name for tool in first] == [tool.name for tool in second] == ["list_tasks", "create_task"]
+    assert len(list_tools_calls) == 1
+    await toolset.close()
+
+
+@pytest.mark.asyncio
+async def test_expired_tools_are_served_while_refreshing(mcp_url, list_tools_calls) -> None:
+    toolset = _toolset(mcp_url, tools_ttl_seconds=0)
+    await toolset.get_tools()
+    session = await toolset._mcp_session_manager.create_session()
+    release = asyncio.Event()
+    list_tools = session.list_tools
+
+    async def slow_list_tools():
+        await release.wait()
+        return await list_tools()
+
+    session.list_tools = slow_list_tools
+    tools = await asyncio.wait_for(toolset.get_tools(), timeout=1)
+    assert len(tools) == 2
+
+    release.set()
+    await asyncio.gather(*toolset._background)
+    assert len(list_tools_calls) == 2
+    await toolset.close()
+
+
+@pytest.mark.asyncio
+async def test_list_changed_notification_invalidates_tools(mcp_url, list_tools_calls) -> None:
+    toolset = _toolset(mcp_url)
+    await toolset.get_tools()
+
+    notification = types.ServerNotification(types.ToolListChangedNotification(method="notifications/tools/list_changed"))
+    await toolset._mcp_session_manager._handle_message(notification)
+    assert toolset.tool_cache.tools is None
+
+    await toolset.get_tools()
+    assert len(list_tools_calls) == 2
+    await toolset.close()
+
+
+@pytest.mark.asyncio
+async def test_cold_start_uses_snapshot(mcp_url, tmp_path, list_tools_calls) -> None:
+    """A restart builds declarations from the snapshot even when the server is down."""
+    snapshot_path = str(tmp_path / "tools.json")
+    warm = _toolset(mcp_url, tools_snapshot_path=snapshot_path)
+    await warm.get_tools()
+    await warm.close()
+
+    # Same snapshot, but for a server that is down.
+    down_url = "http://127.0.0.1:9/mcp"
+    with open(snapshot_path, encoding="utf-8") as f:
+        snapshot = json.load(f)
+    with open(snapshot_path, "w", encoding="utf-8") as f:
+        json.dump({**snapshot, "url": down_url}, f)
+
+    cold = _toolset(down_url, tools_snapshot_path=snapshot_path)
+    tools = await asyncio.wait_for(cold.get_tools(), timeout=1)
+
+    assert [tool.name for tool in tools] == ["list_tasks", "create_task"]
+    assert cold.tool_cache.server_version == warm.tool_cache.server_version
+    await cold.close()
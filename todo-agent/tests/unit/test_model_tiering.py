@@ -0,0 +1,118 @@
+from collections.abc import AsyncGenerator
+
+import pytest
+from google.adk.models import BaseLlm, Gemini, LlmRequest, LlmResponse
+from google.adk.tools import FunctionTool
+from google.genai import types
+from pydantic import Field
+
+from app.agent import create_model
+from app.app_utils.model_tiering import TieredModel, is_simple_turn
+
+
+class _StubModel(BaseLlm):
+    """A local model that answers every call with `parts`."""
+
+    parts: list[types.Part]
+    avg_logprobs: float | None = None
+    requests: list[LlmRequest] = Field(default_factory=list)
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        self.requests.append(llm_request)
+        yield LlmResponse(
+            content=types.Content(role="model", parts=self.parts),
+            avg_logprobs=self.avg_logprobs,
+            usage_metadata=types.GenerateContentResponseUsageMetadata(prompt_token_count=10, candidates_token_count=2),
+        )
+
+
+def get_tasks() -> list:
+    """Get the tasks."""
+    return []
+
+
+def _request(text: str) -> LlmRequest:
+    request = LlmRequest(model="tiered", contents=[types.Content(role="user", parts=[types.Part(text=text)])])
+    request.append_tools([FunctionTool(get_tasks)])
+    return request
+
+
+def _tiers(fast_parts: list[types.Part], **kwargs) -> tuple[TieredModel, _StubModel, _StubModel]:
+    fast = _StubModel(model="fast", parts=fast_parts, **kwargs)
+    strong = _StubModel(model="strong", parts=[types.Part(text="strong")])
+    return TieredModel(fast=fast, strong=strong, min_avg_logprobs=-1.0), fast, strong
+
+
+async def _texts(model: BaseLlm, request: LlmRequest) -> list[str]:
+    return [response.content.parts[0].text async for response in model.generate_content_async(request)]
+
+
+@pytest.mark.asyncio
+async def test_simple_turns_use_the_fast_model() -> None:
+    model, fast, strong = _tiers([types.Part(text="fast")])
+
+    assert await _texts(model, _request("What's due today?")) == ["fast"]
+    assert fast.requests[0].model == "fast"
+    assert strong.requests == []
+
+
+@pytest.mark.asyncio
+async def test_complex_turns_use_the_strong_model() -> None:
+    model, fast, strong = _tiers([types.Part(text="fast")])
+
+    assert await _texts(model, _request("Move my overdue tasks to Friday and then delete the done ones")) == ["strong"]
+    assert fast.requests == []
+    assert strong.requests[0].model == "strong"
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "parts,avg_logprobs",
+    [
+        ([types.Part.from_function_call(name="get_task_list", args={})], None),  # unknown function
+        ([], None),  # empty response
+        ([types.Part(text="maybe")], -2.5),  # low confidence
+    ],
+)
+async def test_unusable_fast_answers_are_escalated(parts, avg_logprobs) -> None:
+    model, fast, strong = _tiers(parts, avg_logprobs=avg_logprobs)
+    request = _request("What's due today?")
+
+    assert await _texts(model, request) == ["strong"]
+    assert len(fast.requests) == len(strong.requests) == 1
+    # The strong model gets the original request, not the fast one.
+    assert strong.requests[0] is request
+
+
+@pytest.mark.asyncio
+async def test_known_function_calls_are_not_escalated() -> None:
+    model, _, strong = _tiers([types.Part.from_function_call(name="get_tasks", args={})], avg_logprobs=-0.1)
+    responses = [response async for response in model.generate_content_async(_request("List my tasks"))]
+
+    assert responses[0].content.parts[0].function_call.name == "get_tasks"
+    assert strong.requests == []
+
+
+def test_tool_results_are_simple_unless_large() -> None:
+    request = _request("List my tasks")
+    request.contents += [
+        types.Content(role="model", parts=[types.Part.from_function_call(name="get_tasks", args={})]),
+        types.Content(role="user", parts=[types.Part.from_function_response(name="get_tasks", response={"result": []})]),
+    ]
+    assert is_simple_turn(request)
+
+    request.contents[-1].parts[0].function_response.response = {"result": ["x" * 100] * 100}
+    assert not is_simple_turn(request)
+
+
+def test_tiering_is_opt_in(monkeypatch) -> None:
+    monkeypatch.delenv("FAST_MODEL", raising=False)
+    assert isinstance(create_model(), Gemini)
+
+    monkeypatch.setenv("FAST_MODEL", "gemini-2.5-flash-lite")
+    model = create_model()
+    assert isinstance(model, TieredModel)
+    assert model.fast.model == "gemini-2.5-flash-lite"
+    assert model.min_avg_logprobs is None
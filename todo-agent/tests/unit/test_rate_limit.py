@@ -0,0 +1,32 @@
+from app.app_utils import rate_limit as rate_limit_module
+from app.app_utils.rate_limit import TokenBucketLimiter
+
+
+def test_key_is_limited_after_burst_and_recovers(monkeypatch) -> None:
+    """A key is limited once its burst is used up and recovers at the refill rate."""
+    now = [1000.0]
+    monkeypatch.setattr(rate_limit_module.time, "monotonic", lambda: now[0])
+    limiter = TokenBucketLimiter(name="test", rate_per_second=0.5, burst=3)
+
+    for _ in range(3):
+        assert not limiter.is_limited("client")
+        limiter.consume("client")
+
+    assert limiter.is_limited("client")
+    assert not limiter.is_limited("other-client")
+    assert limiter.retry_after("client") == 2
+
+    now[0] += 2
+    assert not limiter.is_limited("client")
+    assert limiter.stats()["limited"] == 1
+
+
+def test_tracked_keys_are_bounded() -> None:
+    """The least recently used keys are dropped beyond max_keys."""
+    limiter = TokenBucketLimiter(name="test", rate_per_second=1, burst=1, max_keys=2)
+    for key in ("a", "b", "c"):
+        limiter.consume(key)
+
+    assert len(limiter) == 2
+    assert not limiter.is_limited("a")
+    assert limiter.is_limited("c")
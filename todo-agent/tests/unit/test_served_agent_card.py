@@ -0,0 +1,110 @@
+import asyncio
+from unittest.mock import Mock
+
+import pytest
+from a2a.server.request_handlers import DefaultRequestHandler
+from a2a.server.tasks import InMemoryTaskStore
+from a2a.types import AgentCapabilities, AgentCard
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+from app.app_utils.served_agent_card import (
+    ServedAgentCard,
+    ServedCardA2AFastAPIApplication,
+)
+
+
+def _card(description: str) -> AgentCard:
+    return AgentCard(
+        name="todo_agent",
+        description=description,
+        url="http://localhost:8000/a2a/app",
+        version="0.1.0",
+        capabilities=AgentCapabilities(streaming=True),
+        default_input_modes=["text/plain"],
+        default_output_modes=["text/plain"],
+        skills=[],
+    )
+
+
+@pytest.mark.asyncio
+async def test_full_card_is_built_in_the_background_with_retries(tmp_path) -> None:
+    """Serves the limited card at once, then swaps in the full card once a build succeeds."""
+    outcomes = [ValueError("Checkmate unavailable"), asyncio.CancelledError(), _card("Todo Agent")]
+
+    async def build() -> AgentCard:
+        outcome = outcomes.pop(0)
+        if isinstance(outcome, BaseException):
+            raise outcome
+        return outcome
+
+    served = ServedAgentCard(
+        build, _card("Todo Agent (Limited)"), snapshot_path=str(tmp_path / "card.json"), retry_initial_seconds=0.01
+    )
+    changes = []
+    await served.start()
+    served.on_change(changes.append)
+
+    assert served.card.description == "Todo Agent (Limited)"
+    assert not served.ready
+
+    await asyncio.wait_for(served._build_task, timeout=5)
+    assert served.ready
+    assert served.source == "built"
+    assert served.attempts == 3
+    assert [card.description for card in changes] == ["Todo Agent"]
+    await served.aclose()
+
+
+@pytest.mark.asyncio
+async def test_snapshot_is_served_on_the_next_start(tmp_path) -> None:
+    """The last full card is served before the next build finishes, but isn't ready until it is built."""
+    snapshot_path = str(tmp_path / "card.json")
+    first = ServedAgentCard(lambda: asyncio.sleep(0, _card("Todo Agent")), _card("Limited"), snapshot_path)
+    await first.start()
+    await first._build_task
+
+    never_built = asyncio.Event()
+    second = ServedAgentCard(never_built.wait, _card("Limited"), snapshot_path)
+    await second.start()
+
+    assert second.source == "snapshot"
+    assert second.card.description == "Todo Agent"
+    # It may be out of date, so it isn't ready and clients revalidate it until the card is built.
+    assert not second.ready
+    assert second.max_age == 0
+    await second.aclose()
+    # A snapshot of another agent (or URL) is ignored.
+    other = ServedAgentCard(never_built.wait, _card("Limited").model_copy(update={"url": "http://other"}), snapshot_path)
+    assert other.load_snapshot() is None
+
+
+@pytest.mark.asyncio
+async def test_card_is_served_with_etag_and_conditional_get(tmp_path) -> None:
+    """The card is sent as precomputed bytes with a strong ETag, and revalidations get a 304."""
+    served = ServedAgentCard(
+        lambda: asyncio.sleep(0, _card("Todo Agent")), _card("Limited"), str(tmp_path / "card.json"), max_age_seconds=120
+    )
+    handler = DefaultRequestHandler(agent_executor=Mock(), task_store=InMemoryTaskStore())
+    app = FastAPI()
+    a2a_app = ServedCardA2AFastAPIApplication(served_card=served, http_handler=handler)
+    a2a_app.add_routes_to_app(app, agent_card_url="/card.json", extended_agent_card_url="/extended")
+    client = TestClient(app)
+
+    limited = client.get("/card.json")
+    assert limited.json()["description"] == "Limited"
+    assert limited.headers["Cache-Control"] == "no-cache"
+
+    await served.start()
+    assert client.get("/card.json").headers["Cache-Control"] == "no-cache"
+    await served._build_task
+    full = client.get("/card.json")
+    assert full.json() == _card("Todo Agent").model_dump(mode="json", by_alias=True, exclude_none=True)
+    assert full.headers["ETag"] != limited.headers["ETag"]
+    assert full.headers["Cache-Control"] == "public, max-age=120"
+
+    not_modified = client.get("/card.json", headers={"If-None-Match": full.headers["ETag"]})
+    assert not_modified.status_code == 304
+    assert not_modified.content == b""
+    assert client.get("/card.json", headers={"If-None-Match": limited.headers["ETag"]}).status_code == 200
+    await served.aclose()
@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+
+from app.app_utils.single_flight import SingleFlight
+
+
+@pytest.mark.asyncio
+async def test_concurrent_calls_share_one_task() -> None:
+    """N simultaneous calls for the same key run the function once."""
+    single_flight = SingleFlight()
+    calls = 0
+
+    async def work() -> str:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        return "result"
+
+    results = await asyncio.gather(*(single_flight.run("key", work) for _ in range(10)))
+
+    assert results == ["result"] * 10
+    assert calls == 1
+    assert single_flight.coalesced == 9
+    assert len(single_flight) == 0
+
+
+@pytest.mark.asyncio
+async def test_errors_are_shared_and_not_cached() -> None:
+    """All waiters see the failure, and the next call runs again."""
+    single_flight = SingleFlight()
+    calls = 0
+
+    async def fail() -> None:
+        nonlocal calls
+        calls += 1
+        await asyncio.sleep(0.01)
+        raise ValueError("boom")
+
+    results = await asyncio.gather(
+        *(single_flight.run("key", fail) for _ in range(3)), return_exceptions=True
+    )
+    assert all(isinstance(result, ValueError) for result in results)
+
+    with pytest.raises(ValueError):
+        await single_flight.run("key", fail)
+    assert calls == 2
+
+
+@pytest.mark.asyncio
+async def test_cancelled_caller_does_not_cancel_shared_task() -> None:
+    """A caller going away leaves the shared work running for the others."""
+    single_flight = SingleFlight()
+
+    async def work() -> str:
+        await asyncio.sleep(0.01)
+        return "result"
+
+    first = asyncio.ensure_future(single_flight.run("key", work))
+    second = asyncio.ensure_future(single_flight.run("key", work))
+    await asyncio.sleep(0)
+    first.cancel()
+
+    assert await second == "result"
+
+
+@pytest.mark.asyncio
+async def test_cancel_ends_calls_in_flight() -> None:
+    """Closing an owner cancels the shared work instead of leaving it to the event loop."""
+    single_flight = SingleFlight()
+    waiter = asyncio.ensure_future(single_flight.run("key", asyncio.Event().wait))
+    await asyncio.sleep(0)
+
+    await single_flight.cancel()
+
+    with pytest.raises(asyncio.CancelledError):
+        await waiter
+    assert len(single_flight) == 0
@@ -0,0 +1,98 @@
+import asyncio
+import json
+import logging
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+
+from app.app_utils.startup import (
+    log_startup_report,
+    run_startup_phases,
+    startup_phases,
+    startup_report,
+)
+
+# Generous enough for a cold CI runner; importing ADK alone takes about 2s.
+IMPORT_TIME_BUDGET_SECONDS = float(os.environ.get("IMPORT_TIME_BUDGET_SECONDS", "8"))
+
+# Imports the app with the blocking startup calls made to fail, and reports
+# which of them were made and how long the import took.
+IMPORT_SCRIPT = """
+import json, sys, time
+from unittest import mock
+
+import firebase_admin
+import google.auth
+from google.cloud import logging as google_cloud_logging
+
+calls = []
+def record(name):
+    def fail(*args, **kwargs):
+        calls.append(name)
+        raise RuntimeError(f"{name} called at import")
+    return fail
+
+with (
+    mock.patch.object(google.auth, "default", record("google.auth.default")),
+    mock.patch.object(google_cloud_logging, "Client", record("google.cloud.logging.Client")),
+    mock.patch.object(firebase_admin, "initialize_app", record("firebase_admin.initialize_app")),
+):
+    started = time.perf_counter()
+    import app.fast_api_app
+    seconds = time.perf_counter() - started
+print(json.dumps({"calls": calls, "seconds": seconds}))
+"""
+
+
+@pytest.fixture(scope="module")
+def app_import() -> dict:
+    result = subprocess.run(
+        [sys.executable, "-c", IMPORT_SCRIPT],
+        cwd=Path(__file__).parents[2],
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert result.returncode == 0, result.stderr
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def test_import_makes_no_blocking_calls(app_import: dict) -> None:
+    assert app_import["calls"] == []
+
+
+def test_import_time_within_budget(app_import: dict) -> None:
+    assert app_import["seconds"] < IMPORT_TIME_BUDGET_SECONDS
+
+
+@pytest.mark.asyncio
+async def test_startup_phases_are_timed_and_failures_contained() -> None:
+    def fail() -> None:
+        raise RuntimeError("unavailable")
+
+    await run_startup_phases({"ok": lambda: None, "broken": fail})
+
+    assert {"ok", "broken"} <= startup_phases.keys()
+    assert "broken=" in startup_report()
+
+
+@pytest.mark.asyncio
+async def test_startup_report_is_logged(caplog) -> None:
+    async def fail() -> None:
+        raise RuntimeError("exporter crashed")
+
+    caplog.set_level(logging.INFO, logger="app.app_utils.startup")
+    for coroutine in (asyncio.sleep(0), fail()):
+        task = asyncio.create_task(coroutine)
+        await asyncio.gather(task, return_exceptions=True)
+        log_startup_report(task)
+    cancelled = asyncio.create_task(asyncio.sleep(10))
+    cancelled.cancel()
+    await asyncio.gather(cancelled, return_exceptions=True)
+    log_startup_report(cancelled)
+
+    assert [record.levelname for record in caplog.records] == ["INFO", "ERROR", "WARNING"]
+    assert "exporter crashed" in caplog.records[1].message
@@ -0,0 +1,177 @@
+import datetime
+import time
+
+import httpx
+import pytest
+from cryptography import x509
+from cryptography.hazmat.primitives import hashes, serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from cryptography.x509.oid import NameOID
+from google.auth import crypt, jwt
+
+from app.app_utils import token_verifier as token_verifier_module
+from app.app_utils.token_verifier import (
+    PublicCertCache,
+    TokenKind,
+    TokenVerifier,
+    VerificationUnavailableError,
+    classify_token,
+)
+
+PROJECT_ID = "test-project"
+KEY_ID = "test-key"
+
+
+def _make_signer_and_cert() -> tuple[crypt.RSASigner, str]:
+    key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    name = x509.Name([x509.NameAttribute(NameOID.COMMON_NAME, "test")])
+    now = datetime.datetime.now(datetime.timezone.utc)
+    cert = (
+        x509.CertificateBuilder()
+        .subject_name(name)
+        .issuer_name(name)
+        .public_key(key.public_key())
+        .serial_number(x509.random_serial_number())
+        .not_valid_before(now)
+        .not_valid_after(now + datetime.timedelta(days=1))
+        .sign(key, hashes.SHA256())
+    )
+    key_pem = key.private_bytes(
+        serialization.Encoding.PEM,
+        serialization.PrivateFormat.PKCS8,
+        serialization.NoEncryption(),
+    )
+    signer = crypt.RSASigner.from_string(key_pem, key_id=KEY_ID)
+    return signer, cert.public_bytes(serialization.Encoding.PEM).decode()
+
+
+def _cert_client(cert_pem: str, calls: list[httpx.Request], max_age: int = 3600) -> httpx.AsyncClient:
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        return httpx.Response(
+            200,
+            json={KEY_ID: cert_pem},
+            headers={"Cache-Control": f"public, max-age={max_age}, must-revalidate"},
+        )
+
+    return httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+
+def _firebase_token(signer: crypt.RSASigner, **overrides) -> str:
+    now = int(time.time())
+    payload = {
+        "iss": f"https://securetoken.google.com/{PROJECT_ID}",
+        "aud": PROJECT_ID,
+        "sub": "user-123",
+        "email": "test@example.com",
+        "iat": now,
+        "exp": now + 3600,
+    }
+    payload.update(overrides)
+    return jwt.encode(signer, payload).decode()
+
+
+def test_classify_token() -> None:
+    """Tokens are routed by their unverified issuer, or as opaque access tokens."""
+    signer, _ = _make_signer_and_cert()
+
+    assert classify_token(_firebase_token(signer)) is TokenKind.FIREBASE_ID_TOKEN
+    assert classify_token(_firebase_token(signer, iss="https://accounts.google.com")) is TokenKind.GOOGLE_ID_TOKEN
+    assert classify_token(_firebase_token(signer, iss="https://evil.example.com")) is TokenKind.UNSUPPORTED
+    assert classify_token("ya29.opaque-access-token") is TokenKind.ACCESS_TOKEN
+    assert classify_token("not.a.jwt") is TokenKind.UNSUPPORTED
+
+
+@pytest.mark.asyncio
+async def test_cert_cache_serves_from_memory_until_max_age() -> None:
+    """Certificates are fetched once and reused while within max-age."""
+    _, cert_pem = _make_signer_and_cert()
+    calls: list[httpx.Request] = []
+    cache = PublicCertCache("https://certs.example.com")
+    cache.http_client = _cert_client(cert_pem, calls)
+
+    for _ in range(3):
+        certs = await cache.get(KEY_ID)
+
+    assert certs == {KEY_ID: cert_pem}
+    assert len(calls) == 1
+
+
+@pytest.mark.asyncio
+async def test_cert_cache_refreshes_in_background(monkeypatch) -> None:
+    """Near expiry, callers get the current certificates while a refresh runs."""
+    _, cert_pem = _make_signer_and_cert()
+    calls: list[httpx.Request] = []
+    cache = PublicCertCache("https://certs.example.com")
+    cache.http_client = _cert_client(cert_pem, calls, max_age=100)
+    await cache.get(KEY_ID)
+
+    now = time.monotonic()
+    monkeypatch.setattr(token_verifier_module.time, "monotonic", lambda: now + 95)
+    certs = await cache.get(KEY_ID)
+    assert certs == {KEY_ID: cert_pem}
+    assert len(calls) == 1
+
+    await cache._refresh_task
+    assert len(calls) == 2
+
+
+@pytest.mark.asyncio
+async def test_verify_firebase_id_token_locally() -> None:
+    """A Firebase ID token signed with a known key is verified without the SDK."""
+    signer, cert_pem = _make_signer_and_cert()
+    verifier = TokenVerifier()
+    verifier.firebase_certs.http_client = _cert_client(cert_pem, [])
+
+    claims = await verifier.verify_firebase_id_token(_firebase_token(signer), PROJECT_ID)
+
+    assert claims["uid"] == "user-123"
+    assert claims["email"] == "test@example.com"
+
+
+@pytest.mark.asyncio
+async def test_verify_firebase_id_token_rejects_wrong_project() -> None:
+    """Tokens issued for another Firebase project are rejected."""
+    signer, cert_pem = _make_signer_and_cert()
+    verifier = TokenVerifier()
+    verifier.firebase_certs.http_client = _cert_client(cert_pem, [])
+    token = _firebase_token(signer, aud="other-project", iss="https://securetoken.google.com/other-project")
+
+    with pytest.raises(ValueError):
+        await verifier.verify_firebase_id_token(token, PROJECT_ID)
+
+
+@pytest.mark.asyncio
+async def test_verify_access_token_uses_shared_client() -> None:
+    """Opaque tokens are checked against the configured tokeninfo URL via the shared client."""
+    calls: list[httpx.Request] = []
+
+    def handler(request: httpx.Request) -> httpx.Response:
+        calls.append(request)
+        if request.url.params["access_token"] == "invalid":
+            return httpx.Response(400, json={"error": "invalid_token"})
+        return httpx.Response(200, json={"sub": "123", "email": "test@example.com"})
+
+    verifier = TokenVerifier(tokeninfo_url="http://tokeninfo.local/tokeninfo")
+    async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+        verifier.use_http_client(client)
+        claims = await verifier.verify_access_token("opaque")
+        with pytest.raises(ValueError):
+            await verifier.verify_access_token("invalid")
+
+    assert claims["email"] == "test@example.com"
+    assert [str(call.url.copy_with(params=None)) for call in calls] == ["http://tokeninfo.local/tokeninfo"] * 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("status_code", [429, 500, 503])
+async def test_tokeninfo_errors_are_not_rejections(status_code: int) -> None:
+    """A tokeninfo outage or rate limit says nothing about the token."""
+    verifier = TokenVerifier(tokeninfo_url="http://tokeninfo.local/tokeninfo")
+    transport = httpx.MockTransport(lambda request: httpx.Response(status_code))
+    async with httpx.AsyncClient(transport=transport) as client:
+        verifier.use_http_client(client)
+        with pytest.raises(VerificationUnavailableError):
+            await verifier.verify_access_token("opaque")
+    with pytest.raises(VerificationUnavailableError):
+        await verifier.verify_firebase_id_token("token", None)
@@ -0,0 +1,86 @@
+from contextvars import ContextVar
+
+import pytest
+from google.adk.tools.mcp_tool import StreamableHTTPConnectionParams
+
+from app.app_utils.mcp_pool import PooledMcpToolset
+from app.app_utils.tool_result_cache import ToolResultCache, tool_ttls_from_env
+from tests.benchmarks import fake_mcp
+
+
+async def _tools(url: str, user: ContextVar[str], cache: ToolResultCache) -> tuple[PooledMcpToolset, dict]:
+    toolset = PooledMcpToolset(
+        connection_params=StreamableHTTPConnectionParams(url=url), session_key_provider=user.get, result_cache=cache
+    )
+    return toolset, {tool.name: tool for tool in await toolset.get_tools()}
+
+
+async def _call(tool, **args) -> dict:
+    return await tool._run_async_impl(args=args, tool_context=None, credential=None)
+
+
+@pytest.mark.asyncio
+async def test_reads_are_cached_per_user_until_a_write(mcp_url) -> None:
+    user: ContextVar[str] = ContextVar("user", default="")
+    toolset, tools = await _tools(mcp_url, user, ToolResultCache("test", {"list_tasks": 30}))
+    fake_mcp.authorizations.clear()
+
+    user.set("alice")
+    first = await _call(tools["list_tasks"], list_name="Inbox")
+    assert await _call(tools["list_tasks"], list_name="Inbox") == first
+    await _call(tools["list_tasks"], list_name="Work")
+    assert len(fake_mcp.authorizations) == 2
+
+    user.set("bob")
+    await _call(tools["list_tasks"], list_name="Inbox")
+    assert len(fake_mcp.authorizations) == 3
+
+    # A write drops only the writer's cached reads.
+    user.set("alice")
+    await _call(tools["create_task"], title="Call mum")
+    await _call(tools["list_tasks"], list_name="Inbox")
+    user.set("bob")
+    await _call(tools["list_tasks"], list_name="Inbox")
+    assert len(fake_mcp.authorizations) == 5
+
+    await toolset._mcp_session_manager.close()
+
+
+@pytest.mark.asyncio
+async def test_calls_without_a_user_are_not_cached(mcp_url) -> None:
+    user: ContextVar[str] = ContextVar("user", default="")
+    toolset, tools = await _tools(mcp_url, user, ToolResultCache("test", {"list_tasks": 30}))
+    fake_mcp.authorizations.clear()
+
+    await _call(tools["list_tasks"])
+    await _call(tools["list_tasks"])
+
+    assert len(fake_mcp.authorizations) == 2
+    await toolset._mcp_session_manager.close()
+
+
+def test_read_racing_a_write_is_not_cached() -> None:
+    cache = ToolResultCache("test", {"get_tasks": 30})
+    generation = cache.generation
+    cache.invalidate("alice", "update_task")
+    cache.set("alice", "get_tasks", {}, {"tasks": []}, generation)
+
+    assert cache.get("alice", "get_tasks", {}) is None
+
+
+def test_ttls_are_configured_from_environment(monkeypatch) -> None:
+    monkeypatch.setenv("MCP_RESULT_CACHE_TTL_SECONDS", "20")
+    monkeypatch.setenv("MCP_RESULT_CACHE_TTLS", "get_task_stats=120, unknown=5")
+
+    assert tool_ttls_from_env(["get_tasks", "get_task_stats"]) == {"get_tasks": 20, "get_task_stats": 120}
+
+
+def test_caching_is_opt_in(monkeypatch) -> None:
+    monkeypatch.delenv("MCP_RESULT_CACHE_TTL_SECONDS", raising=False)
+    monkeypatch.delenv("MCP_RESULT_CACHE_TTLS", raising=False)
+    cache = ToolResultCache("test", tool_ttls_from_env(["get_tasks"]))
+
+    cache.set("alice", "get_tasks", {}, {"tasks": []}, cache.generation)
+
+    assert cache.is_read_only("get_tasks")
+    assert cache.get("alice", "get_tasks", {}) is None